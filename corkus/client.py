@@ -1,7 +1,10 @@
 from __future__ import annotations
-from typing import Optional, TYPE_CHECKING
+from contextlib import contextmanager
+from typing import Iterator, Optional, TYPE_CHECKING
 from corkus.errors import CorkusException
-from corkus.utils.request import CorkusRequest
+from corkus.utils.request import APIVersion, CorkusRequest
+from corkus.utils.ratelimit import RequestPriority, current_priority
+from corkus.utils.retry import RetryPolicy, CircuitBreaker
 
 from corkus.endpoints import (
     NetworkEndpoint,
@@ -28,8 +31,22 @@ class Corkus:
         timeout: Optional[int] = 60,
         disable_ratelimit: Optional[bool] = False,
         disable_cache: Optional[bool] = False,
+        cache_max_entries: Optional[int] = 1024,
+        cache_max_bytes: Optional[int] = 64 * 1024 * 1024,
+        cache_path: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ) -> None:
-        self._request = CorkusRequest(timeout, disable_ratelimit, disable_cache)
+        self._request = CorkusRequest(
+            timeout,
+            disable_ratelimit,
+            disable_cache,
+            cache_max_entries,
+            cache_max_bytes,
+            cache_path,
+            retry_policy,
+            circuit_breaker
+        )
         self._initialized = False
 
     async def start(self, api_key: Optional[str] = None) -> None:
@@ -107,12 +124,63 @@ class Corkus:
     @property
     def rate_limit(self) -> RateLimit:
         """Current ratelimit information for this Corkus instance."""
+        ratelimit = self._request.ratelimit
         return RateLimit(
-            total = self._request.ratelimit.total,
-            remaining = self._request.ratelimit.remaining,
-            reset = self._request.ratelimit.reset
+            total = ratelimit.total,
+            remaining = ratelimit.remaining,
+            reset = ratelimit.reset,
+            queue_depth = ratelimit.queue_depth,
+            average_wait = ratelimit.average_wait,
+            max_wait = ratelimit.max_wait
         )
 
+    @property
+    def cache_info(self) -> CacheInfo:
+        """Current usage and effectiveness of the response cache of this Corkus instance."""
+        request = self._request
+        return CacheInfo(
+            hits = request.hits,
+            stale_hits = request.stale_hits,
+            misses = request.misses,
+            revalidations = request.revalidations,
+            entries = len(request.cache),
+            size = request.cache.size
+        )
+
+    @contextmanager
+    def priority(self, priority: RequestPriority) -> Iterator[None]:
+        """Send all requests made inside this context with the given priority. When the
+        ratelimit is exhausted, requests with a higher priority are sent first.
+
+        .. code-block:: python
+
+            with corkus.priority(RequestPriority.INTERACTIVE):
+                player = await corkus.player.get("Salted")
+
+        :param priority: Priority of the requests.
+        """
+        token = current_priority.set(priority)
+        try:
+            yield
+        finally:
+            current_priority.reset(token)
+
+    def keep_fresh(self, *parameters: str) -> None:
+        """Keep the responses of frequently used API v3 routes fresh. They are refreshed
+        in the background shortly before they expire, and once one of them is cached,
+        requesting it never waits for the API again: an expired response is returned
+        immediately while a newer one is fetched.
+
+        .. code-block:: python
+
+            corkus.keep_fresh("guild/Salted", "guild/list/territory")
+
+        :param parameters: Routes relative to ``https://api.wynncraft.com/v3/``.
+        """
+        self._checkInitialized()
+        for route in parameters:
+            self._request.keep_fresh(APIVersion.V3, route)
+
     async def close(self) -> None:
         """End the corkus client when it's not needed anymore."""
         return await self._request.close()
@@ -122,10 +190,20 @@ class RateLimit:
     these values as a information rather than use them in regulating your requests
     since, Corkus have a ratelimit system in place.
     """
-    def __init__(self, total: int, remaining: int, reset: int) -> None:
+    def __init__(self,
+        total: int,
+        remaining: int,
+        reset: int,
+        queue_depth: int = 0,
+        average_wait: float = 0.0,
+        max_wait: float = 0.0
+    ) -> None:
         self._total = total
         self._remaining = remaining
         self._reset = reset
+        self._queue_depth = queue_depth
+        self._average_wait = average_wait
+        self._max_wait = max_wait
 
     @property
     def total(self) -> int:
@@ -145,5 +223,76 @@ class RateLimit:
         is restored back to :py:attr:`total`."""
         return self._reset
 
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting to be sent."""
+        return self._queue_depth
+
+    @property
+    def average_wait(self) -> float:
+        """Average number of seconds requests had to wait before being sent."""
+        return self._average_wait
+
+    @property
+    def max_wait(self) -> float:
+        """Longest number of seconds a request had to wait before being sent."""
+        return self._max_wait
+
+    def __repr__(self) -> str:
+        return f"<RateLimit total={self.total} remaining={self.remaining} reset={self.reset} queue_depth={self.queue_depth}>"
+
+class CacheInfo:
+    """Statistics of the response cache of a Corkus instance since it was created."""
+    def __init__(self,
+        hits: int,
+        stale_hits: int,
+        misses: int,
+        revalidations: int,
+        entries: int,
+        size: int
+    ) -> None:
+        self._hits = hits
+        self._stale_hits = stale_hits
+        self._misses = misses
+        self._revalidations = revalidations
+        self._entries = entries
+        self._size = size
+
+    @property
+    def hits(self) -> int:
+        """Number of requests answered from the cache with a fresh response."""
+        return self._hits
+
+    @property
+    def stale_hits(self) -> int:
+        """Number of requests answered with an expired response while it was refreshed."""
+        return self._stale_hits
+
+    @property
+    def misses(self) -> int:
+        """Number of requests that had to wait for the API."""
+        return self._misses
+
+    @property
+    def revalidations(self) -> int:
+        """Number of expired responses the API confirmed as unchanged."""
+        return self._revalidations
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of requests that did not have to wait for the API."""
+        total = self._hits + self._stale_hits + self._misses
+        return (self._hits + self._stale_hits) / total if total else 0.0
+
+    @property
+    def entries(self) -> int:
+        """Number of responses currently cached."""
+        return self._entries
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of all cached responses."""
+        return self._size
+
     def __repr__(self) -> str:
-        return f"<RateLimit total={self.total} remaining={self.remaining} reset={self.reset}>"
+        return f"<CacheInfo hits={self.hits} stale_hits={self.stale_hits} misses={self.misses} entries={self.entries}>"
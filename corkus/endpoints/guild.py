@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import logging
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
 
 from .endpoint import Endpoint
 from corkus.utils.request import APIVersion
 from corkus.objects import PartialGuild, Guild
+from corkus.errors import CorkusException
 
 class GuildEndpoint(Endpoint):
     async def list_all(self, timeout: Optional[int] = None) -> List[PartialGuild]:
@@ -32,6 +33,36 @@ class GuildEndpoint(Endpoint):
         )
         return Guild(self._corkus, response)
 
+    def get_many(self,
+        names: Iterable[str],
+        timeout: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[str, Union[Guild, CorkusException]]]:
+        """Get statistics of many guilds at once. Requests are sent concurrently and
+        results are yielded as soon as they arrive, as tuples of the requested name and
+        either the :py:class:`Guild` or the error that occurred.
+
+        :param names: Names of the guilds.
+        :param timeout: Optionally override default timeout.
+        :param concurrency: Optionally override maximum number of concurrent requests.
+        """
+        return self._request.get_many(
+            version = APIVersion.V3,
+            parameters = {name: "guild/" + name for name in names},
+            timeout = timeout,
+            concurrency = concurrency,
+            parse = lambda r: Guild(self._corkus, r)
+        )
+
+    def freshness(self, name: str) -> float:
+        """Number of seconds until the cached result of :py:func:`get` for this guild
+        expires. Until then, calling it again will not return newer data. Returns ``0`` if
+        the guild isn't cached.
+
+        :param name: Name of the guild.
+        """
+        return self._request.freshness(APIVersion.V3, "guild/" + name)
+
     async def search(self, term: str, timeout: Optional[int] = None) -> List[PartialGuild]:
         """Search for guilds using specified search term.
 
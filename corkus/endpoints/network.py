@@ -21,6 +21,7 @@ class NetworkEndpoint(Endpoint):
         """List all running servers and players that are online on them.
 
         :param timeout: Optionally override default timeout.
+        :param by_uuid: Identify players by UUID instead of username.
         """
         response = await self._request.get(
             version = APIVersion.V3,
@@ -28,4 +29,4 @@ class NetworkEndpoint(Endpoint):
             timeout = timeout
         )
 
-        return OnlinePlayers(self._corkus, response.get("players", {}))
+        return OnlinePlayers(self._corkus, response.get("players", {}), by_uuid)
@@ -1,9 +1,10 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, List, Optional, Tuple, Union
 
 from .endpoint import Endpoint
 from corkus.utils.request import APIVersion
 from corkus.objects import Player, CorkusUUID
+from corkus.errors import CorkusException
 
 if TYPE_CHECKING:
     from corkus.objects import PartialPlayer
@@ -34,6 +35,33 @@ class PlayerEndpoint(Endpoint):
         )
         return Player(self._corkus, response.get("data", [])[0])
 
+    def get_many(self,
+        usernames_or_uuids: Iterable[Union[str, CorkusUUID]],
+        timeout: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Union[str, CorkusUUID], Union[Player, CorkusException]]]:
+        """Get statistics of many players at once. Requests are sent concurrently and
+        results are yielded as soon as they arrive, as tuples of the username or UUID they
+        were requested with and either the :py:class:`Player` or the error that occurred.
+
+        .. code-block:: python
+
+            async for uuid, player in corkus.player.get_many(uuids):
+                if isinstance(player, CorkusException):
+                    continue
+
+        :param usernames_or_uuids: Usernames or UUIDs of the players.
+        :param timeout: Optionally override default timeout.
+        :param concurrency: Optionally override maximum number of concurrent requests.
+        """
+        return self._request.get_many(
+            version = APIVersion.V2,
+            parameters = {p: f"player/{self._identifier(p)}/stats" for p in usernames_or_uuids},
+            timeout = timeout,
+            concurrency = concurrency,
+            parse = lambda r: Player(self._corkus, r.get("data", [])[0])
+        )
+
     async def getv3(self, username_or_uuid: Union[str, CorkusUUID], timeout: Optional[int] = None) -> dict:
         if isinstance(username_or_uuid, CorkusUUID):
             username_or_uuid = username_or_uuid.string(dashed = True)
@@ -44,6 +72,36 @@ class PlayerEndpoint(Endpoint):
             timeout = timeout
         )
 
+    def getv3_many(self,
+        usernames_or_uuids: Iterable[Union[str, CorkusUUID]],
+        timeout: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[Tuple[Union[str, CorkusUUID], Union[dict, CorkusException]]]:
+        """Like :py:func:`get_many`, but yields the raw responses of :py:func:`getv3`.
+
+        :param usernames_or_uuids: Usernames or UUIDs of the players.
+        :param timeout: Optionally override default timeout.
+        :param concurrency: Optionally override maximum number of concurrent requests.
+        """
+        return self._request.get_many(
+            version = APIVersion.V3,
+            parameters = {p: f"player/{self._identifier(p)}" for p in usernames_or_uuids},
+            timeout = timeout,
+            concurrency = concurrency
+        )
+
+    def freshness(self, username_or_uuid: Union[str, CorkusUUID]) -> float:
+        """Number of seconds until the cached result of :py:func:`getv3` for this player
+        expires. Until then, calling it again will not return newer data. Returns ``0`` if
+        the player isn't cached.
+
+        :param username_or_uuid: Username or UUID of the player.
+        """
+        if isinstance(username_or_uuid, CorkusUUID):
+            username_or_uuid = username_or_uuid.string(dashed = True)
+
+        return self._request.freshness(APIVersion.V3, f"player/{username_or_uuid}")
+
     async def get_uuid(self, username: str, timeout: Optional[int] = None) -> CorkusUUID:
         """Get UUID from player username
 
@@ -60,6 +118,12 @@ class PlayerEndpoint(Endpoint):
         )
         return CorkusUUID(response.get("data", [])[0].get("uuid", ""))
 
+    @staticmethod
+    def _identifier(username_or_uuid: Union[str, CorkusUUID]) -> str:
+        if isinstance(username_or_uuid, CorkusUUID):
+            return username_or_uuid.string(dashed = True)
+        return username_or_uuid
+
     async def search(self, term: str, timeout: Optional[int] = None) -> List[PartialPlayer]:
         """Search for players using specified search term.
 
@@ -28,6 +28,41 @@ class CorkusTimeoutError(CorkusException):
         """URL for which timeout happened."""
         return self._url
 
+class CorkusConnectionError(CorkusException):
+    """Exception that's thrown when a connection to the API can't be established."""
+    def __init__(self, url: str, cause: Exception) -> None:
+        super().__init__(f"connection error for {url}: {cause}")
+        self._url = url
+
+    @property
+    def url(self) -> str:
+        """URL for which the connection failed."""
+        return self._url
+
+class ResponseParseError(CorkusException):
+    """Exception that's thrown when a response was received but couldn't be turned into
+    the requested object, for example because the API left out data."""
+    def __init__(self, url: str, cause: Exception) -> None:
+        super().__init__(f"failed to parse response of {url}: {cause!r}")
+        self._url = url
+
+    @property
+    def url(self) -> str:
+        """URL of the response that couldn't be parsed."""
+        return self._url
+
+class CircuitOpenError(CorkusException):
+    """Exception that's thrown without sending a request while the API is considered
+    unavailable after too many consecutive failures. See :py:class:`CircuitBreaker <corkus.utils.CircuitBreaker>`."""
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"Wynncraft API is unavailable, requests are paused for {retry_in:.0f} more seconds")
+        self._retry_in = retry_in
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until requests will be sent again."""
+        return self._retry_in
+
 class HTTPError(CorkusException):
     """Exception that's thrown when an HTTP request operation fails."""
     def __init__(self, response: ClientResponse) -> None:
@@ -7,6 +7,8 @@ if TYPE_CHECKING:
     from corkus import Corkus
 
 class CorkusBase(PartialBase):
+    __slots__ = ("_attributes",)
+
     def __init__(self, corkus: Corkus, attributes: dict):
         super().__init__(corkus)
         self._attributes = attributes
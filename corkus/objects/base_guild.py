@@ -4,8 +4,11 @@ from .partial_teritories import PartialTeritories
 from datetime import datetime
 from iso8601 import iso8601
 from .guild_banner import GuildBanner
+from corkus.utils import memoized
 
 class BaseGuild(CorkusBase):
+    __slots__ = ()
+
     @property
     def name(self) -> str:
         """The name of the guild."""
@@ -19,7 +22,7 @@ class BaseGuild(CorkusBase):
         """
         return self._attributes.get("prefix", "")
 
-    @property
+    @memoized
     def created(self) -> datetime:
         """Datetime when guild was created."""
         return iso8601.parse_date(self._attributes.get("created", "1970"))
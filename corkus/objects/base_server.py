@@ -20,6 +20,8 @@ class ServerType(Enum):
     """Different type of the server. Most likely a temporary testing server."""
 
 class BaseServer(CorkusBase):
+    __slots__ = ("_name",)
+
     def __init__(self, corkus: Corkus, name: str, attributes: dict = None):
         self._name = name
         if attributes is None:
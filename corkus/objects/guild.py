@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+from corkus.utils import memoized
 from corkus.utils.utils import Utils
 from .member import Member
-from typing import List, Union, TYPE_CHECKING
+from typing import Dict, List, Union, TYPE_CHECKING
 from .base_guild import BaseGuild
 
 if TYPE_CHECKING:
@@ -14,7 +15,9 @@ class Guild(BaseGuild):
     """`Guilds <https://wynncraft.fandom.com/wiki/Guilds>`_ are Wynncraft communities of people
     that work together to achieve their goals.
     """
-    @property
+    __slots__ = ()
+
+    @memoized
     def members(self) -> List[Member]:
         """List of all members currently in guild."""
         members = []
@@ -40,8 +43,11 @@ class Guild(BaseGuild):
 
         :param player: Player username or player object to check for.
         """
-        username = Utils.player_to_username(player)
-        return any(m for m in self.members if m.username == username)
+        return self._members_by_username.get(Utils.player_to_username(player))
+
+    @memoized
+    def _members_by_username(self) -> Dict[str, Member]:
+        return {m.username: m for m in self.members}
 
     def __repr__(self) -> str:
         return f"<Guild name={self.name!r} tag={self.tag!r} members={len(self.members)}>"
@@ -4,7 +4,7 @@ import iso8601
 from datetime import datetime
 
 from .base import CorkusBase
-from corkus.utils import CorkusEnum
+from corkus.utils import CorkusEnum, memoized
 from .uuid import CorkusUUID
 from .partial_player import PartialPlayer
 
@@ -23,6 +23,8 @@ class GuildRank(CorkusEnum):
 
 class Member(CorkusBase):
     """Represents a member of a :py:class:`Guild`."""
+    __slots__ = ("_guild",)
+
     def __init__(self, corkus: Corkus, guild: Guild, attributes: dict, name: str, rank: str):
         self._guild = guild
         super().__init__(corkus, attributes)
@@ -34,12 +36,12 @@ class Member(CorkusBase):
         """Minecraft username of player."""
         return self._attributes.get("name", "")
 
-    @property
+    @memoized
     def uuid(self) -> CorkusUUID:
         """Minecraft UUID of player."""
         return CorkusUUID(self._attributes.get("uuid", ""))
 
-    @property
+    @memoized
     def rank(self) -> GuildRank:
         """Player's rank in guild."""
         return GuildRank(self._attributes.get("rank", "recruit").upper())
@@ -54,7 +56,7 @@ class Member(CorkusBase):
         """Whether player is currently online."""
         return self._attributes.get("online", False)
 
-    @property
+    @memoized
     def join_date(self) -> datetime:
         """Datetime when player joined the guild."""
         return iso8601.parse_date(self._attributes.get("joined", "1970"))
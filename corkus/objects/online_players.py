@@ -1,26 +1,111 @@
 from __future__ import annotations
-from typing import List
+from sys import intern
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Union
+from uuid import UUID
 
 from .base import CorkusBase
+from corkus.utils import memoized
+from corkus.utils.utils import Utils
 from .uuid import CorkusUUID
 from .server import Server
 from .partial_online_player import PartialOnlinePlayer
 
+if TYPE_CHECKING:
+    from corkus import Corkus
+    from .player import Player
+    from .partial_player import PartialPlayer
+    from .member import Member
+
 class OnlinePlayers(CorkusBase):
-    """List all running servers and players that are online on them."""
-    @property
+    """List all running servers and players that are online on them.
+
+    The response is indexed once when it is received, so checking whether a player is
+    online or which server they are on doesn't scan the player list.
+    """
+    __slots__ = ("_by_uuid", "_server_of", "_players_by_server")
+
+    def __init__(self, corkus: Corkus, attributes: dict, by_uuid: bool = False):
+        super().__init__(corkus, attributes)
+        self._by_uuid = by_uuid
+        self._server_of: Dict[Union[str, CorkusUUID], Optional[str]] = {}
+        self._players_by_server: Dict[Optional[str], List[str]] = {}
+        for player, server in attributes.items():
+            # thousands of players share a few hundred server names
+            if server is not None:
+                server = intern(server)
+            self._server_of[CorkusUUID(player) if by_uuid else intern(player)] = server
+            self._players_by_server.setdefault(server, []).append(player)
+
+    @memoized
     def servers(self) -> List[Server]:
         """List all running servers."""
-        return [Server(self._corkus, s, [p for p, ps in self._attributes.items() if ps == s]) for s in set(self._attributes.values())]
+        return [Server(self._corkus, s, p) for s, p in self._players_by_server.items()]
 
-    @property
+    @memoized
     def players(self) -> List[PartialOnlinePlayer]:
         """List all online players."""
-        return [PartialOnlinePlayer(self._corkus, self, username = p) for p in self._attributes]
+        servers = self._servers_by_name
+        return [PartialOnlinePlayer(self._corkus, servers[s], username = p) for p, s in self._attributes.items()]
 
-    @property
+    @memoized
     def uuid_players(self) -> List[PartialOnlinePlayer]:
-        return [PartialOnlinePlayer(self._corkus, self, uuid=CorkusUUID(p)) for p in self._attributes]
+        """List all online players by UUID. Empty if the list was requested by username."""
+        if not self._by_uuid:
+            return []
+        servers = self._servers_by_name
+        return [PartialOnlinePlayer(self._corkus, servers[s], uuid = p) for p, s in self._server_of.items()]
+
+    @memoized
+    def usernames(self) -> FrozenSet[str]:
+        """Usernames of all online players. Empty if the list was requested by UUID."""
+        return frozenset() if self._by_uuid else frozenset(self._server_of)
+
+    @memoized
+    def uuids(self) -> FrozenSet[CorkusUUID]:
+        """UUIDs of all online players. Empty unless the list was requested by UUID."""
+        return frozenset(self._server_of) if self._by_uuid else frozenset()
+
+    @memoized
+    def server_names(self) -> FrozenSet[str]:
+        """Names of all running servers."""
+        return frozenset(s for s in self._players_by_server if s is not None)
+
+    def is_online(self, player: Union[str, UUID, Player, PartialPlayer, Member]) -> bool:
+        """Whether a player is currently online.
+
+        :param player: Username, or UUID if the list was requested by UUID, or player object.
+        """
+        return self._key(player) in self._server_of
+
+    def server_of(self, player: Union[str, UUID, Player, PartialPlayer, Member]) -> Optional[Server]:
+        """Server that a player is currently on. Returns ``None`` if player is offline.
+
+        :param player: Username, or UUID if the list was requested by UUID, or player object.
+        """
+        key = self._key(player)
+        return self._servers_by_name[self._server_of[key]] if key in self._server_of else None
+
+    @memoized
+    def _servers_by_name(self) -> Dict[str, Server]:
+        return {s.name: s for s in self.servers}
+
+    def _key(self, player: Union[str, UUID, Player, PartialPlayer, Member]) -> Union[str, UUID, None]:
+        if not self._by_uuid:
+            return Utils.player_to_username(player)
+        if isinstance(player, UUID):
+            return player
+        if isinstance(player, str):
+            try:
+                return CorkusUUID(player)
+            except ValueError:
+                return None
+        return player.uuid
+
+    def __len__(self) -> int:
+        return len(self._server_of)
+
+    def __contains__(self, player: Union[str, UUID, Player, PartialPlayer, Member]) -> bool:
+        return self.is_online(player)
 
     def __repr__(self) -> str:
-        return f"<OnlinePlayers servers={len(self.servers)} players={len(self.players)}>"
+        return f"<OnlinePlayers servers={len(self._players_by_server)} players={len(self)}>"
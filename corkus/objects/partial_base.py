@@ -5,5 +5,8 @@ if TYPE_CHECKING:
     from corkus import Corkus
 
 class PartialBase:
+    __slots__ = ("_corkus", "_memo")
+
     def __init__(self, corkus: Corkus):
         self._corkus = corkus
+        self._memo = None
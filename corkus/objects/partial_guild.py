@@ -6,6 +6,8 @@ if TYPE_CHECKING:
     from .guild import Guild
 
 class PartialGuild(CorkusBase):
+    __slots__ = ()
+
     @property
     def name(self) -> str:
         """The name of the guild."""
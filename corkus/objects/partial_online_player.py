@@ -11,6 +11,8 @@ if TYPE_CHECKING:
 
 class PartialOnlinePlayer(PartialPlayer):
     """Represents a :py:class:`PartialPlayer` that is currently online."""
+    __slots__ = ("_server",)
+
     def __init__(self, corkus: Corkus, server: Server, *, uuid: Optional[CorkusUUID] = None, username: Optional[str] = None):
         super().__init__(corkus, uuid = uuid, username = username)
         self._server = server
@@ -12,6 +12,8 @@ class PartialPlayer(PartialBase):
     """Represents a ``Partial`` version of :py:class:`Player`.
     Please note that :py:attr:`username` or :py:attr:`uuid` might
     be ``None`` but always at least one is present."""
+    __slots__ = ("_uuid", "_username")
+
     def __init__(self, corkus: Corkus, *, uuid: Optional[CorkusUUID] = None, username: Optional[str] = None):
         super().__init__(corkus)
         self._uuid = uuid
@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 
 class PartialServer(BaseServer):
     """Represents a ``Partial`` version of :py:class:`Server`."""
+    __slots__ = ()
+
     def __init__(self, corkus: Corkus, name: str):
         super().__init__(corkus, name, None)
 
@@ -7,9 +7,11 @@ from iso8601 import iso8601
 from .base import CorkusBase
 from .partial_guild import PartialGuild
 from .territory_location import TerritoryLocation
+from corkus.utils import memoized
 
 class Territory(CorkusBase):
     """Territories are areas which may be claimed by a :py:class:`Guild` to receive benefits."""
+    __slots__ = ("_name",)
 
     def __init__(self, corkus: Corkus, attributes: dict, name: str):
         super().__init__(corkus, attributes)
@@ -20,7 +22,7 @@ class Territory(CorkusBase):
         """The name of the territory."""
         return self._name
 
-    @property
+    @memoized
     def guild(self) -> Union[PartialGuild, None]:
         """Guild that currently holds the territory."""
         guild = self._attributes.get("guild", None)
@@ -29,7 +31,7 @@ class Territory(CorkusBase):
         else:
             return PartialGuild(self._corkus, guild.get("name", ""))
 
-    @property
+    @memoized
     def acquired(self) -> datetime:
         """Datetime when the territory was acquired."""
         return iso8601.parse_date(self._attributes.get("acquired", "1970"))
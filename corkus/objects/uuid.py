@@ -4,6 +4,8 @@ from uuid import UUID
 
 class CorkusUUID(UUID):
     """Simple class that overlays `UUID <https://docs.python.org/3/library/uuid.html>`_ and simplify it's conversion."""
+    __slots__ = ()
+
     def __init__(self, uuid: str) -> None:
         super().__init__(uuid)
 
@@ -1 +1,4 @@
 from .enum import CorkusEnum
+from .memoized import memoized
+from .ratelimit import RequestPriority
+from .retry import RetryPolicy, CircuitBreaker
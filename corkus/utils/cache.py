@@ -1,8 +1,12 @@
 from __future__ import annotations
-from typing import List, Union
+from collections import OrderedDict
+from heapq import heappush, heappop, heapify
+from typing import List, Optional, Set, Tuple, Union
 import time
 import logging
 
+from .persistent_cache import PersistentCache
+
 logger = logging.getLogger("corkus.cache")
 
 class CacheElement():
@@ -10,11 +14,15 @@ class CacheElement():
         self,
         endpoint_url: str,
         valid_timestamp: int,
-        content: dict
+        content: dict,
+        size: int = 0,
+        headers: Optional[dict] = None
     ) -> None:
         self._url = endpoint_url
         self._valid_timestamp = valid_timestamp
         self._content = content
+        self._size = size
+        self._headers = headers or {}
 
     @property
     def url(self) -> str:
@@ -28,37 +36,219 @@ class CacheElement():
     def content(self) -> dict:
         return self._content
 
+    @property
+    def size(self) -> int:
+        """Size of the response body in bytes, used for the cache byte budget."""
+        return self._size
+
+    @property
+    def headers(self) -> dict:
+        """Caching related headers of the response."""
+        return self._headers
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self._headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self._headers.get("last-modified")
+
+    @property
+    def revalidatable(self) -> bool:
+        """Whether the server can confirm that this element is still up to date."""
+        return self.etag is not None or self.last_modified is not None
+
+    @property
+    def expired(self) -> bool:
+        return self._valid_timestamp <= time.time()
+
+    @property
+    def freshness(self) -> float:
+        """Seconds until this element expires, ``0`` if it already has."""
+        return max(0.0, self._valid_timestamp - time.time())
+
     def __repr__(self) -> str:
-        return f"<CacheElement url={self.url!r} valid_timestamp={self.valid_timestamp}>"
+        return f"<CacheElement url={self.url!r} valid_timestamp={self.valid_timestamp} size={self.size}>"
 
 class CorkusCache:
-    def __init__(self) -> None:
-        self._cache: List[CacheElement] = []
+    """Response cache keyed by URL.
+
+    Lookups are O(1) dict accesses. Expiry times are kept in a min-heap that is only
+    drained lazily when new elements are added, so serving a cached response never scans
+    the whole cache. The cache is bounded by ``max_entries`` and ``max_bytes``; when
+    either is exceeded, the least recently used elements are evicted first.
+
+    If a ``path`` is given, responses are additionally written to a :py:class:`PersistentCache`
+    and loaded back from it on a miss, so a restart does not start with an empty cache.
+
+    Expired elements that carry an ``ETag`` or ``Last-Modified`` validator are kept for
+    another ``stale_ttl`` seconds, so they can be revalidated with a conditional request
+    and reused without downloading and decoding the response again. The same applies to
+    urls marked with :py:meth:`pin`, whose last response is served while it is refreshed.
+    """
+
+    STORED_HEADERS = ("cache-control", "etag", "last-modified", "date", "age")
+
+    def __init__(self,
+        max_entries: Optional[int] = 1024,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        path: Optional[str] = None,
+        stale_ttl: int = 3600
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.persistent = PersistentCache(path, stale_ttl) if path is not None else None
+        self._cache: OrderedDict[str, CacheElement] = OrderedDict()
+        self._expiry: List[Tuple[int, str]] = []
+        self._bytes = 0
+        self._pinned: Set[str] = set()
 
     @property
     def content(self) -> List[CacheElement]:
-        for item in self._cache:
-            if item.valid_timestamp <= time.time():
-                self._cache.remove(item)
-        return self._cache
+        self._purge_expired()
+        return [e for e in self._cache.values() if not e.expired]
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of all cached response bodies."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._cache)
 
     def get(self, url: str) -> Union[CacheElement, None]:
-        element = next((i for i in self.content if i.url == url), None)
+        element = self.get_stale(url)
+        if element is not None and element.expired:
+            element = None
+
         if element is None:
             logger.debug(f"Not found in cache: {url}")
         else:
             logger.debug(f"Serving from cache: {url}")
         return element
 
-    def add(self, url: str, headers: dict, content: dict) -> None:
+    def get_stale(self, url: str) -> Union[CacheElement, None]:
+        """Get an element even if it has already expired, as long as it is still retained."""
+        element = self._cache.get(url)
+        if element is None:
+            return None
+        if self._purge_timestamp(element) <= time.time():
+            self._remove(url)
+            return None
+        self._cache.move_to_end(url)
+        return element
+
+    async def load(self, url: str) -> Union[CacheElement, None]:
+        """Get a retained element from memory, falling back to the persistent cache if
+        there is one. The returned element may be expired."""
+        element = self.get_stale(url)
+        if element is not None or self.persistent is None:
+            return element
+
+        stored = await self.persistent.get(url)
+        if stored is None:
+            return None
+        valid_timestamp, headers, content, size = stored
+        element = CacheElement(url, valid_timestamp, content, size, headers)
+        self._insert(element)
+        return element
+
+    def add(self, url: str, headers: dict, content: dict, size: int = 0) -> CacheElement:
+        seconds = self._lifetime(url, headers)
+        logger.debug(f"Caching: {url} - for {seconds} seconds")
+
+        stored_headers = {k: headers[k] for k in self.STORED_HEADERS if k in headers}
+        element = CacheElement(url, int(time.time()) + seconds, content, size, stored_headers)
+        self._insert(element)
+        if self.persistent is not None:
+            self.persistent.put(url, element.valid_timestamp, stored_headers, content)
+        return element
+
+    def refresh(self, url: str, headers: dict) -> Union[CacheElement, None]:
+        """Extend the lifetime of a retained element after the server confirmed with
+        ``304 Not Modified`` that its content is still up to date."""
+        element = self.get_stale(url)
+        if element is None:
+            return None
+        seconds = self._lifetime(url, headers)
+        logger.debug(f"Revalidated: {url} - for {seconds} seconds")
+
+        stored_headers = dict(element.headers)
+        stored_headers.update({k: headers[k] for k in self.STORED_HEADERS if k in headers})
+        element = CacheElement(url, int(time.time()) + seconds, element.content, element.size, stored_headers)
+        self._insert(element)
+        if self.persistent is not None:
+            self.persistent.put(url, element.valid_timestamp, stored_headers, element.content)
+        return element
+
+    def pin(self, url: str) -> None:
+        """Keep the response of an url for ``stale_ttl`` seconds after it expired."""
+        self._pinned.add(url)
+        element = self._cache.get(url)
+        if element is not None:
+            heappush(self._expiry, (self._purge_timestamp(element), url))
+
+    async def close(self) -> None:
+        if self.persistent is not None:
+            await self.persistent.close()
+
+    def _insert(self, element: CacheElement) -> None:
+        self._purge_expired()
+        self._remove(element.url)
+        self._cache[element.url] = element
+        self._bytes += element.size
+        heappush(self._expiry, (self._purge_timestamp(element), element.url))
+        self._evict()
+
+    def _lifetime(self, url: str, headers: dict) -> int:
+        """Number of seconds a response stays fresh: its ``max-age`` minus the time it
+        already spent in the server cache according to the ``Age`` header."""
         cache_header = headers.get("cache-control", None)
         if cache_header is None:
             logger.debug(f"No cache-control for: {url} - default to 600")
             cache_header = "max-age=600"
-        seconds = cache_header.replace("max-age=", "")
+        seconds = next(
+            (d.strip()[8:] for d in cache_header.split(",") if d.strip().startswith("max-age=")),
+            cache_header
+        )
         if not seconds.isdigit():
             logger.debug(f"Invalid cache-control ({seconds}) for: {url} - default to 600")
             seconds = 600
-        logger.debug(f"Caching: {url} - for {seconds} seconds")
+        age = headers.get("age", "0")
+        age = int(age) if age.isdigit() else 0
+        return max(0, int(seconds) - age)
+
+    def _purge_timestamp(self, element: CacheElement) -> int:
+        if element.revalidatable or element.url in self._pinned:
+            return element.valid_timestamp + self.stale_ttl
+        return element.valid_timestamp
+
+    def _remove(self, url: str) -> Optional[CacheElement]:
+        element = self._cache.pop(url, None)
+        if element is not None:
+            self._bytes -= element.size
+        return element
+
+    def _purge_expired(self) -> None:
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            purge_timestamp, url = heappop(self._expiry)
+            element = self._cache.get(url)
+            # the heap may hold outdated entries of urls that were cached again since
+            if element is not None and self._purge_timestamp(element) == purge_timestamp:
+                self._remove(url)
+
+        if len(self._expiry) > 2 * len(self._cache) + 64:
+            self._expiry = [(self._purge_timestamp(e), u) for u, e in self._cache.items()]
+            heapify(self._expiry)
 
-        self._cache.append(CacheElement(url, int(time.time()) + int(seconds), content))
+    def _evict(self) -> None:
+        while self._cache and (
+            (self.max_entries is not None and len(self._cache) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            url, element = self._cache.popitem(last = False)
+            self._bytes -= element.size
+            logger.debug(f"Evicting from cache: {url}")
@@ -0,0 +1,31 @@
+from __future__ import annotations
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+class memoized(Generic[T]):
+    """Property that is computed on first access and then stored on the object.
+
+    Works like :py:func:`functools.cached_property`, but keeps its values in the
+    ``_memo`` slot of :py:class:`PartialBase <corkus.objects.partial_base.PartialBase>`
+    so it can be used on classes with ``__slots__``. Objects are never changed after
+    they are created from an API response, so their values can't get outdated.
+    """
+
+    def __init__(self, func: Callable[[Any], T]) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Optional[Any], owner: Optional[type] = None) -> T:
+        if obj is None:
+            return self
+        memo = obj._memo
+        if memo is None:
+            memo = obj._memo = {}
+        if self.name not in memo:
+            memo[self.name] = self.func(obj)
+        return memo[self.name]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("corkus.persistent_cache")
+
+class PersistentCache:
+    """SQLite file that keeps cached responses across restarts.
+
+    All database access happens on a single worker thread so reading or writing large
+    responses never blocks the event loop. Entries are only loaded when they are requested
+    and are ignored once their stored expiry timestamp is more than ``stale_ttl`` seconds
+    in the past.
+    """
+
+    PURGE_INTERVAL = 100
+
+    def __init__(self, path: str, stale_ttl: int = 0) -> None:
+        self.path = path
+        self.stale_ttl = stale_ttl
+        self._executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "corkus-cache")
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " valid_timestamp INTEGER NOT NULL,"
+                " headers TEXT NOT NULL,"
+                " content TEXT NOT NULL"
+                ")"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_valid ON responses (valid_timestamp)")
+            self._local.connection = connection
+        return connection
+
+    async def get(self, url: str) -> Optional[Tuple[int, dict, dict, int]]:
+        """Load a response that is still retained. Returns a tuple of its expiry
+        timestamp, the stored headers, the parsed content and its size in bytes."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._get, url)
+
+    def put(self, url: str, valid_timestamp: int, headers: dict, content: dict) -> None:
+        """Store a response in the background."""
+        future = self._executor.submit(self._put, url, valid_timestamp, headers, content)
+        future.add_done_callback(self._log_failure)
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close)
+        self._executor.shutdown(wait = False)
+
+    def _get(self, url: str) -> Optional[Tuple[int, dict, dict, int]]:
+        row = self._connection().execute(
+            "SELECT valid_timestamp, headers, content FROM responses WHERE url = ? AND valid_timestamp > ?",
+            (url, int(time.time()) - self.stale_ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        logger.debug(f"Loaded from disk: {url}")
+        return row[0], json.loads(row[1]), json.loads(row[2]), len(row[2])
+
+    def _put(self, url: str, valid_timestamp: int, headers: dict, content: dict) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (url, valid_timestamp, json.dumps(headers), json.dumps(content))
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_INTERVAL == 0:
+                connection.execute(
+                    "DELETE FROM responses WHERE valid_timestamp <= ?",
+                    (int(time.time()) - self.stale_ttl,)
+                )
+
+    def _close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @staticmethod
+    def _log_failure(future) -> None:
+        exception = future.exception()
+        if exception is not None:
+            logger.warning(f"Failed to persist response: {exception}")
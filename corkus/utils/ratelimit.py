@@ -1,15 +1,57 @@
 from __future__ import annotations
+from contextvars import ContextVar
+from enum import IntEnum
+from heapq import heappush, heappop
+from itertools import count
+from typing import Dict, Hashable, List, Optional, Tuple
 import time
 import logging
 import asyncio
 
 logger = logging.getLogger("corkus.ratelimit")
 
+class RequestPriority(IntEnum):
+    """Priority of a request waiting for the rate limiter. Requests with a lower value
+    are sent first when the limiter is out of tokens."""
+
+    INTERACTIVE = 0
+    """Requests a user is actively waiting for, like bot commands."""
+
+    NORMAL = 1
+    """Default priority."""
+
+    BACKGROUND = 2
+    """Periodic polling that can be delayed without anyone noticing."""
+
+current_priority: ContextVar[RequestPriority] = ContextVar("corkus_request_priority", default = RequestPriority.NORMAL)
+
 class RateLimiter:
-    def __init__(self) -> None:
+    """Token bucket that paces requests ahead of time instead of waiting for the API to
+    reject them.
+
+    The bucket holds up to :py:attr:`total` tokens and refills continuously at
+    ``total / window`` tokens per second. It is synchronized with the ``ratelimit-*``
+    headers of every response, so it never holds more tokens than the API reports as
+    remaining. When no tokens are left, callers are queued and released in order of their
+    :py:class:`RequestPriority`.
+    """
+
+    def __init__(self, window: int = 60) -> None:
         self._total = 180
         self._remaining = 180
         self._reset = 0
+        self._window = window
+        self._tokens = float(self._total)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._keyed: Dict[Hashable, Tuple[int, int, asyncio.Future]] = {}
+        self._sequence = count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._requests = 0
+        self._waited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
 
     @property
     def total(self) -> int:
@@ -29,12 +71,123 @@ class RateLimiter:
         else:
             return self._reset - int(time.time())
 
-    async def limit(self) -> None:
-        if self.remaining < -1:
-            logger.info(f"You are being ratelimited, waiting for {self.reset}s")
-            await asyncio.sleep(self.reset)
+    @property
+    def tokens(self) -> float:
+        """Number of requests that can currently be sent without waiting."""
+        self._refill()
+        return self._tokens
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting for a token."""
+        # a promoted request is in the queue once per priority it had
+        return len({id(future) for _, _, future in self._waiters if not future.done()})
+
+    @property
+    def requests(self) -> int:
+        """Number of requests that passed the limiter."""
+        return self._requests
+
+    @property
+    def delayed_requests(self) -> int:
+        """Number of requests that had to wait for a token."""
+        return self._waited
+
+    @property
+    def average_wait(self) -> float:
+        """Average time in seconds a request spent waiting for a token."""
+        return self._total_wait / self._requests if self._requests else 0.0
+
+    @property
+    def max_wait(self) -> float:
+        """Longest time in seconds a request spent waiting for a token."""
+        return self._max_wait
+
+    async def limit(self, priority: Optional[RequestPriority] = None, key: Optional[Hashable] = None) -> None:
+        """Wait for a token. A waiting request with a ``key`` can be moved ahead in the
+        queue with :py:meth:`promote`."""
+        if priority is None:
+            priority = current_priority.get()
+        start = time.monotonic()
+
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record(0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._sequence), future)
+        heappush(self._waiters, entry)
+        if key is not None:
+            self._keyed[key] = entry
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        try:
+            await future
+        finally:
+            if key is not None and self._keyed.get(key, (0, 0, None))[2] is future:
+                priority = RequestPriority(self._keyed.pop(key)[0])
+
+        waited = time.monotonic() - start
+        self._record(waited)
+        logger.debug(f"Waited {waited:.2f}s for ratelimit with {priority.name} priority")
+
+    def promote(self, key: Hashable, priority: RequestPriority) -> None:
+        """Raise the priority of the request waiting with ``key``, if it is lower."""
+        entry = self._keyed.get(key)
+        if entry is None or entry[2].done() or priority >= entry[0]:
+            return
+        # the old entry stays in the heap and is skipped once its future is done,
+        # the sequence number keeps the request's place among equal priorities
+        promoted = (int(priority), entry[1], entry[2])
+        heappush(self._waiters, promoted)
+        self._keyed[key] = promoted
 
     def update(self, headers: dict) -> None:
         self._total = int(headers.get("ratelimit-limit", 180))
         self._remaining = int(headers.get("ratelimit-remaining", 180))
         self._reset = int(time.time()) + int(headers.get("ratelimit-reset", 0))
+
+        self._refill()
+        self._tokens = max(0.0, min(self._tokens, self._remaining))
+        if self._remaining <= 0 and self.reset > 0:
+            logger.info(f"You are being ratelimited, pausing requests for {self.reset}s")
+            self._blocked_until = time.monotonic() + self.reset
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now < self._blocked_until:
+            self._last_refill = now
+            return
+        rate = self._total / self._window
+        self._tokens = min(float(self._total), self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+    def _next_token_in(self) -> float:
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        return max(0.0, (1 - self._tokens) * self._window / max(self._total, 1))
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            self._refill()
+            # skip callers that were cancelled while waiting and entries left behind by a promotion
+            while self._waiters and self._waiters[0][2].done():
+                heappop(self._waiters)
+            if not self._waiters:
+                break
+            if self._tokens >= 1:
+                _, _, future = heappop(self._waiters)
+                self._tokens -= 1
+                future.set_result(None)
+            else:
+                await asyncio.sleep(self._next_token_in())
+
+    def _record(self, waited: float) -> None:
+        self._requests += 1
+        if waited > 0:
+            self._waited += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
@@ -1,18 +1,33 @@
 from __future__ import annotations
-from typing import Optional
+from typing import AsyncIterator, Callable, Dict, Hashable, Optional, Tuple, TypeVar, Union
 from enum import Enum
 import asyncio
 from aiohttp.client import ClientSession, ClientResponse
+from aiohttp import ClientError
 import copy
 import logging
+import time
 
-from .cache import CorkusCache
-from .ratelimit import RateLimiter
+from .cache import CacheElement, CorkusCache
+from .ratelimit import RateLimiter, RequestPriority, current_priority
+from .retry import RetryPolicy, CircuitBreaker
 from corkus.version import __version__
-from corkus.errors import BadRequest, WynncraftServerError, RatelimitExceeded, HTTPError, CorkusTimeoutError
+from corkus.errors import (
+    CorkusException,
+    BadRequest,
+    WynncraftServerError,
+    RatelimitExceeded,
+    HTTPError,
+    CorkusTimeoutError,
+    CorkusConnectionError,
+    ResponseParseError
+)
 
 logger = logging.getLogger("corkus.request")
 
+K = TypeVar("K", bound = Hashable)
+T = TypeVar("T")
+
 class APIVersion(Enum):
     V1 = "https://api.wynncraft.com/public_api.php?action="
     V2 = "https://api.wynncraft.com/v2/"
@@ -21,17 +36,42 @@ class APIVersion(Enum):
 class CorkusRequest:
     """CorkusRequest is a internal overlay over aiohttp to simplify API calls."""
 
+    PREFETCH_LEAD = 5
+    """Seconds before expiry at which hot urls are refreshed in the background."""
+
+    PREFETCH_RETRY = 30
+    """Seconds to wait before refreshing a hot url again after a failed refresh."""
+
+    MAX_CONCURRENCY = 8
+    """Default number of requests :py:meth:`get_many` sends at the same time."""
+
     def __init__(self,
         timeout: Optional[int] = 0,
         disable_ratelimit: Optional[bool] = False,
         disable_cache: Optional[bool] = False,
+        cache_max_entries: Optional[int] = 1024,
+        cache_max_bytes: Optional[int] = 64 * 1024 * 1024,
+        cache_path: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ) -> None:
         self.ratelimit = RateLimiter()
-        self.cache = CorkusCache()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.cache = CorkusCache(cache_max_entries, cache_max_bytes, cache_path)
         self.disable_ratelimit = disable_ratelimit
         self.disable_cache = disable_cache
         self.timeout = timeout
         self._session: Optional[ClientSession] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._in_flight_priority: Dict[str, RequestPriority] = {}
+        self._hot: Dict[str, float] = {}
+        self._prefetcher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
 
     async def start(self, api_key: Optional[str]):
         headers = {
@@ -44,34 +84,188 @@ class CorkusRequest:
 
 
     async def get(self, version: Optional[APIVersion], parameters: str, timeout: Optional[int]) -> dict:
-        if version is not None:
-            url = version.value + parameters
-        else:
-            url = parameters
+        url = self._url(version, parameters)
 
         if timeout is None:
             timeout = self.timeout
 
+        cache_element = None
         if not self.disable_cache:
-            cache_element = self.cache.get(url)
-            if cache_element:
+            cache_element = await self.cache.load(url)
+            if cache_element and not cache_element.expired:
+                self.hits += 1
                 return copy.copy(cache_element.content)
+            if cache_element and url in self._hot:
+                self.stale_hits += 1
+                # hot urls serve the last good response while it is refreshed in the background
+                logger.debug(f"Serving stale while revalidating: {url}")
+                self._request(url, timeout, cache_element, RequestPriority.NORMAL)
+                return copy.copy(cache_element.content)
+
+        self.misses += 1
+        # shield the shared request from being cancelled together with one of its callers
+        data = await asyncio.shield(self._request(url, timeout, cache_element))
+        return copy.copy(data)
 
+    async def get_many(self,
+        version: Optional[APIVersion],
+        parameters: Dict[K, str],
+        timeout: Optional[int],
+        concurrency: Optional[int] = None,
+        parse: Optional[Callable[[dict], T]] = None
+    ) -> AsyncIterator[Tuple[K, Union[T, CorkusException]]]:
+        """Request many urls concurrently and yield ``(key, result)`` pairs in the order
+        the requests complete. A failed request yields its exception as result instead of
+        aborting the others, a response that ``parse`` fails on yields a
+        :py:exc:`ResponseParseError <corkus.errors.ResponseParseError>`.
+
+        At most ``concurrency`` requests are in flight at once. By default this is
+        limited to the number of requests the rate limiter can send right away, so a
+        large batch is paced by the limiter instead of queueing all of its requests.
+        """
+        if not parameters:
+            return
+        if concurrency is None:
+            concurrency = self.MAX_CONCURRENCY
+            if not self.disable_ratelimit:
+                concurrency = max(1, min(concurrency, int(self.ratelimit.tokens)))
+
+        pending = iter(parameters.items())
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker() -> None:
+            for key, route in pending:
+                try:
+                    result = await self.get(version, route, timeout)
+                    if parse is not None:
+                        result = parse(result)
+                except CorkusException as e:
+                    result = e
+                except Exception as e:
+                    result = ResponseParseError(self._url(version, route), e)
+                results.put_nowait((key, result))
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(parameters)))]
+        try:
+            for _ in range(len(parameters)):
+                yield await results.get()
+        finally:
+            for task in workers:
+                task.cancel()
+
+    def keep_fresh(self, version: Optional[APIVersion], parameters: str) -> None:
+        """Mark an url as hot. Hot urls are refreshed in the background shortly before
+        their cached response expires, and an expired response is served immediately
+        while a newer one is fetched."""
+        if self.disable_cache:
+            return
+        url = self._url(version, parameters)
+        if url in self._hot:
+            return
+        self._hot[url] = 0
+        self.cache.pin(url)
+        self._wakeup.set()
+        if self._prefetcher is None or self._prefetcher.done():
+            self._prefetcher = asyncio.ensure_future(self._prefetch())
+
+    def freshness(self, version: Optional[APIVersion], parameters: str) -> float:
+        """Seconds until the cached response of an url expires, ``0`` if it isn't cached."""
+        element = self.cache.get_stale(self._url(version, parameters))
+        return 0.0 if element is None else element.freshness
+
+    def _request(self,
+        url: str,
+        timeout: int,
+        stale: Optional[CacheElement] = None,
+        priority: Optional[RequestPriority] = None,
+        method: str = "GET"
+    ) -> asyncio.Future:
+        if priority is None:
+            priority = current_priority.get()
+        # coalesce concurrent requests for the same url into a single api call
+        future = self._in_flight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(method, url, timeout, stale, priority))
+            self._in_flight[url] = future
+            self._in_flight_priority[url] = priority
+            future.add_done_callback(lambda f: self._request_done(url, f))
+        else:
+            logger.debug(f"Joining in-flight request: {url}")
+            # the shared request is sent with the priority of its most urgent caller
+            if priority < self._in_flight_priority[url]:
+                self._in_flight_priority[url] = priority
+                self.ratelimit.promote(url, priority)
+        return future
+
+    async def _fetch(self,
+        method: str,
+        url: str,
+        timeout: int,
+        stale: Optional[CacheElement] = None,
+        priority: Optional[RequestPriority] = None
+    ) -> dict:
+        attempt = 0
+        while True:
+            self.circuit_breaker.before_request()
+            try:
+                priority = self._in_flight_priority.get(url, priority)
+                data = await self._send(method, url, timeout, stale, priority)
+            except CorkusException as e:
+                if CircuitBreaker.is_failure(e):
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                if not self.retry_policy.should_retry(method, e, attempt):
+                    raise
+
+                delay = self.retry_policy.delay(attempt)
+                if isinstance(e, RatelimitExceeded):
+                    delay = max(delay, self.ratelimit.reset)
+                attempt += 1
+                logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempt}): {e}")
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                self.retry_policy.record_success()
+                return data
+
+    async def _send(self,
+        method: str,
+        url: str,
+        timeout: int,
+        stale: Optional[CacheElement] = None,
+        priority: Optional[RequestPriority] = None
+    ) -> dict:
         if not self.disable_ratelimit:
-            await self.ratelimit.limit()
+            await self.ratelimit.limit(priority, key = url)
+
+        # ask the server to only send the response if it changed since it was cached
+        headers = {}
+        if stale is not None and stale.etag is not None:
+            headers["If-None-Match"] = stale.etag
+        if stale is not None and stale.last_modified is not None:
+            headers["If-Modified-Since"] = stale.last_modified
 
         try:
-            response = await self._session.get(url, timeout = timeout)
+            response = await self._session.request(method, url, timeout = timeout, headers = headers)
+            if response.status == 304 and stale is not None:
+                self.revalidations += 1
+                self.ratelimit.update(response.headers)
+                element = self.cache.refresh(url, response.headers) or stale
+                return element.content
             data = await response.json()
+            size = len(await response.read())
         except asyncio.TimeoutError:
             raise CorkusTimeoutError(timeout, url)
+        except ClientError as e:
+            raise CorkusConnectionError(url, e) from e
 
         self.ratelimit.update(response.headers)
         self._fix_status_codes(data, response)
 
         if 200 <= response.status < 400:
-            self.cache.add(url, response.headers, data)
-            return copy.copy(data)
+            self.cache.add(url, response.headers, data, size)
+            return data
 
         elif response.status >= 500:
             raise WynncraftServerError(response)
@@ -82,7 +276,59 @@ class CorkusRequest:
         else:
             raise HTTPError(response)
 
+    @staticmethod
+    def _url(version: Optional[APIVersion], parameters: str) -> str:
+        if version is not None:
+            return version.value + parameters
+        return parameters
+
+    def _request_done(self, url: str, future: asyncio.Future) -> None:
+        if self._in_flight.get(url) is future:
+            del self._in_flight[url]
+            del self._in_flight_priority[url]
+        # mark the exception as retrieved in case every caller was cancelled in the meantime
+        exception = None if future.cancelled() else future.exception()
+
+        if url in self._hot:
+            if exception is not None:
+                logger.warning(f"Failed to refresh hot url {url}: {exception}")
+            self._schedule(url)
+
+    def _schedule(self, url: str) -> None:
+        """Pick the next time the prefetcher refreshes a hot url."""
+        element = self.cache.get_stale(url)
+        now = time.time()
+        due = now + self.PREFETCH_RETRY
+        if element is not None and element.valid_timestamp - self.PREFETCH_LEAD > now:
+            due = element.valid_timestamp - self.PREFETCH_LEAD
+        elif element is not None and element.valid_timestamp > now:
+            # the server handed out the same cached response again, wait until it expires
+            due = element.valid_timestamp
+        self._hot[url] = due
+        self._wakeup.set()
+
+    async def _prefetch(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            for url, due in self._hot.items():
+                if due <= now:
+                    # rescheduled once the request completes
+                    self._hot[url] = float("inf")
+                    if url not in self._in_flight:
+                        logger.debug(f"Prefetching: {url}")
+                    self._request(url, self.timeout, self.cache.get_stale(url), RequestPriority.NORMAL)
+
+            wait = min(min(self._hot.values()) - time.time(), 60)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout = max(wait, 0))
+            except asyncio.TimeoutError:
+                pass
+
     async def close(self) -> None:
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+        await self.cache.close()
         return await self._session.close()
 
     def _fix_status_codes(self, data: dict, response: ClientResponse) -> None:
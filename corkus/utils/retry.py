@@ -0,0 +1,134 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+import random
+import time
+import logging
+
+from corkus.errors import (
+    CorkusException,
+    CorkusTimeoutError,
+    CorkusConnectionError,
+    CircuitOpenError,
+    RatelimitExceeded,
+    WynncraftServerError
+)
+
+logger = logging.getLogger("corkus.retry")
+
+class RetryPolicy:
+    """Decides whether and when a failed request is sent again.
+
+    Only requests with an idempotent method are retried, and only after errors that are
+    likely to be temporary: timeouts, connection errors, server errors and exceeded
+    ratelimits. Delays grow exponentially with full jitter. Retries are additionally
+    limited by a budget that every retry draws from and every successful request slowly
+    refills, so a failing API is not hit with several times the usual amount of requests.
+
+    :param max_retries: Maximum number of retries for a single request.
+    :param base_delay: Upper bound in seconds of the delay before the first retry.
+    :param max_delay: Upper bound in seconds of any retry delay.
+    :param budget: Maximum number of retries that can be made in a burst.
+    :param budget_ratio: Fraction of a retry that is added back to the budget per success.
+    :param methods: HTTP methods that are safe to retry.
+    """
+
+    def __init__(self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        budget: float = 10.0,
+        budget_ratio: float = 0.1,
+        methods: Tuple[str, ...] = ("GET", "HEAD", "OPTIONS")
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_budget = budget
+        self.budget_ratio = budget_ratio
+        self.methods = methods
+        self._budget = budget
+
+    @property
+    def budget(self) -> float:
+        """Number of retries that can currently be made."""
+        return self._budget
+
+    def should_retry(self, method: str, exception: CorkusException, attempt: int) -> bool:
+        if method not in self.methods or attempt >= self.max_retries:
+            return False
+        if not isinstance(exception, (CorkusTimeoutError, CorkusConnectionError, WynncraftServerError, RatelimitExceeded)):
+            return False
+        if self._budget < 1:
+            logger.debug("Retry budget exhausted")
+            return False
+        self._budget -= 1
+        return True
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def record_success(self) -> None:
+        self._budget = min(self.max_budget, self._budget + self.budget_ratio)
+
+class CircuitBreaker:
+    """Stops sending requests while the API is down.
+
+    After ``failure_threshold`` consecutive failed requests the circuit opens and every
+    request fails immediately with :py:exc:`CircuitOpenError <corkus.errors.CircuitOpenError>`.
+    After ``recovery_timeout`` seconds a single probe request is let through; the circuit
+    closes again if it succeeds and stays open for another period if it fails.
+
+    :param failure_threshold: Consecutive failures after which the circuit opens.
+    :param recovery_timeout: Seconds to wait before probing the API again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.recovery_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    @property
+    def _probing(self) -> bool:
+        # a probe that never reported back (e.g. because it was cancelled) is given up on
+        return self._probe_started is not None and time.monotonic() - self._probe_started < self.recovery_timeout
+
+    def before_request(self) -> None:
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+            retry_in = self.recovery_timeout - (time.monotonic() - self._opened_at)
+            raise CircuitOpenError(max(0.0, retry_in))
+        if state == self.HALF_OPEN:
+            self._probe_started = time.monotonic()
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Wynncraft API is reachable again, closing circuit")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+            logger.warning(f"Wynncraft API failed {self._failures} times in a row, pausing requests for {self.recovery_timeout}s")
+            self._opened_at = time.monotonic()
+        self._probe_started = None
+
+    @staticmethod
+    def is_failure(exception: CorkusException) -> bool:
+        """Whether an error indicates that the API itself is unavailable."""
+        return isinstance(exception, (CorkusTimeoutError, CorkusConnectionError, WynncraftServerError))
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from logging import Logger, getLogger
 from os import getenv, listdir
 
@@ -9,8 +10,10 @@ from discord.ext.commands.errors import ExtensionFailed
 
 from pianobot.db.db_manager import DBManager
 from pianobot.tasks import TaskRunner
-from pianobot.utils import DiscordLogHandler, get_prefix
+from pianobot.utils import DiscordLogHandler, GuildRegistry, Histogram, get_prefix
 from pianobot.utils.guild_tomes import GuildTomeView
+from pianobot.utils.loop_lag import LoopLagMonitor
+from pianobot.utils.metrics import MetricsServer
 
 
 class Pianobot(Bot):
@@ -19,9 +22,9 @@ class Pianobot(Bot):
     enable_tracking: bool
     logger: Logger
     session: ClientSession
-    member_update_channel: str | None
-    xp_tracking_channel: str | None
     tome_log_channel: TextChannel | None = None
+    task_runner: TaskRunner | None = None
+    metrics_server: MetricsServer | None = None
     has_started: bool = False
 
     def __init__(self) -> None:
@@ -43,20 +46,32 @@ class Pianobot(Bot):
         self.logger = getLogger('bot')
         self.enable_tracking = True
         self.database = DBManager()
+        self.command_latency: dict[str, Histogram] = {}
+        self.loop_lag = LoopLagMonitor()
 
-        with open('tracked_guilds.txt', 'r', encoding='UTF-8') as file:
-            self.tracked_guilds: dict[str, str] = {
-                name: tag for line in file for (name, tag) in [line.strip().split(':')]
-            }
+        self.tracked_guilds = GuildRegistry.load()
 
     async def setup_hook(self) -> None:
-        self.corkus = Corkus()
+        self.corkus = Corkus(cache_path=getenv('CORKUS_CACHE_PATH'))
         await self.corkus.start(getenv('WYNN_API_KEY'))
+        self.corkus.keep_fresh(
+            *(f'guild/{guild.name}' for guild in self.tracked_guilds.with_pipelines()),
+            'player',
+            'player?identifier=uuid',
+            'guild/list/territory',
+        )
         await self.database.connect()
-        await self.database.guild_activity.update_columns(list(self.tracked_guilds.keys()))
-        await self.database.guild_activity.cleanup()
-        await self.database.guild_xp.cleanup()
+        await self.database.servers.load(listen=getenv('PG_LISTEN', '') != '')
+        await self.database.guild_activity.create()
+        await self.database.guild_xp.create()
+        await self.database.partitions.maintain()
+        await self.database.guild_xp.warm()
         self.session = ClientSession()
+        self.loop_lag.start()
+
+        if metrics_port := int(getenv('METRICS_PORT', 0)):
+            self.metrics_server = MetricsServer(self, metrics_port)
+            await self.metrics_server.start()
 
         if tome_message_id := int(getenv('TOME_MESSAGE_ID', 0)):
             self.add_view(GuildTomeView(self), message_id=tome_message_id)
@@ -75,20 +90,6 @@ class Pianobot(Bot):
             return
         self.has_started = True
 
-        self.member_update_channel = getenv('MEMBER_CHANNEL', '')
-        # member_update_channel = self.get_channel(int(getenv('MEMBER_CHANNEL', 0)))
-        # if isinstance(member_update_channel, TextChannel):
-        #     self.member_update_channel = member_update_channel
-        # elif getenv('MEMBER_CHANNEL') is not None:
-        #     self.logger.warning('Member update channel %s not found', getenv('MEMBER_CHANNEL'))
-
-        self.xp_tracking_channel = getenv('XP_CHANNEL', '')
-        # xp_tracking_channel = self.get_channel(int(getenv('XP_CHANNEL', 0)))
-        # if isinstance(xp_tracking_channel, TextChannel):
-        #     self.xp_tracking_channel = xp_tracking_channel
-        # elif getenv('XP_CHANNEL') is not None:
-        #     self.logger.warning('XP tracking channel %s not found', getenv('XP_CHANNEL'))
-
         tome_log_channel = self.get_channel(int(getenv('TOME_CHANNEL', 0)))
         if isinstance(tome_log_channel, TextChannel):
             self.tome_log_channel = tome_log_channel
@@ -99,11 +100,25 @@ class Pianobot(Bot):
 
         self.logger.info('Booted up')
 
-        await TaskRunner(self).start_tasks()
+        self.task_runner = TaskRunner(self)
+        await self.task_runner.start_tasks()
+
+    def record_command_latency(self, name: str, invoked_at: datetime) -> None:
+        latency = (datetime.now(timezone.utc) - invoked_at).total_seconds()
+        self.command_latency.setdefault(name, Histogram()).observe(latency)
 
     async def close(self) -> None:
+        if self.task_runner is not None:
+            self.task_runner.stop_tasks()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        self.loop_lag.stop()
         if self.corkus is not None:
             await self.corkus.close()
+        try:
+            await self.database.players.flush()
+        except Exception:
+            self.logger.exception('Failed to save last seen times')
         await self.database.disconnect()
         if self.session is not None:
             await self.session.close()
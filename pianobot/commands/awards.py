@@ -25,6 +25,7 @@ class Awards(Cog):
     async def awards(self, ctx: Context[Bot], *, sort_by: str = 'raids') -> None:
         dt = datetime.now(timezone.utc)
         current_cycle = get_cycle(dt)
+        guild = self.bot.tracked_guilds.primary.name
         prev_cycle = get_cycle(dt - timedelta(days=20 if 8 < dt.day < 15 or 22 < dt.day else 10))
 
         if dt.day < 15:
@@ -34,10 +35,10 @@ class Awards(Cog):
             start_date = datetime(dt.year, dt.month, 15, tzinfo=timezone.utc)
             end_date = datetime(dt.year + dt.month // 12, (dt.month + 1) % 12, 1, tzinfo=timezone.utc)
 
-        results = await self.bot.database.guild_award_stats.get_for_cycle(current_cycle)
-        prev_results = await self.bot.database.guild_award_stats.get_for_cycle(prev_cycle)
+        results = await self.bot.database.guild_award_stats.get_for_cycle(guild, current_cycle)
+        prev_results = await self.bot.database.guild_award_stats.get_for_cycle(guild, prev_cycle)
         # prev_raids = {entry.username: entry.raid_count for entry in prev_results}
-        raid_results = await self.bot.database.raid_log.get_between(start_date)
+        raid_results = await self.bot.database.raid_log.get_between(guild, start_date)
         prev_wars = {entry.username: entry.wars for entry in prev_results}
         prev_xp = {entry.username: entry.xp for entry in prev_results}
 
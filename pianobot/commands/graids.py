@@ -34,10 +34,11 @@ class GuildRaids(Cog):
         usage='[raid] [days since start] [days since end]',
     )
     async def graids(self, ctx: Context[Bot], *, arg: str = '') -> None:
+        guild = self.bot.tracked_guilds.primary.name
         args = arg.split() or ['']
         if len(args) > 0 and args[0].lower() in ('e', 'emeralds', 'p', 'pending'):
             if len(args) >= 2 and args[1].lower() in ('l', 'left'):
-                raids = await self.bot.database.raid_members.get_pending_left()
+                raids = await self.bot.database.raid_members.get_pending_left(guild)
                 if raids:
                     data = [
                         [raid, str(count // 4096)]
@@ -65,14 +66,14 @@ class GuildRaids(Cog):
                 if len(args) < 3:
                     await ctx.send('Please specify a user to reset the raids for.')
                 elif ctx.author.guild_permissions.administrator:
-                    if await self.bot.database.raid_members.reset_pending(args[2]):
+                    if await self.bot.database.raid_members.reset_pending(guild, args[2]):
                         await ctx.send(f'Pending emeralds of `{args[2]}` have been reset.')
                     else:
                         await ctx.send(f'Username `{args[2]}` not found.')
                 else:
                     await ctx.send('You do not have the required permissions to reset the raids.')
                 return
-            raids = await self.bot.database.raid_members.get_pending()
+            raids = await self.bot.database.raid_members.get_pending(guild)
             if raids:
                 data = [
                     [raid, str(count // 4096)]
@@ -85,7 +86,7 @@ class GuildRaids(Cog):
                 await ctx.send('No new raids have been logged.')
         elif len(args) > 0 and args[0].lower() in ('a', 'aspects'):
             if len(args) >= 2 and args[1].lower() in ('l', 'left'):
-                raids = await self.bot.database.raid_members.get_aspects_left()
+                raids = await self.bot.database.raid_members.get_aspects_left(guild)
                 if raids:
                     data = [
                         [raid, str(count // 2)]
@@ -101,10 +102,10 @@ class GuildRaids(Cog):
                     if len(args) < 3:
                         await ctx.send('Please specify a user (or `all`) to reset the raids for.')
                     elif args[2] == 'all':
-                        await self.bot.database.raid_members.reset_aspects()
+                        await self.bot.database.raid_members.reset_aspects(guild)
                         await ctx.send(f'All pending aspects have been reset.')
                     else:
-                        if await self.bot.database.raid_members.reset_aspects(args[2]):
+                        if await self.bot.database.raid_members.reset_aspects(guild, args[2]):
                             await ctx.send(f'Pending aspects of `{args[2]}` have been reset.')
                         else:
                             await ctx.send(f'Username `{args[2]}` not found.')
@@ -116,7 +117,7 @@ class GuildRaids(Cog):
                     if len(args) < 3:
                         await ctx.send('Please specify a user to allow aspects for.')
                     else:
-                        if await self.bot.database.raid_members.set_aspects(args[2], 0):
+                        if await self.bot.database.raid_members.set_aspects(guild, args[2], 0):
                             await ctx.send(f'`{args[2]}` is now receiving aspects again.')
                         else:
                             await ctx.send(f'Username `{args[2]}` not found.')
@@ -126,20 +127,20 @@ class GuildRaids(Cog):
             if len(args) >= 2 and args[1].lower() in ('b', 'block'):
                 if any(r for r in ctx.author.roles if r.id in ASPECT_ROLES):
                     if len(args) < 3:
-                        blocked_members = await self.bot.database.raid_members.get_blocked_aspects()
+                        blocked_members = await self.bot.database.raid_members.get_blocked_aspects(guild)
                         if blocked_members:
                             await ctx.send('Blocked members:\n' + '\n'.join(sorted(blocked_members)))
                         else:
                             await ctx.send('No members are currently blocked from receiving aspects.')
                     else:
-                        if await self.bot.database.raid_members.set_aspects(args[2], -1):
+                        if await self.bot.database.raid_members.set_aspects(guild, args[2], -1):
                             await ctx.send(f'`{args[2]}` is now no longer receiving aspects.')
                         else:
                             await ctx.send(f'Username `{args[2]}` not found.')
                 else:
                     await ctx.send('You do not have the required permissions to manage aspects.')
                 return
-            raids = await self.bot.database.raid_members.get_aspects()
+            raids = await self.bot.database.raid_members.get_aspects(guild)
             if raids:
                 now = datetime.now(timezone.utc)
                 data = [
@@ -169,9 +170,9 @@ class GuildRaids(Cog):
             start = now - timedelta(days=times[0]) if times else None
             end = now - timedelta(days=times[1]) if len(times) > 1 else None
             if raid is None:
-                results = await self.bot.database.raid_log.get_between(start, end)
+                results = await self.bot.database.raid_log.get_between(guild, start, end)
             else:
-                results = await self.bot.database.raid_log.get_specific_between(raid, start, end)
+                results = await self.bot.database.raid_log.get_specific_between(guild, raid, start, end)
             if results:
                 data = [
                     [raid, str(count)]
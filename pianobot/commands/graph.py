@@ -1,6 +1,11 @@
+from asyncio import to_thread
+from datetime import datetime
+from io import BytesIO
+
 from discord import File
 from discord.ext.commands import Bot, Cog, Context, command
-from matplotlib import dates, pyplot
+from matplotlib import dates
+from matplotlib.figure import Figure
 
 from pianobot import Pianobot
 
@@ -27,15 +32,8 @@ class LegacyGraph(Cog):
                 await ctx.send('Interval must be a number!')
                 return
 
-        guild = next(
-            (
-                k
-                for k, v in self.bot.tracked_guilds.items()
-                if k.lower() == input_guild.lower() or v.lower() == input_guild.lower()
-            ),
-            None,
-        )
-        if guild is None:
+        tracked = self.bot.tracked_guilds.find(input_guild)
+        if tracked is None:
             member = 'Pianoplayer1#5215'
             if ctx.guild is not None:
                 guild_member = ctx.guild.get_member(667445845792391208)
@@ -47,24 +45,35 @@ class LegacyGraph(Cog):
             )
             return
 
-        await generate_graph(self.bot, guild, interval)
+        graph = await generate_graph(self.bot, tracked.name, interval)
 
-        await ctx.send(file=File('graph.png'))
+        await ctx.send(file=File(graph, 'graph.png'))
 
 
-async def generate_graph(bot: Pianobot, guild: str, days: int) -> None:
+async def generate_graph(bot: Pianobot, guild: str, days: int) -> BytesIO:
     data = await bot.database.guild_activity.get(guild, days)
-    plot, axes = pyplot.subplots()
-    axes.plot(data.keys(), data.values())
+    title = (
+        f'Online Player Activity of {guild} [{bot.tracked_guilds.tags[guild]}] -'
+        f' {days} Day{"" if days == 1 else "s"}'
+    )
+    # rendering takes long enough to stall the event loop, so it runs in a worker thread
+    return await to_thread(render_graph, data, title)
+
+
+def render_graph(data: dict[datetime, float], title: str) -> BytesIO:
+    # a standalone figure, pyplot keeps global state and is not thread-safe
+    plot = Figure()
+    axes = plot.subplots()
+    axes.plot(list(data.keys()), list(data.values()))
     axes.xaxis.set_major_formatter(dates.DateFormatter('%b %d, %H:%M'))
     axes.xaxis.set_label_position('top')
     plot.autofmt_xdate()
-    pyplot.xlabel(
-        f'Online Player Activity of {guild} [{bot.tracked_guilds[guild]}] -'
-        f' {days} Day{"" if days == 1 else "s"}'
-    )
-    pyplot.ylabel('Player Count')
-    plot.savefig('graph.png')
+    axes.set_xlabel(title)
+    axes.set_ylabel('Player Count')
+    buffer = BytesIO()
+    plot.savefig(buffer, format='png')
+    buffer.seek(0)
+    return buffer
 
 
 async def setup(bot: Pianobot) -> None:
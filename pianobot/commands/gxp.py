@@ -26,6 +26,7 @@ class GuildXP(Cog):
         usage='[days since start] [days since end]',
     )
     async def gxp(self, ctx: Context[Bot], *, arg: str = '') -> None:
+        guild = self.bot.tracked_guilds.primary.name
         args = arg.split() or ['']
         if len(args) > 0 and args[0].lower() in ('e', 'emeralds', 'p', 'pending'):
             if len(args) > 2 and args[1].lower() in ('s', 'set'):
@@ -45,14 +46,14 @@ class GuildXP(Cog):
                 if len(args) < 3:
                     await ctx.send('Please specify a user to reset the xp rewards for.')
                 elif ctx.author.guild_permissions.administrator:
-                    if await self.bot.database.raid_members.reset_xp(args[2]):
+                    if await self.bot.database.raid_members.reset_xp(guild, args[2]):
                         await ctx.send(f'Pending emeralds of `{args[2]}` have been reset.')
                     else:
                         await ctx.send(f'Username `{args[2]}` not found.')
                 else:
                     await ctx.send('You do not have the required permissions to reset the xp rewards.')
                 return
-            results = await self.bot.database.raid_members.get_xp()
+            results = await self.bot.database.raid_members.get_xp(guild)
             if results:
                 data = [
                     [name, display(amount), str(le // 4096)]
@@ -73,7 +74,7 @@ class GuildXP(Cog):
                     pass
             start = now - timedelta(days=times[0]) if times else None
             end = now - timedelta(days=times[1]) if len(times) > 1 else None
-            results = await self.bot.database.guild_xp.get_between(start, end)
+            results = await self.bot.database.guild_xp.get_between(guild, start, end)
             if results:
                 data = [
                     [name, display(count)]
@@ -1,6 +1,7 @@
 from asyncio import gather
 
 from corkus.objects.member import Member
+from corkus.utils import RequestPriority
 from datetime import datetime, timezone
 from discord import Interaction, Message
 from discord.ext.commands import Bot, Cog, Context, command
@@ -26,7 +27,8 @@ class Inactivity(Cog):
     )
     async def inactivity(self, ctx: Context[Bot], *, guild: str) -> None:
         async with ctx.typing():
-            guilds = [g.name for g in await self.bot.corkus.guild.list_all()]
+            with self.bot.corkus.priority(RequestPriority.INTERACTIVE):
+                guilds = [g.name for g in await self.bot.corkus.guild.list_all()]
             if guild in guilds:
                 await self.inactivity_for(guild, ctx)
                 return
@@ -61,13 +63,16 @@ class Inactivity(Cog):
     async def inactivity_for(
         self, guild: str, ctx: Context[Bot], message: Message | None = None
     ) -> None:
-        guild_stats = await self.bot.corkus.guild.get(guild)
-        guild_uuids = {m.uuid for m in guild_stats.members}
-        db_stats = {p.uuid: p for p in await self.bot.database.players.get_selected(guild_uuids)}
-
-        inactivity_data: list[tuple[float, list[str]]] = await gather(
-            *[self.fetch(member, db_stats) for member in guild_stats.members]
-        )
+        with self.bot.corkus.priority(RequestPriority.INTERACTIVE):
+            guild_stats = await self.bot.corkus.guild.get(guild)
+            guild_uuids = {m.uuid for m in guild_stats.members}
+            db_stats = {
+                p.uuid: p for p in await self.bot.database.players.get_selected(guild_uuids)
+            }
+
+            inactivity_data: list[tuple[float, list[str]]] = await gather(
+                *[self.fetch(member, db_stats) for member in guild_stats.members]
+            )
         results = [result[1] for result in sorted(inactivity_data, key=lambda item: item[0])]
 
         columns = {f'{guild} Members': 36, 'Rank': 26, 'Time Inactive': 26}
@@ -79,7 +84,7 @@ class Inactivity(Cog):
             raw_days, display_time = format_last_seen(False, db_player.last_seen)
         else:
             player = await member.fetch_player()
-            await self.bot.database.players.add(player.uuid, player.last_online)
+            self.bot.database.players.mark_seen([player.uuid], player.last_online)
             raw_days, display_time = format_last_seen(player.online, player.last_online)
 
         return raw_days, [member.username, member.rank.value.title(), display_time]
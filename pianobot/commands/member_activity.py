@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 
+from corkus.utils import RequestPriority
 from discord.ext.commands import Bot, Cog, Context, command
 
 from pianobot import Pianobot
@@ -30,13 +31,15 @@ class MemberActivity(Cog):
         if year is None:
             year = iso_date.year
         date = f'{year}-{week}'
+        name = self.bot.tracked_guilds.primary.name
         if date not in await self.bot.database.member_activity.get_weeks():
             await ctx.send('No data available for the specified interval!')
             return
 
         activity_data = []
-        guild = await self.bot.corkus.guild.get('Eden')
-        for username, time in (await self.bot.database.member_activity.get(date)).items():
+        with self.bot.corkus.priority(RequestPriority.INTERACTIVE):
+            guild = await self.bot.corkus.guild.get(name)
+        for username, time in (await self.bot.database.member_activity.get(name, date)).items():
             member = next(
                 (member for member in guild.members if member.username == username), None
             )
@@ -1,6 +1,7 @@
 from uuid import uuid4
 
 from corkus.errors import BadRequest
+from corkus.utils import RequestPriority
 from discord import Embed
 from discord.ext.commands import Bot, Cog, Context, command
 
@@ -31,7 +32,8 @@ class PlayerActivity(Cog):
             return
 
         try:
-            wynn_player = await self.bot.corkus.player.get(player)
+            with self.bot.corkus.priority(RequestPriority.INTERACTIVE):
+                wynn_player = await self.bot.corkus.player.get(player)
         except BadRequest:
             await ctx.send('Not a valid Wynncraft player!')
             return
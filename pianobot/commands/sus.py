@@ -3,6 +3,7 @@ from math import floor
 
 from corkus.errors import BadRequest
 from corkus.objects import PlayerTag
+from corkus.utils import RequestPriority
 from discord import Colour, Embed
 from discord.ext.commands import Bot, Cog, Context, command
 
@@ -23,7 +24,8 @@ class Sus(Cog):
     async def sus(self, ctx: Context[Bot], player: str) -> None:
         async with ctx.typing():
             try:
-                player_data = await self.bot.corkus.player.get(player)
+                with self.bot.corkus.priority(RequestPriority.INTERACTIVE):
+                    player_data = await self.bot.corkus.player.get(player)
             except BadRequest:
                 await ctx.send('Not a valid Wynncraft player!')
                 return
@@ -23,6 +23,7 @@ class GuildWars(Cog):
         usage='[days since start] [days since end]',
     )
     async def wars(self, ctx: Context[Bot], *, arg: str = '') -> None:
+        guild = self.bot.tracked_guilds.primary.name
         args = list(map(str.lower, arg.split() or ['']))
         now = datetime.now(timezone.utc)
         times = []
@@ -33,7 +34,7 @@ class GuildWars(Cog):
                 pass
         start = now - timedelta(days=times[0]) if times else None
         end = now - timedelta(days=times[1]) if len(times) > 1 else None
-        results = await self.bot.database.war_log.get_between(start, end)
+        results = await self.bot.database.war_log.get_between(guild, start, end)
         if results:
             data = [
                 [war, str(count)]
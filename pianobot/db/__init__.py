@@ -5,6 +5,7 @@ from .guild_tomes import GuildTomeTable
 from .guild_xp import GuildXPTable
 from .member_activity import MemberActivityTable
 from .members import MemberTable
+from .partitions import PartitionManager
 from .players import PlayerTable
 from .raid_log import RaidLogTable
 from .raid_members import RaidMemberTable
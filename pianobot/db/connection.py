@@ -1,16 +1,75 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from logging import getLogger
-from typing import Any
+from re import sub
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sequence
+
+from asyncpg import Connection as PGConnection, Pool, Record, create_pool
+from asyncpg.exceptions import InvalidCachedStatementError, PostgresError
+from asyncpg.pool import PoolConnectionProxy
+from asyncpg.prepared_stmt import PreparedStatement
+
+from pianobot.utils.histogram import Histogram
+
+STATEMENT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+class Statement:
+    """A named SQL statement, prepared on every connection of the pool when it opens."""
+
+    def __init__(self, name: str, sql: str) -> None:
+        self._name = name
+        self._sql = sql
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def sql(self) -> str:
+        return self._sql
+
 
-from asyncpg import Pool, Record, create_pool
+class StatementStats:
+    """Number of runs and latency of a statement."""
+
+    def __init__(self) -> None:
+        self.durations = Histogram(STATEMENT_BUCKETS)
+        self.slow = 0
+
+    @property
+    def count(self) -> int:
+        return self.durations.count
 
 
 class Connection:
-    def __init__(self, database: str, host: str, password: str, user: str) -> None:
+    def __init__(
+        self,
+        database: str,
+        host: str,
+        password: str,
+        user: str,
+        slow_query_threshold: float = 0.5,
+    ) -> None:
         self._database = database
         self._host = host
         self._password = password
         self._user = user
+        self._slow_query_threshold = slow_query_threshold
         self._pool: Pool[Record] | None = None
+        self._listener: PoolConnectionProxy[Record] | None = None
+        self._statements: dict[str, Statement] = {}
+        # prepared statements by backend pid, a new connection overwrites the entry of a
+        # closed one that had the same pid before it is used
+        self._prepared: dict[int, dict[str, PreparedStatement[Record]]] = {}
+        self._stats: dict[str, StatementStats] = {}
+        self._logger = getLogger('database')
+        self._bound: ContextVar[PoolConnectionProxy[Record] | None] = ContextVar(
+            f'transaction_{database}', default=None
+        )
 
     async def connect(self) -> None:
         self._pool = await create_pool(
@@ -18,21 +77,231 @@ class Connection:
             host=self._host,
             password=self._password,
             user=self._user,
+            init=self._prepare_all,
         )
-        getLogger('database').debug('Connected to database %s', self._database)
+        self._logger.debug('Connected to database %s', self._database)
 
-    async def execute(self, sql: str, *args: Any) -> str:
-        if self._pool is None:
-            raise AttributeError('Connection not initialized!')
-        return await self._pool.execute(sql, *args)
+    @property
+    def pool_size(self) -> int:
+        """Number of connections currently open."""
+        return 0 if self._pool is None else self._pool.get_size()
+
+    @property
+    def pool_idle(self) -> int:
+        """Number of open connections that are not in use."""
+        return 0 if self._pool is None else self._pool.get_idle_size()
+
+    @property
+    def pool_max_size(self) -> int:
+        return 0 if self._pool is None else self._pool.get_max_size()
+
+    @property
+    def statement_stats(self) -> Mapping[str, StatementStats]:
+        """Stats of every statement that ran, by name. Unnamed statements are listed under
+        their SQL with collapsed whitespace and placeholder lists."""
+        return self._stats
+
+    def prepare(self, name: str, sql: str) -> Statement:
+        """Registers a statement that can be passed to :py:meth:`execute` and :py:meth:`query`
+        instead of SQL. Statements registered before :py:meth:`connect` are prepared as soon
+        as a connection opens, later ones the first time they run on a connection."""
+        if name in self._statements and self._statements[name].sql != sql:
+            raise ValueError(f'Statement {name} is already registered with different SQL')
+        return self._statements.setdefault(name, Statement(name, sql))
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Runs every statement of the block on one connection, in one transaction that is
+        committed when the block exits and rolled back if it raises. Nested blocks become
+        savepoints.
 
-    async def query(self, sql: str, *args: Any) -> list[Record]:
+        The connection is bound to the current context, so tasks started inside the block
+        would share it and must not run statements concurrently."""
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                token = self._bound.set(connection)
+                try:
+                    yield
+                finally:
+                    self._bound.reset(token)
+
+    async def execute(self, sql: str | Statement, *args: Any) -> str:
+        async with self._acquire() as connection:
+            if isinstance(sql, Statement):
+                return await self._timed(
+                    sql.name, args, self._run_prepared(connection, sql, args, True)
+                )
+            return await self._timed(_describe(sql), args, connection.execute(sql, *args))
+
+    async def query(self, sql: str | Statement, *args: Any) -> list[Record]:
+        async with self._acquire() as connection:
+            if isinstance(sql, Statement):
+                return await self._timed(
+                    sql.name, args, self._run_prepared(connection, sql, args, False)
+                )
+            records: list[Record] = await self._timed(
+                _describe(sql), args, connection.fetch(sql, *args)
+            )
+            return records
+
+    async def execute_many(self, sql: str | Statement, args: Iterable[Sequence[Any]]) -> None:
+        """Runs a statement once for every set of arguments in a single round trip."""
+        rows = list(args)
+        if not rows:
+            return
+        name = sql.name if isinstance(sql, Statement) else _describe(sql)
+        text = sql.sql if isinstance(sql, Statement) else sql
+        async with self._acquire() as connection:
+            await self._timed(name, (rows,), connection.executemany(text, rows))
+
+    async def copy(
+        self,
+        table: str,
+        columns: Sequence[str],
+        records: Iterable[Sequence[Any]],
+        *,
+        conflict: Sequence[str] | None = None,
+        update: Sequence[str] = (),
+    ) -> None:
+        """Writes rows with ``COPY``, the fastest way to insert many rows.
+
+        Without ``conflict`` the rows are copied straight into the table. Otherwise they are
+        copied into a temporary staging table first and merged into the table, updating the
+        ``update`` columns of rows that conflict on the ``conflict`` columns or keeping the
+        existing rows if no columns are given."""
+        rows = list(records)
+        if not rows:
+            return
+        async with self._acquire() as connection:
+            if conflict is None:
+                await self._timed(
+                    f'COPY {table}',
+                    (rows,),
+                    connection.copy_records_to_table(table, records=rows, columns=list(columns)),
+                )
+                return
+            await self._timed(
+                f'COPY {table}',
+                (rows,),
+                self._merge(connection, table, columns, rows, conflict, update),
+            )
+
+    async def _merge(
+        self,
+        connection: PoolConnectionProxy[Record],
+        table: str,
+        columns: Sequence[str],
+        rows: list[Sequence[Any]],
+        conflict: Sequence[str],
+        update: Sequence[str],
+    ) -> None:
+        staging = f'staging_{table}'
+        column_list = ', '.join(f'"{column}"' for column in columns)
+        action = (
+            'DO UPDATE SET ' + ', '.join(f'"{column}" = EXCLUDED."{column}"' for column in update)
+            if update
+            else 'DO NOTHING'
+        )
+        async with connection.transaction():
+            await connection.execute(
+                f'CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP'
+            )
+            await connection.copy_records_to_table(staging, records=rows, columns=list(columns))
+            await connection.execute(
+                f'INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging}'
+                f' ON CONFLICT ({", ".join(conflict)}) {action}'
+            )
+            # dropped right away, the surrounding transaction may merge into the table again
+            await connection.execute(f'DROP TABLE {staging}')
+
+    async def listen(self, channel: str, callback: Callable[[str], None]) -> None:
+        """Calls ``callback`` with the payload of every notification sent on ``channel``.
+        All listeners share one connection that is taken out of the pool for good."""
         if self._pool is None:
             raise AttributeError('Connection not initialized!')
-        records: list[Record] = await self._pool.fetch(sql, *args)
-        return records
+        if self._listener is None:
+            self._listener = await self._pool.acquire()
+        await self._listener.add_listener(
+            channel, lambda _connection, _pid, _channel, payload: callback(payload)
+        )
 
     async def disconnect(self) -> None:
+        if self._listener is not None and self._pool is not None:
+            await self._pool.release(self._listener)
+            self._listener = None
         if self._pool is not None:
             await self._pool.close()
-            getLogger('database').debug('Disconnected from database %s', self._database)
+            self._prepared.clear()
+            self._logger.debug('Disconnected from database %s', self._database)
+
+    async def _prepare_all(self, connection: PGConnection[Record]) -> None:
+        prepared = self._prepared[connection.get_server_pid()] = {}
+        for name, statement in self._statements.items():
+            try:
+                prepared[name] = await connection.prepare(statement.sql)
+            except PostgresError as e:
+                # e.g. a table that is only created after connecting, prepared on first use
+                self._logger.debug('Could not prepare statement %s: %s', name, e)
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[PoolConnectionProxy[Record]]:
+        if self._pool is None:
+            raise AttributeError('Connection not initialized!')
+        bound = self._bound.get()
+        if bound is not None:
+            yield bound
+            return
+        async with self._pool.acquire() as connection:
+            yield connection
+
+    async def _run_prepared(
+        self,
+        connection: PoolConnectionProxy[Record],
+        statement: Statement,
+        args: tuple[Any, ...],
+        status: bool,
+    ) -> Any:
+        prepared = self._prepared.setdefault(connection.get_server_pid(), {})
+        for attempt in range(2):
+            if attempt or statement.name not in prepared:
+                prepared[statement.name] = await connection.prepare(statement.sql)
+            try:
+                records = await prepared[statement.name].fetch(*args)
+            except InvalidCachedStatementError:
+                # the schema of a table changed, prepare the statement again unless the
+                # error already aborted the surrounding transaction
+                if attempt or connection.is_in_transaction():
+                    raise
+                continue
+            return prepared[statement.name].get_statusmsg() if status else records
+
+    async def _timed(self, name: str, args: tuple[Any, ...], run: Awaitable[Any]) -> Any:
+        start = perf_counter()
+        try:
+            return await run
+        finally:
+            duration = perf_counter() - start
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = StatementStats()
+            stats.durations.observe(duration)
+            if duration >= self._slow_query_threshold:
+                stats.slow += 1
+                self._logger.warning(
+                    'Slow statement took %.3f seconds: %s with arguments (%s)',
+                    duration,
+                    name,
+                    ', '.join(_shape(arg) for arg in args),
+                )
+
+
+def _describe(sql: str) -> str:
+    """Groups unnamed statements that only differ in whitespace or the number of placeholders."""
+    return sub(r'\$\d+(\s*,\s*\$\d+)*', '$n', ' '.join(sql.split()))[:120]
+
+
+def _shape(value: Any) -> str:
+    """Describes an argument without its possibly large or private value."""
+    if isinstance(value, (list, tuple, set, frozenset, str, bytes)):
+        return f'{type(value).__name__}[{len(value)}]'
+    return type(value).__name__
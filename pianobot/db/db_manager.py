@@ -1,3 +1,4 @@
+from contextlib import AbstractAsyncContextManager
 from os import getenv
 
 from pianobot.db import (
@@ -8,6 +9,7 @@ from pianobot.db import (
     GuildXPTable,
     MemberActivityTable,
     MemberTable,
+    PartitionManager,
     PlayerTable,
     RaidTable,
     RaidLogTable,
@@ -26,6 +28,7 @@ class DBManager:
             getenv('PG_HOST', 'localhost'),
             getenv('PG_PASS', ''),
             getenv('PG_USER', 'root'),
+            float(getenv('PG_SLOW_QUERY_SECONDS', 0.5)),
         )
         self.guild_activity = GuildActivityTable(self._con)
         self.guild_award_stats = GuildAwardStatsTable(self._con)
@@ -33,6 +36,7 @@ class DBManager:
         self.guild_xp = GuildXPTable(self._con)
         self.member_activity = MemberActivityTable(self._con)
         self.members = MemberTable(self._con)
+        self.partitions = PartitionManager(self._con)
         self.players = PlayerTable(self._con)
         self.raid_log = RaidLogTable(self._con)
         self.raid_members = RaidMemberTable(self._con)
@@ -42,6 +46,13 @@ class DBManager:
         self.war_log = WarLogTable(self._con)
         self.worlds = WorldTable(self._con)
 
+    @property
+    def connection(self) -> Connection:
+        return self._con
+
+    def transaction(self) -> AbstractAsyncContextManager[None]:
+        return self._con.transaction()
+
     async def connect(self) -> None:
         await self._con.connect()
 
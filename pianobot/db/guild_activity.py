@@ -1,55 +1,92 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from pianobot.db import Connection
+from pianobot.db.rollup import HOURLY_RETENTION, RAW_RETENTION, Rollup
 from pianobot.utils import get_rounded_time
 
 
 class GuildActivityTable:
+    """Online members of every tracked guild, one row per guild and 5 minute snapshot.
+
+    Older snapshots are folded into hourly and later into daily averages by :py:meth:`rollup`.
+    """
+
     def __init__(self, con: Connection) -> None:
         self._con = con
-
-    async def get(self, guild: str, days: int) -> dict[datetime, int]:
-        result = await self._con.query(
-            f'SELECT time, "{guild}" FROM guild_activity WHERE time > (CURRENT_TIMESTAMP -'
-            f' \'{days} day\'::interval) AND "{guild}" IS NOT NULL ORDER BY time'
+        self._get = con.prepare(
+            'guild_activity.get',
+            'SELECT date_trunc($3, time, \'UTC\') AS bucket, avg(players)::REAL FROM ('
+            ' SELECT time, players FROM guild_activity_series WHERE guild = $1 AND time > $2'
+            ' UNION ALL'
+            ' SELECT time, players FROM guild_activity_hourly WHERE guild = $1 AND time > $2'
+            ' UNION ALL'
+            ' SELECT time, players FROM guild_activity_daily WHERE guild = $1 AND time > $2'
+            ') AS points GROUP BY bucket ORDER BY bucket',
         )
-        return {row[0]: row[1] for row in result}
-
-    async def update_columns(self, guilds: list[str]) -> None:
-        result = await self._con.query(
-            'SELECT column_name FROM information_schema.columns WHERE table_name ='
-            ' \'guild_activity\''
+        self._hourly = Rollup(
+            con,
+            'guild_activity_series',
+            'guild_activity_hourly',
+            entity='guild',
+            value='players',
+            value_type='REAL',
+            aggregate='avg',
+            unit='hour',
+            keep=RAW_RETENTION,
+            chunk=timedelta(hours=6),
+        )
+        self._daily = Rollup(
+            con,
+            'guild_activity_hourly',
+            'guild_activity_daily',
+            entity='guild',
+            value='players',
+            value_type='REAL',
+            aggregate='avg',
+            unit='day',
+            keep=HOURLY_RETENTION,
+            chunk=timedelta(days=7),
+        )
+        self._add = con.prepare(
+            'guild_activity.add',
+            'INSERT INTO guild_activity_series (guild, time, players)'
+            ' SELECT guild, $1, players FROM unnest($2::text[], $3::int[]) AS u(guild, players)'
+            ' ON CONFLICT (guild, time) DO NOTHING',
         )
-        current_guilds = [] if len(result) <= 1 else [column[0] for column in result[1:]]
-        to_add = set(guilds).difference(current_guilds)
-        add_string = ', '.join(f'ADD COLUMN "{name}" INTEGER' for name in to_add)
-        to_remove = set(current_guilds).difference(guilds)
-        remove_string = ', '.join([f'DROP COLUMN IF EXISTS "{name}"' for name in to_remove])
-
-        if add_string and remove_string:
-            remove_string = ', ' + remove_string
-        if add_string or remove_string:
-            await self._con.execute(f'ALTER TABLE guild_activity {add_string}{remove_string};')
-
-    async def add(self, data: dict[str, int | None]) -> None:
-        rounded_time = get_rounded_time(minutes=5)
-
-        columns = ', '.join(f'"{key}"' for key in data)
-        placeholders = ', '.join(f'${i + 2}' for i in range(len(data)))
 
+    async def create(self) -> None:
         await self._con.execute(
-            f'INSERT INTO guild_activity (time, {columns}) VALUES ($1, {placeholders}) ON'
-            ' CONFLICT(time) DO NOTHING;',
-            rounded_time,
-            *data.values(),
+            'CREATE TABLE IF NOT EXISTS guild_activity_series ('
+            ' guild TEXT NOT NULL,'
+            ' time TIMESTAMPTZ NOT NULL,'
+            ' players INTEGER NOT NULL,'
+            ' PRIMARY KEY (guild, time)) PARTITION BY RANGE (time)'
         )
-
-    async def cleanup(self) -> None:
         await self._con.execute(
-            'DELETE FROM guild_activity WHERE time < (CURRENT_TIMESTAMP - \'7 DAY\'::interval)'
-            ' AND to_char(time, \'MI\') != \'00\''
+            'CREATE INDEX IF NOT EXISTS guild_activity_series_time ON guild_activity_series (time)'
         )
+        await self._hourly.create()
+        await self._daily.create()
+
+    async def get(self, guild: str, days: int) -> dict[datetime, float]:
+        """Average online members of the last ``days`` days, per 5 minutes for short ranges
+        and per hour or day for longer ones."""
+        resolution = 'minute' if days <= 2 else 'hour' if days <= 14 else 'day'
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        result = await self._con.query(self._get, guild, since, resolution)
+        return {row[0]: row[1] for row in result}
+
+    async def add(self, data: dict[str, int | None]) -> None:
+        """Saves the online member count of every guild, guilds without a count are skipped."""
+        guilds = [guild for guild, players in data.items() if players is not None]
         await self._con.execute(
-            'DELETE FROM guild_activity WHERE time < (CURRENT_TIMESTAMP - \'14 DAY\'::interval)'
-            ' AND to_char(time, \'HH24:MI\') != \'00:00\''
+            self._add,
+            get_rounded_time(minutes=5),
+            guilds,
+            [data[guild] for guild in guilds],
         )
+
+    async def rollup(self) -> None:
+        # hourly averages are only final once all raw points of their day were folded
+        if await self._hourly.run():
+            await self._daily.run()
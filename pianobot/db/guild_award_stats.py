@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from pianobot.db import Connection
 
 
@@ -55,14 +57,20 @@ class GuildAwardStats:
 
 
 class GuildAwardStatsTable:
+    """Award stats of the members of the tracked guilds per promotion cycle, every method
+    works on the members of one guild."""
+
     def __init__(self, con: Connection) -> None:
         self._con = con
 
     async def add(
-        self, username: str, cycle: str, raids: dict[str, int], wars: int, xp: int
+        self, guild: str, username: str, cycle: str, raids: dict[str, int], wars: int, xp: int
     ) -> None:
         await self._con.execute(
-            'INSERT INTO guild_award_stats VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)',
+            'INSERT INTO guild_award_stats'
+            ' (guild, username, cycle, raids, wars, xp, notg, nol, tcc, tna)'
+            ' VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)',
+            guild,
             username,
             cycle,
             sum(raids.values()),
@@ -74,37 +82,103 @@ class GuildAwardStatsTable:
             raids.get('The Nameless Anomaly', 0),
         )
 
-    async def get_for_cycle(self, cycle: str) -> list[GuildAwardStats]:
-        result = await self._con.query('SELECT * FROM guild_award_stats WHERE cycle = $1', cycle)
+    async def add_many(self, guild: str, stats: Iterable[tuple[str, str, dict[str, int], int, int]]) -> None:
+        """Adds stats given as ``(username, cycle, raids, wars, xp)``."""
+        await self._con.copy(
+            'guild_award_stats',
+            ['guild', 'username', 'cycle', 'raids', 'wars', 'xp', 'notg', 'nol', 'tcc', 'tna'],
+            [
+                (
+                    guild,
+                    username,
+                    cycle,
+                    sum(raids.values()),
+                    wars,
+                    xp,
+                    raids.get('Nest of the Grootslangs', 0),
+                    raids.get('Orphion\'s Nexus of Light', 0),
+                    raids.get('The Canyon Colossus', 0),
+                    raids.get('The Nameless Anomaly', 0),
+                )
+                for username, cycle, raids, wars, xp in stats
+            ],
+        )
+
+    async def get_for_cycle(self, guild: str, cycle: str) -> list[GuildAwardStats]:
+        result = await self._con.query(
+            'SELECT username, cycle, raids, wars, xp, notg, nol, tcc, tna FROM guild_award_stats'
+            ' WHERE guild = $1 AND cycle = $2',
+            guild,
+            cycle,
+        )
         return [GuildAwardStats(*row) for row in result]
 
-    async def update_raids(self, username: str, cycle: str, raids: dict[str, int]) -> None:
+    async def update_raids(self, guild: str, username: str, cycle: str, raids: dict[str, int]) -> None:
         await self._con.execute(
             (
                 'UPDATE guild_award_stats SET raids = $1, notg = $2, nol = $3,'
-                ' tcc = $4, tna = $5 WHERE username = $6 AND cycle = $7'
+                ' tcc = $4, tna = $5 WHERE guild = $6 AND username = $7 AND cycle = $8'
             ),
             sum(raids.values()),
             raids.get('Nest of the Grootslangs', 0),
             raids.get('Orphion\'s Nexus of Light', 0),
             raids.get('The Canyon Colossus', 0),
             raids.get('The Nameless Anomaly', 0),
+            guild,
             username,
             cycle,
         )
 
-    async def update_wars(self, username: str, cycle: str, wars: int) -> None:
+    async def update_wars(self, guild: str, username: str, cycle: str, wars: int) -> None:
         await self._con.execute(
-            'UPDATE guild_award_stats SET wars = $1 WHERE username = $2 AND cycle = $3',
+            'UPDATE guild_award_stats SET wars = $1 WHERE guild = $2 AND username = $3 AND cycle = $4',
             wars,
+            guild,
             username,
             cycle,
         )
 
-    async def update_xp(self, username: str, cycle: str, xp: int) -> None:
+    async def update_xp(self, guild: str, username: str, cycle: str, xp: int) -> None:
         await self._con.execute(
-            'UPDATE guild_award_stats SET xp = $1 WHERE username = $2 AND cycle = $3',
+            'UPDATE guild_award_stats SET xp = $1 WHERE guild = $2 AND username = $3 AND cycle = $4',
             xp,
+            guild,
             username,
             cycle,
         )
+
+    async def update_raids_many(self, guild: str, stats: Iterable[tuple[str, str, dict[str, int]]]) -> None:
+        """Updates raids given as ``(username, cycle, raids)``."""
+        await self._con.execute_many(
+            (
+                'UPDATE guild_award_stats SET raids = $1, notg = $2, nol = $3,'
+                ' tcc = $4, tna = $5 WHERE guild = $6 AND username = $7 AND cycle = $8'
+            ),
+            [
+                (
+                    sum(raids.values()),
+                    raids.get('Nest of the Grootslangs', 0),
+                    raids.get('Orphion\'s Nexus of Light', 0),
+                    raids.get('The Canyon Colossus', 0),
+                    raids.get('The Nameless Anomaly', 0),
+                    guild,
+                    username,
+                    cycle,
+                )
+                for username, cycle, raids in stats
+            ],
+        )
+
+    async def update_wars_many(self, guild: str, stats: Iterable[tuple[str, str, int]]) -> None:
+        """Updates wars given as ``(username, cycle, wars)``."""
+        await self._con.execute_many(
+            'UPDATE guild_award_stats SET wars = $1 WHERE guild = $2 AND username = $3 AND cycle = $4',
+            [(wars, guild, username, cycle) for username, cycle, wars in stats],
+        )
+
+    async def update_xp_many(self, guild: str, stats: Iterable[tuple[str, str, int]]) -> None:
+        """Updates xp given as ``(username, cycle, xp)``."""
+        await self._con.execute_many(
+            'UPDATE guild_award_stats SET xp = $1 WHERE guild = $2 AND username = $3 AND cycle = $4',
+            [(xp, guild, username, cycle) for username, cycle, xp in stats],
+        )
@@ -1,8 +1,8 @@
-from datetime import datetime
-
-from asyncpg import Record
+from datetime import datetime, timedelta, timezone
 
 from pianobot.db import Connection
+from pianobot.db.rollup import HOURLY_RETENTION, RAW_RETENTION, Rollup
+from pianobot.db.xp_window import XPWindow
 from pianobot.utils import get_rounded_time
 
 
@@ -21,87 +21,159 @@ class GuildXP:
 
 
 class GuildXPTable:
+    """Contributed guild xp of every member, one row per guild, member and 5 minute snapshot.
+
+    Older snapshots are folded into the first value per hour and later per day by
+    :py:meth:`rollup`, the smallest one as contributed xp only grows. Folded rows are
+    stamped with the start of their hour or day, so they hold the xp at that time. Only
+    :py:meth:`get_between` reads the folded data.
+
+    The snapshots of the last two weeks are also kept in memory per guild once
+    :py:meth:`warm` ran, :py:meth:`get_between` and :py:meth:`get_last` only query the
+    database for older ones.
+    """
+
     def __init__(self, con: Connection) -> None:
         self._con = con
-
-    async def get_members(self) -> list[str]:
-        result = await self._con.query(
-            'SELECT column_name FROM information_schema.columns WHERE table_name = \'guild_xp\''
+        self._get = con.prepare(
+            'guild_xp.get',
+            'SELECT member, xp FROM guild_xp_series WHERE guild = $1 AND time = $2',
         )
-        return [] if len(result) <= 1 else [column[0] for column in result[1:]]
-
-    async def get(self, time: datetime) -> GuildXP | None:
-        return await self._bind(
-            await self._con.query('SELECT * FROM guild_xp WHERE time =$1', time)
+        self._get_first = con.prepare(
+            'guild_xp.get_first',
+            'SELECT time, member, xp FROM guild_xp_series WHERE guild = $1 AND time = (SELECT'
+            ' min(time) FROM guild_xp_series'
+            ' WHERE guild = $1 AND time > CURRENT_TIMESTAMP - $2::text::interval)',
         )
-
-    async def get_first(self, interval: str) -> GuildXP | None:
-        return await self._bind(
-            await self._con.query(
-                'SELECT * FROM guild_xp WHERE time > (CURRENT_TIMESTAMP -'
-                f' \'{interval}\'::interval) ORDER BY time LIMIT 1'
-            )
+        self._get_between = con.prepare(
+            'guild_xp.get_between',
+            'WITH points AS NOT MATERIALIZED ('
+            ' SELECT member, time, xp FROM guild_xp_series WHERE guild = $1'
+            ' UNION ALL SELECT member, time, xp FROM guild_xp_hourly WHERE guild = $1'
+            ' UNION ALL SELECT member, time, xp FROM guild_xp_daily WHERE guild = $1),'
+            ' bounds AS (SELECT'
+            ' (SELECT min(time) FROM points'
+            ' WHERE time >= coalesce($2::timestamptz, \'-infinity\')) AS first_time,'
+            ' (SELECT max(time) FROM points'
+            ' WHERE time <= coalesce($3::timestamptz, \'infinity\')) AS last_time)'
+            ' SELECT member, gained FROM (SELECT member,'
+            ' coalesce(sum(xp) FILTER (WHERE time = last_time), 0)'
+            ' - coalesce(sum(xp) FILTER (WHERE time = first_time), 0) AS gained'
+            ' FROM points, bounds WHERE time IN (first_time, last_time)'
+            ' GROUP BY member) AS gains WHERE gained > 0',
         )
-
-    async def get_between(self, start: datetime | None = None, end: datetime | None = None) -> dict[str, int]:
-        members = await self.get_members()
-        result_start = await self._con.query(
-            'SELECT * FROM guild_xp WHERE time >= $1 ORDER BY time LIMIT 1',
-            start or datetime.min,
+        self._get_last = con.prepare(
+            'guild_xp.get_last',
+            'SELECT time, member, xp FROM guild_xp_series WHERE guild = $1 AND time IN'
+            ' (SELECT DISTINCT time FROM guild_xp_series WHERE guild = $1'
+            ' ORDER BY time DESC LIMIT $2)'
+            ' ORDER BY time DESC',
         )
-        result_end = await self._con.query(
-            'SELECT * FROM guild_xp WHERE time <= $1 ORDER BY time DESC LIMIT 1',
-            end or datetime.max,
+        self._get_recent = con.prepare(
+            'guild_xp.get_recent',
+            'SELECT guild, time, member, xp FROM guild_xp_series WHERE time >= $1'
+            ' UNION ALL SELECT guild, time, member, xp FROM guild_xp_hourly WHERE time >= $1',
         )
-        if len(result_end) + len(result_start) == 0:
-            return {}
-        start_data = result_start[0]
-        end_data = result_end[0]
-        return {
-            member: (end_data[i + 1] or 0) - (start_data[i + 1] or 0)
-            for i, member in enumerate(members)
-            if (end_data[i + 1] or 0) - (start_data[i + 1] or 0) > 0
-        }
-
-    async def _bind(self, result: list[Record]) -> GuildXP | None:
-        members = await self.get_members()
-        if result:
-            row = result[0]
-            data = {members[i]: row[i + 1] for i in range(len(members))}
-            return GuildXP(row[0], data)
-        return None
-
-    async def get_last(self, amount: int = 1) -> list[GuildXP]:
-        result = await self._con.query(f'SELECT * FROM guild_xp ORDER BY time DESC LIMIT {amount}')
-        members = await self.get_members()
-        return [GuildXP(row[0], dict(zip(members, row[1:]))) for row in result]
-
-    async def update_columns(self, names: list[str]) -> None:
-        columns = await self.get_members()
-        new_members = set(names).difference(columns)
-        if new_members:
-            add_string = ', '.join(f'ADD COLUMN "{name}" BIGINT' for name in new_members)
-            await self._con.execute(f'ALTER TABLE guild_xp {add_string};')
-
-    async def add(self, data: dict[str, int]) -> None:
-        rounded_time = get_rounded_time(minutes=5)
-
-        columns = ', '.join(f'"{key}"' for key in data)
-        placeholders = ', '.join(f'${i + 2}' for i in range(len(data)))
-
-        await self._con.execute(
-            f'INSERT INTO guild_xp (time, {columns}) VALUES ($1, {placeholders}) ON CONFLICT(time)'
-            ' DO NOTHING;',
-            rounded_time,
-            *data.values(),
+        self._add = con.prepare(
+            'guild_xp.add',
+            'INSERT INTO guild_xp_series (guild, member, time, xp)'
+            ' SELECT $1, member, $2, xp FROM unnest($3::text[], $4::bigint[]) AS u(member, xp)'
+            ' ON CONFLICT (guild, member, time) DO NOTHING',
+        )
+        self._hourly = Rollup(
+            con,
+            'guild_xp_series',
+            'guild_xp_hourly',
+            entity='member',
+            keys=['guild'],
+            value='xp',
+            value_type='BIGINT',
+            aggregate='min',
+            unit='hour',
+            keep=RAW_RETENTION,
+            chunk=timedelta(hours=6),
+        )
+        self._daily = Rollup(
+            con,
+            'guild_xp_hourly',
+            'guild_xp_daily',
+            entity='member',
+            keys=['guild'],
+            value='xp',
+            value_type='BIGINT',
+            aggregate='min',
+            unit='day',
+            keep=HOURLY_RETENTION,
+            chunk=timedelta(days=7),
         )
+        self._windows: dict[str, XPWindow] = {}
 
-    async def cleanup(self) -> None:
+    async def create(self) -> None:
         await self._con.execute(
-            'DELETE FROM guild_xp WHERE time < (CURRENT_TIMESTAMP - \'7 DAY\'::interval) AND'
-            ' to_char(time, \'MI\') != \'00\''
+            'CREATE TABLE IF NOT EXISTS guild_xp_series ('
+            ' guild TEXT NOT NULL,'
+            ' member TEXT NOT NULL,'
+            ' time TIMESTAMPTZ NOT NULL,'
+            ' xp BIGINT NOT NULL,'
+            ' PRIMARY KEY (guild, member, time)) PARTITION BY RANGE (time)'
         )
         await self._con.execute(
-            'DELETE FROM guild_xp WHERE time < (CURRENT_TIMESTAMP - \'14 DAY\'::interval) AND'
-            ' to_char(time, \'HH24:MI\') != \'00:00\''
+            'CREATE INDEX IF NOT EXISTS guild_xp_series_time ON guild_xp_series (time)'
         )
+        await self._hourly.create()
+        await self._daily.create()
+
+    async def warm(self) -> None:
+        """Loads the snapshots of the in-memory windows from the database."""
+        since = datetime.now(timezone.utc) - HOURLY_RETENTION
+        snapshots: dict[str, dict[datetime, dict[str, int | None]]] = {}
+        for row in await self._con.query(self._get_recent, since):
+            snapshots.setdefault(row[0], {}).setdefault(row[1], {})[row[2]] = row[3]
+        for guild, guild_snapshots in snapshots.items():
+            for time in sorted(guild_snapshots):
+                self._window(guild).record(time, guild_snapshots[time])
+
+    async def get(self, guild: str, time: datetime) -> GuildXP | None:
+        result = await self._con.query(self._get, guild, time)
+        return GuildXP(time, {row[0]: row[1] for row in result}) if result else None
+
+    async def get_first(self, guild: str, interval: str) -> GuildXP | None:
+        result = await self._con.query(self._get_first, guild, interval)
+        return GuildXP(result[0][0], {row[1]: row[2] for row in result}) if result else None
+
+    async def get_between(
+        self, guild: str, start: datetime | None = None, end: datetime | None = None
+    ) -> dict[str, int]:
+        """Xp gained by every member of ``guild`` between the first snapshot after ``start``
+        and the last one before ``end``, without members who gained nothing."""
+        window = self._window(guild)
+        if window.covers(start):
+            return window.get_between(start, end)
+        result = await self._con.query(self._get_between, guild, start, end)
+        return {row[0]: row[1] for row in result}
+
+    async def get_last(self, guild: str, amount: int = 1) -> list[GuildXP]:
+        recent = self._window(guild).get_last(amount)
+        if len(recent) == amount:
+            return [GuildXP(time, data) for time, data in recent]
+        snapshots: dict[datetime, dict[str, int | None]] = {}
+        for row in await self._con.query(self._get_last, guild, amount):
+            snapshots.setdefault(row[0], {})[row[1]] = row[2]
+        return [GuildXP(time, data) for time, data in snapshots.items()]
+
+    async def add(self, guild: str, data: dict[str, int]) -> None:
+        time = get_rounded_time(minutes=5)
+        members = [member for member, xp in data.items() if xp is not None]
+        await self._con.execute(self._add, guild, time, members, [data[member] for member in members])
+        self._window(guild).record(time, data)
+
+    async def rollup(self) -> None:
+        # hourly values are only final once all raw points of their day were folded
+        if await self._hourly.run():
+            await self._daily.run()
+
+    def _window(self, guild: str) -> XPWindow:
+        window = self._windows.get(guild)
+        if window is None:
+            window = self._windows[guild] = XPWindow(span=HOURLY_RETENTION)
+        return window
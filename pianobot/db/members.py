@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Iterable
 from uuid import UUID
 
 from pianobot.db import Connection
@@ -36,21 +37,45 @@ class Member:
 
 
 class MemberTable:
+    """Members of the tracked guilds, every method works on the members of one guild."""
+
     def __init__(self, con: Connection) -> None:
         self._con = con
-
-    async def get_all(self) -> list[Member]:
-        result = await self._con.query(
-            'SELECT uuid, join_date, name, rank, contributed_xp FROM members'
+        self._get_all = con.prepare(
+            'members.get_all',
+            'SELECT uuid, join_date, name, rank, contributed_xp FROM members WHERE guild = $1',
+        )
+        self._update_contributed_xp = con.prepare(
+            'members.update_contributed_xp',
+            'UPDATE members SET contributed_xp = $2 WHERE guild = $1 AND uuid = $3',
+        )
+        self._add_many = con.prepare(
+            'members.add_many',
+            'INSERT INTO members (guild, uuid, join_date, name, rank, contributed_xp)'
+            ' SELECT $1, u.* FROM unnest($2::uuid[], $3::timestamptz[], $4::text[], $5::text[],'
+            ' $6::bigint[]) AS u',
+        )
+        self._update_many = con.prepare(
+            'members.update_many',
+            'UPDATE members m SET name = u.name, rank = u.rank, contributed_xp = u.contributed_xp'
+            ' FROM unnest($2::uuid[], $3::text[], $4::text[], $5::bigint[])'
+            ' AS u(uuid, name, rank, contributed_xp) WHERE m.guild = $1 AND m.uuid = u.uuid',
+        )
+        self._remove_many = con.prepare(
+            'members.remove_many', 'DELETE FROM members WHERE guild = $1 AND uuid = ANY($2)'
         )
+
+    async def get_all(self, guild: str) -> list[Member]:
+        result = await self._con.query(self._get_all, guild)
         return [Member(row[0], row[1], row[2], row[3], row[4]) for row in result]
 
     async def add(
-        self, uuid: UUID, joined_at: datetime, name: str, rank: str, contributed_xp: int
+        self, guild: str, uuid: UUID, joined_at: datetime, name: str, rank: str, contributed_xp: int
     ) -> None:
         await self._con.execute(
-            f'INSERT INTO members (uuid, join_date, name, rank, contributed_xp)'
-            f' VALUES ($1, $2, $3, $4, $5)',
+            f'INSERT INTO members (guild, uuid, join_date, name, rank, contributed_xp)'
+            f' VALUES ($1, $2, $3, $4, $5, $6)',
+            guild,
             uuid,
             joined_at,
             name,
@@ -58,16 +83,35 @@ class MemberTable:
             contributed_xp,
         )
 
-    async def remove(self, uuid: UUID) -> None:
-        await self._con.execute('DELETE FROM members WHERE uuid = $1', uuid)
+    async def add_many(self, guild: str, members: Iterable[tuple[UUID, datetime, str, str, int]]) -> None:
+        """Adds members given as ``(uuid, joined_at, name, rank, contributed_xp)``."""
+        rows = list(members)
+        if rows:
+            await self._con.execute(self._add_many, guild, *map(list, zip(*rows)))
+
+    async def update_many(self, guild: str, members: Iterable[tuple[UUID, str, str, int]]) -> None:
+        """Updates members given as ``(uuid, name, rank, contributed_xp)``."""
+        rows = list(members)
+        if rows:
+            await self._con.execute(self._update_many, guild, *map(list, zip(*rows)))
+
+    async def remove_many(self, guild: str, uuids: Iterable[UUID]) -> None:
+        uuids = list(uuids)
+        if uuids:
+            await self._con.execute(self._remove_many, guild, uuids)
 
-    async def update_name(self, uuid: UUID, name: str) -> None:
-        await self._con.execute('UPDATE members SET name = $1 WHERE uuid = $2', name, uuid)
+    async def remove(self, guild: str, uuid: UUID) -> None:
+        await self._con.execute('DELETE FROM members WHERE guild = $1 AND uuid = $2', guild, uuid)
 
-    async def update_rank(self, uuid: UUID, rank: str) -> None:
-        await self._con.execute('UPDATE members SET rank = $1 WHERE uuid = $2', rank, uuid)
+    async def update_name(self, guild: str, uuid: UUID, name: str) -> None:
+        await self._con.execute(
+            'UPDATE members SET name = $3 WHERE guild = $1 AND uuid = $2', guild, uuid, name
+        )
 
-    async def update_contributed_xp(self, uuid: UUID, contributed_xp: int) -> None:
+    async def update_rank(self, guild: str, uuid: UUID, rank: str) -> None:
         await self._con.execute(
-            'UPDATE members SET contributed_xp = $1 WHERE uuid = $2', contributed_xp, uuid
+            'UPDATE members SET rank = $3 WHERE guild = $1 AND uuid = $2', guild, uuid, rank
         )
+
+    async def update_contributed_xp(self, guild: str, uuid: UUID, contributed_xp: int) -> None:
+        await self._con.execute(self._update_contributed_xp, guild, contributed_xp, uuid)
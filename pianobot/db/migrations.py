@@ -0,0 +1,150 @@
+"""One-off migrations of existing data, run them with the bot's database settings in the
+environment.
+
+``series`` moves the guild activity and guild xp history from the old tables with one column
+per guild or member into the series tables with one row per guild or member and snapshot::
+
+    python -m pianobot.db.migrations series [--drop]
+
+Rows that already exist in the series tables are kept, so it is safe to run it again.
+
+``guilds`` adds the guild to the key of the tables that hold per-member state and to the raid
+log, so several guilds can run the member, activity, xp, raid and award tracking. Existing rows are assigned
+to the primary guild, or to the guild given with ``--guild``::
+
+    python -m pianobot.db.migrations guilds [--guild NAME]
+
+Tables that already have a guild column are skipped. Run it before ``series``, which copies
+the old xp history into the primary guild as well.
+
+``partitions`` turns the raid log, war log and series tables into tables partitioned by
+month, tables that already are partitioned are skipped::
+
+    python -m pianobot.db.migrations partitions [--drop]
+
+``--drop`` removes the old tables after copying them.
+"""
+from argparse import ArgumentParser
+from asyncio import run
+from logging import INFO, basicConfig, getLogger
+
+from pianobot.db.db_manager import DBManager
+from pianobot.db.partitions import PARTITIONED
+from pianobot.utils import GuildRegistry
+
+# tables with per-member state, guild_xp_series and its rollups also need the guild, and
+# raid_log so raids stay with the guild they were done for when a member moves on
+GUILD_KEYED = [
+    'members',
+    'raid_members',
+    'guild_award_stats',
+    'member_activity',
+    'guild_xp_series',
+    'guild_xp_hourly',
+    'guild_xp_daily',
+    'raid_log',
+]
+
+
+async def migrate_series(database: DBManager, guild: str, drop: bool = False) -> None:
+    logger = getLogger('database.migrations')
+    await database.guild_activity.create()
+    await database.guild_xp.create()
+    await database.partitions.maintain()
+
+    # the old xp table only held the members of the primary guild
+    for old_table, new_table, entity, value, value_type, owner in [
+        ('guild_activity', 'guild_activity_series', 'guild', 'players', 'INTEGER', None),
+        ('guild_xp', 'guild_xp_series', 'member', 'xp', 'BIGINT', guild),
+    ]:
+        exists = await database.connection.query('SELECT to_regclass($1)', old_table)
+        if exists[0][0] is None:
+            logger.info('Table %s does not exist, nothing to migrate', old_table)
+            continue
+        keys = entity if owner is None else f'guild, {entity}'
+        owner_value = '' if owner is None else '$1, '
+        # every column except time becomes one row per snapshot
+        async with database.transaction():
+            status = await database.connection.execute(
+                f'INSERT INTO {new_table} ({keys}, time, {value})'
+                f' SELECT {owner_value}c.key, o.time, c.value::{value_type} FROM {old_table} o,'
+                f' jsonb_each_text(to_jsonb(o) - \'time\') c WHERE c.value IS NOT NULL'
+                f' ON CONFLICT ({keys}, time) DO NOTHING',
+                *([] if owner is None else [owner]),
+            )
+            logger.info('Copied %s rows from %s to %s', status.split()[-1], old_table, new_table)
+            if drop:
+                await database.connection.execute(f'DROP TABLE {old_table}')
+                logger.info('Dropped %s', old_table)
+
+
+async def migrate_guilds(database: DBManager, guild: str) -> None:
+    logger = getLogger('database.migrations')
+    con = database.connection
+    for table in GUILD_KEYED:
+        if not await database.partitions.exists(table):
+            logger.info('Table %s does not exist, nothing to migrate', table)
+            continue
+        has_guild = await con.query(
+            'SELECT EXISTS (SELECT 1 FROM information_schema.columns'
+            ' WHERE table_name = $1 AND column_name = \'guild\')',
+            table,
+        )
+        if has_guild[0][0]:
+            logger.info('%s is already keyed by guild', table)
+            continue
+
+        async with database.transaction():
+            primary_key = await con.query(
+                'SELECT c.conname, array_agg(a.attname ORDER BY k.ord) FROM pg_constraint c,'
+                ' unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord), pg_attribute a'
+                ' WHERE c.conrelid = to_regclass($1) AND c.contype = \'p\''
+                ' AND a.attrelid = c.conrelid AND a.attnum = k.attnum GROUP BY c.conname',
+                table,
+            )
+            # a constant default fills the existing rows without rewriting the table,
+            # it is dropped again so new rows always name their guild
+            default = (await con.query('SELECT quote_literal($1)', guild))[0][0]
+            await con.execute(f'ALTER TABLE {table} ADD COLUMN guild TEXT NOT NULL DEFAULT {default}')
+            await con.execute(f'ALTER TABLE {table} ALTER COLUMN guild DROP DEFAULT')
+            if primary_key:
+                name, key = primary_key[0]
+                columns = ', '.join(f'"{column}"' for column in ['guild', *key])
+                await con.execute(f'ALTER TABLE {table} DROP CONSTRAINT {name}')
+                await con.execute(f'ALTER TABLE {table} ADD PRIMARY KEY ({columns})')
+        logger.info('Assigned the rows of %s to %s', table, guild)
+
+
+async def migrate_partitions(database: DBManager, drop: bool = False) -> None:
+    for table in PARTITIONED:
+        await database.partitions.migrate(table, drop)
+    # the indexes of the old tables were renamed, create them on the new ones
+    await database.guild_activity.create()
+    await database.guild_xp.create()
+    await database.partitions.create_indexes()
+
+
+async def main() -> None:
+    parser = ArgumentParser(description='Migrate existing data to a new schema.')
+    parser.add_argument('migration', choices=['guilds', 'series', 'partitions'])
+    parser.add_argument('--drop', action='store_true', help='drop the old tables afterwards')
+    parser.add_argument('--guild', help='guild of the existing rows, the primary guild by default')
+    args = parser.parse_args()
+    guild = args.guild or GuildRegistry.load().primary.name
+
+    database = DBManager()
+    await database.connect()
+    try:
+        if args.migration == 'guilds':
+            await migrate_guilds(database, guild)
+        elif args.migration == 'series':
+            await migrate_series(database, guild, args.drop)
+        else:
+            await migrate_partitions(database, args.drop)
+    finally:
+        await database.disconnect()
+
+
+if __name__ == '__main__':
+    basicConfig(format='[%(levelname)s] %(asctime)s - %(name)s: %(message)s', level=INFO)
+    run(main())
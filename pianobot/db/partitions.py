@@ -0,0 +1,215 @@
+from datetime import datetime, timezone
+from logging import getLogger
+
+from pianobot.db.connection import Connection
+from pianobot.db.rollup import RAW_RETENTION
+
+# partition column of every table that is partitioned by month
+PARTITIONED = {
+    'raid_log': 'timestamp',
+    'war_log': 'timestamp',
+    'guild_activity_series': 'time',
+    'guild_xp_series': 'time',
+}
+# raw series rows are folded into the rollup tables, so old partitions are empty and dropped
+RETENTION = {
+    'guild_activity_series': RAW_RETENTION,
+    'guild_xp_series': RAW_RETENTION,
+}
+# the logs are only appended to, so a BRIN index stays small and matches the physical order,
+# prev_raids is updated in place and gets a btree
+INDEXES = [
+    ('raid_log_timestamp_brin', 'raid_log', 'brin', 'timestamp'),
+    ('war_log_timestamp_brin', 'war_log', 'brin', 'timestamp'),
+    ('prev_raids_timestamp', 'prev_raids', 'btree', 'timestamp'),
+]
+MONTHS_AHEAD = 2
+
+
+def month_start(time: datetime, offset: int = 0) -> datetime:
+    month = time.year * 12 + time.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+class PartitionManager:
+    """Keeps the append-only tables partitioned by month.
+
+    Partitions are created a few months ahead, rows outside of them land in a default
+    partition and are moved out once their partition is created. Range queries on the
+    partition column only scan the partitions they need, and retention drops whole
+    partitions instead of deleting rows.
+    """
+
+    def __init__(self, con: Connection) -> None:
+        self._con = con
+        self._logger = getLogger('database.partitions')
+
+    async def exists(self, table: str) -> bool:
+        return (await self._con.query('SELECT to_regclass($1) IS NOT NULL', table))[0][0]
+
+    async def is_partitioned(self, table: str) -> bool:
+        result = await self._con.query(
+            'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass($1))',
+            table,
+        )
+        return result[0][0]
+
+    async def partitions(self, table: str) -> list[str]:
+        result = await self._con.query(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid'
+            ' WHERE i.inhparent = to_regclass($1) ORDER BY c.relname',
+            table,
+        )
+        return [row[0] for row in result]
+
+    async def maintain(self) -> None:
+        """Creates upcoming partitions and indexes and applies the retention."""
+        now = datetime.now(timezone.utc)
+        for table in PARTITIONED:
+            if not await self.is_partitioned(table):
+                continue
+            await self.ensure(table, month_start(now), month_start(now, MONTHS_AHEAD))
+            if table in RETENTION:
+                await self.drop_before(table, now - RETENTION[table], only_empty=True)
+        await self.create_indexes()
+
+    async def ensure(self, table: str, first: datetime, last: datetime) -> None:
+        """Creates the monthly partitions from the month of ``first`` to that of ``last``."""
+        existing = set(await self.partitions(table))
+        if f'{table}_default' not in existing:
+            await self._con.execute(
+                f'CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT'
+            )
+        month = month_start(first)
+        while month <= last:
+            if self._name(table, month) not in existing:
+                await self._add_partition(table, month)
+            month = month_start(month, 1)
+
+    async def drop_before(self, table: str, cutoff: datetime, only_empty: bool = False) -> list[str]:
+        """Drops the partitions that only hold rows from before ``cutoff``."""
+        dropped = []
+        for name in await self.partitions(table):
+            suffix = name.removeprefix(f'{table}_')
+            if not suffix.isdigit():
+                continue
+            month = datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=timezone.utc)
+            if month_start(month, 1) > cutoff:
+                continue
+            if only_empty:
+                rows = await self._con.query(f'SELECT EXISTS (SELECT 1 FROM {name})')
+                if rows[0][0]:
+                    continue
+            await self._con.execute(f'DROP TABLE {name}')
+            self._logger.info('Dropped partition %s', name)
+            dropped.append(name)
+        return dropped
+
+    async def create_indexes(self) -> None:
+        for name, table, method, column in INDEXES:
+            if await self.exists(table):
+                await self._con.execute(
+                    f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING {method} ("{column}")'
+                )
+
+    async def migrate(self, table: str, drop: bool = False) -> None:
+        """Replaces a regular table with a partitioned one holding the same rows.
+
+        The old table is kept as ``<table>_unpartitioned`` unless ``drop`` is set. Its
+        primary key is recreated with the partition column added, as Postgres requires."""
+        column = PARTITIONED[table]
+        if not await self.exists(table) or await self.is_partitioned(table):
+            self._logger.info('%s does not need to be migrated', table)
+            return
+
+        old = f'{table}_unpartitioned'
+        async with self._con.transaction():
+            bounds = await self._con.query(f'SELECT min("{column}"), max("{column}") FROM {table}')
+            primary_key = await self._con.query(
+                'SELECT array_agg(a.attname ORDER BY k.ord) FROM pg_index i,'
+                ' unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord), pg_attribute a'
+                ' WHERE i.indrelid = to_regclass($1) AND i.indisprimary'
+                ' AND a.attrelid = i.indrelid AND a.attnum = k.attnum',
+                table,
+            )
+            indexes = await self._con.query(
+                'SELECT indexname FROM pg_indexes WHERE tablename = $1', table
+            )
+
+            # index names are unique per schema, keep them free for the new table
+            await self._con.execute(f'ALTER TABLE {table} RENAME TO {old}')
+            for row in indexes:
+                await self._con.execute(f'ALTER INDEX {row[0]} RENAME TO {row[0]}_unpartitioned')
+            await self._con.execute(
+                f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS'
+                f' INCLUDING IDENTITY) PARTITION BY RANGE ("{column}")'
+            )
+            if primary_key[0][0]:
+                key = list(primary_key[0][0])
+                if column not in key:
+                    key.append(column)
+                columns = ', '.join(f'"{name}"' for name in key)
+                await self._con.execute(f'ALTER TABLE {table} ADD PRIMARY KEY ({columns})')
+
+            now = datetime.now(timezone.utc)
+            first, last = bounds[0]
+            await self.ensure(
+                table,
+                min(first, now) if first is not None else now,
+                month_start(max(last, now) if last is not None else now, MONTHS_AHEAD),
+            )
+            await self._con.execute(
+                f'INSERT INTO {table} OVERRIDING SYSTEM VALUE SELECT * FROM {old}'
+            )
+            await self._move_sequences(table, old)
+            if drop:
+                await self._con.execute(f'DROP TABLE {old}')
+        self._logger.info('Partitioned %s by month', table)
+
+    async def _move_sequences(self, table: str, old: str) -> None:
+        columns = await self._con.query(
+            'SELECT attname, attidentity != \'\' FROM pg_attribute'
+            ' WHERE attrelid = to_regclass($1) AND attnum > 0 AND NOT attisdropped',
+            table,
+        )
+        for name, identity in columns:
+            if identity:
+                # a new identity column starts counting from one again
+                await self._con.execute(
+                    f'SELECT setval(pg_get_serial_sequence($1, $2), max("{name}")) FROM {table}'
+                    f' HAVING max("{name}") IS NOT NULL',
+                    table,
+                    name,
+                )
+                continue
+            sequence = (
+                await self._con.query('SELECT pg_get_serial_sequence($1, $2)', old, name)
+            )[0][0]
+            if sequence is not None:
+                # a serial column, the sequence would be dropped together with the old table
+                await self._con.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}."{name}"')
+
+    async def _add_partition(self, table: str, month: datetime) -> None:
+        name = self._name(table, month)
+        column = PARTITIONED[table]
+        start, end = month.isoformat(), month_start(month, 1).isoformat()
+        # rows of the month may already be in the default partition, they have to be
+        # moved before the partition can be attached
+        async with self._con.transaction():
+            await self._con.execute(
+                f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+            )
+            await self._con.execute(
+                f'WITH moved AS (DELETE FROM {table}_default'
+                f' WHERE "{column}" >= \'{start}\' AND "{column}" < \'{end}\' RETURNING *)'
+                f' INSERT INTO {name} SELECT * FROM moved'
+            )
+            await self._con.execute(
+                f'ALTER TABLE {table} ATTACH PARTITION {name}'
+                f' FOR VALUES FROM (\'{start}\') TO (\'{end}\')'
+            )
+        self._logger.info('Created partition %s', name)
+
+    @staticmethod
+    def _name(table: str, month: datetime) -> str:
+        return f'{table}_{month.year}{month.month:02}'
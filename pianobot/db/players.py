@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Iterable
 from uuid import UUID
 
 from pianobot.db import Connection
@@ -21,19 +22,48 @@ class Player:
 
 
 class PlayerTable:
+    """Players and when they were last seen online.
+
+    Sightings are recorded in memory with :py:meth:`mark_seen` and written in bulk by
+    :py:meth:`flush`, reads combine them with the saved ones.
+    """
+
     def __init__(self, con: Connection) -> None:
         self._con = con
+        self._pending: dict[UUID, datetime] = {}
+        self._get_selected = con.prepare(
+            'players.get_selected', 'SELECT uuid, last_seen FROM players WHERE uuid = ANY($1)'
+        )
 
-    async def get_selected(self, uuids: list[UUID]) -> list[Player]:
-        result = await self._con.query('SELECT uuid, last_seen FROM players WHERE uuid = ANY($1)', uuids)
-        return [Player(row[0], row[1]) for row in result]
+    @property
+    def pending(self) -> int:
+        """Number of players whose last sighting was not written yet."""
+        return len(self._pending)
 
-    async def add(self, uuid: UUID, last_seen: datetime) -> None:
-        await self._con.execute('INSERT INTO players (uuid, last_seen) VALUES ($1, $2)', uuid, last_seen)
+    def mark_seen(self, uuids: Iterable[UUID], seen_at: datetime) -> None:
+        self._pending.update(dict.fromkeys(uuids, seen_at))
 
-    async def add_multiple(self, uuids: list[UUID]):
-        placeholder = ','.join(f"('{uuid}')" for uuid in uuids)
-        await self._con.execute(f'INSERT INTO players (uuid) VALUES {placeholder} ON CONFLICT DO NOTHING')
+    async def flush(self) -> None:
+        """Writes all pending sightings, new players are added."""
+        pending, self._pending = self._pending, {}
+        try:
+            await self._con.copy(
+                'players',
+                ['uuid', 'last_seen'],
+                pending.items(),
+                conflict=['uuid'],
+                update=['last_seen'],
+            )
+        except BaseException:
+            # keep the sightings for the next flush, unless the player was seen again since
+            self._pending = pending | self._pending
+            raise
 
-    async def update_last_seen(self, uuids: list[UUID]) -> None:
-        await self._con.execute('UPDATE players SET last_seen = CURRENT_TIMESTAMP WHERE uuid = ANY($1)', uuids)
+    async def get_selected(self, uuids: Iterable[UUID]) -> list[Player]:
+        uuids = set(uuids)
+        saved = [uuid for uuid in uuids if uuid not in self._pending]
+        players = {uuid: self._pending[uuid] for uuid in uuids - set(saved)}
+        if saved:
+            for row in await self._con.query(self._get_selected, saved):
+                players[row[0]] = row[1]
+        return [Player(uuid, last_seen) for uuid, last_seen in players.items()]
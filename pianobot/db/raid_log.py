@@ -11,22 +11,29 @@ class RaidLogTable:
     def __init__(self, con: Connection) -> None:
         self._con = con
 
-    async def add(self, uuid: UUID, name: str) -> None:
+    async def add(self, guild: str, uuid: UUID, name: str) -> None:
         try:
             await self._con.execute(
-                'INSERT INTO raid_log (uuid, raid_id)'
-                ' VALUES ($1, (SELECT id FROM raid_names WHERE name = $2))',
+                'INSERT INTO raid_log (guild, uuid, raid_id)'
+                ' VALUES ($1, $2, (SELECT id FROM raid_names WHERE name = $3))',
+                guild,
                 uuid,
                 name
             )
         except NotNullViolationError:
             getLogger('db.raid_log').warning('Failed to add log entry for (%s, %s)', uuid, name)
 
-    async def get_between(self, start: datetime | None = None, end: datetime | None = None) -> dict[str, int]:
+    async def get_between(
+        self, guild: str, start: datetime | None = None, end: datetime | None = None
+    ) -> dict[str, int]:
+        """Raids done for ``guild`` by player name, players without a known name are listed
+        by their uuid."""
         result = await self._con.query(
-            'SELECT m.name, count(*) FROM members m, raid_log l'
-            ' WHERE m.uuid = l.uuid AND l.timestamp >= $1 AND l.timestamp < $2'
-            ' GROUP BY m.name',
+            'SELECT coalesce((SELECT m.name FROM members m WHERE m.uuid = l.uuid'
+            ' ORDER BY m.guild = $1 DESC LIMIT 1), l.uuid::text), count(*) FROM raid_log l'
+            ' WHERE l.guild = $1 AND l.timestamp >= $2 AND l.timestamp < $3'
+            ' GROUP BY l.uuid',
+            guild,
             start or datetime.min,
             end or datetime.max,
         )
@@ -34,15 +41,18 @@ class RaidLogTable:
 
     async def get_specific_between(
         self,
+        guild: str,
         raid: str,
         start: datetime | None = None,
         end: datetime | None = None,
     ) -> dict[str, int]:
         result = await self._con.query(
-            'SELECT m.name, count(*) FROM members m, raid_log l'
-            ' WHERE m.uuid = l.uuid AND raid_id = (SELECT id FROM raid_names WHERE name = $1)'
-            ' AND l.timestamp >= $2 AND l.timestamp < $3'
-            ' GROUP BY m.name',
+            'SELECT coalesce((SELECT m.name FROM members m WHERE m.uuid = l.uuid'
+            ' ORDER BY m.guild = $1 DESC LIMIT 1), l.uuid::text), count(*) FROM raid_log l'
+            ' WHERE l.guild = $1 AND raid_id = (SELECT id FROM raid_names WHERE name = $2)'
+            ' AND l.timestamp >= $3 AND l.timestamp < $4'
+            ' GROUP BY l.uuid',
+            guild,
             raid,
             start or datetime.min,
             end or datetime.max,
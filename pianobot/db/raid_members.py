@@ -1,131 +1,205 @@
+from asyncio import to_thread
 from datetime import datetime
+from typing import Iterable
 from uuid import UUID
 
 from pianobot.db import Connection
 
 
 class RaidMemberTable:
+    """Raid and xp rewards of the members of the tracked guilds, every method works on the
+    members of one guild."""
+
     def __init__(self, con: Connection) -> None:
         self._con = con
+        self._get_all = con.prepare(
+            'raid_members.get_all', 'SELECT uuid, xp FROM raid_members WHERE guild = $1'
+        )
+        self._update_xp = con.prepare(
+            'raid_members.update_xp',
+            'UPDATE raid_members SET xp = $2 WHERE guild = $1 AND uuid = $3',
+        )
+        self._add_many = con.prepare(
+            'raid_members.add_many',
+            'INSERT INTO raid_members (guild, uuid, xp)'
+            ' SELECT $1, u.* FROM unnest($2::uuid[], $3::bigint[]) AS u',
+        )
+        self._update_xp_many = con.prepare(
+            'raid_members.update_xp_many',
+            'UPDATE raid_members r SET xp = u.xp FROM unnest($2::uuid[], $3::bigint[]) AS u(uuid, xp)'
+            ' WHERE r.guild = $1 AND r.uuid = u.uuid',
+        )
+
+        self._add_xp_many = con.prepare(
+            'raid_members.add_xp_many',
+            'UPDATE raid_members r SET pending_xp = r.pending_xp + u.amount,'
+            ' xp_ems = r.xp_ems + CASE WHEN (r.pending_xp + u.amount) / 1000000000'
+            ' > r.pending_xp / 1000000000 THEN $4 ELSE 0 END'
+            ' FROM unnest($2::uuid[], $3::bigint[]) AS u(uuid, amount)'
+            ' WHERE r.guild = $1 AND r.uuid = u.uuid',
+        )
 
-    async def get_all(self) -> dict[UUID, int]:
-        result = await self._con.query('SELECT uuid, xp FROM raid_members')
+    async def get_all(self, guild: str) -> dict[UUID, int]:
+        result = await self._con.query(self._get_all, guild)
         return {row[0]: row[1] for row in result}
 
-    async def add(self, uuid: UUID, xp: int) -> None:
-        await self._con.execute('INSERT INTO raid_members (uuid, xp) VALUES ($1, $2)', uuid, xp)
+    async def add(self, guild: str, uuid: UUID, xp: int) -> None:
+        await self._con.execute(
+            'INSERT INTO raid_members (guild, uuid, xp) VALUES ($1, $2, $3)', guild, uuid, xp
+        )
+
+    async def add_many(self, guild: str, members: Iterable[tuple[UUID, int]]) -> None:
+        """Adds members given as ``(uuid, xp)``."""
+        rows = list(members)
+        if rows:
+            await self._con.execute(self._add_many, guild, *map(list, zip(*rows)))
 
-    async def add_raid(self, username: str) -> None:
-        with open('emeralds.txt', 'r', encoding='UTF-8') as f:
-            emeralds_per_raid = int(f.readline())
+    async def add_raid(self, guild: str, username: str) -> None:
+        emeralds_per_raid = await to_thread(read_setting, 'emeralds.txt')
         await self._con.execute(
             (
-                'UPDATE raid_members SET pending_raids = pending_raids + $1,'
+                'UPDATE raid_members SET pending_raids = pending_raids + $2,'
                 ' pending_aspects = CASE WHEN pending_aspects < 0 THEN -1 ELSE pending_aspects + 1 END'
-                ' where uuid = (SELECT uuid FROM members WHERE name = $2)'
+                ' where guild = $1 AND uuid = (SELECT uuid FROM members WHERE guild = $1 AND name = $3)'
             ),
+            guild,
             emeralds_per_raid,
             username
         )
 
-    async def add_xp(self, uuid: UUID, amount: int) -> None:
+    async def add_xp(self, guild: str, uuid: UUID, amount: int) -> None:
         old_amount = (await self._con.query(
-            'SELECT pending_xp FROM raid_members WHERE uuid = $1',
+            'SELECT pending_xp FROM raid_members WHERE guild = $1 AND uuid = $2',
+            guild,
             uuid,
         ))[0][0]
         rewards = (old_amount + amount) // 1000000000 > old_amount // 1000000000
         if rewards:
-            with open('xp_emeralds.txt', 'r', encoding='UTF-8') as f:
-                rewards *= int(f.readline())
+            rewards *= await to_thread(read_setting, 'xp_emeralds.txt')
         await self._con.execute(
-            'UPDATE raid_members SET pending_xp = pending_xp + $1, xp_ems = xp_ems + $2 where uuid = $3',
+            'UPDATE raid_members SET pending_xp = pending_xp + $2, xp_ems = xp_ems + $3'
+            ' where guild = $1 AND uuid = $4',
+            guild,
             amount,
             rewards,
             uuid,
         )
 
-    async def get_xp(self) -> dict[str, (int, int)]:
+    async def add_xp_many(self, guild: str, members: Iterable[tuple[UUID, int]]) -> None:
+        """Adds pending xp to members given as ``(uuid, amount)``, with the same rewards as
+        :py:meth:`add_xp`."""
+        rows = list(members)
+        if not rows:
+            return
+        rewards = await to_thread(read_setting, 'xp_emeralds.txt')
+        await self._con.execute(self._add_xp_many, guild, *map(list, zip(*rows)), rewards)
+
+    async def get_xp(self, guild: str) -> dict[str, (int, int)]:
         result = await self._con.query(
             'SELECT name, pending_xp, xp_ems FROM members m, raid_members r'
-            ' where m.uuid = r.uuid and xp_ems > 0',
+            ' where r.guild = $1 and m.guild = r.guild and m.uuid = r.uuid and xp_ems > 0',
+            guild,
         )
         return {row[0]: (row[1], row[2]) for row in result}
 
-    async def reset_xp(self, username: str) -> bool:
+    async def reset_xp(self, guild: str, username: str) -> bool:
         result = await self._con.execute(
             'UPDATE raid_members SET pending_xp = MOD(pending_xp, 1000000000), xp_ems = MOD(xp_ems, 4096)'
-            ' WHERE uuid = (SELECT uuid FROM members WHERE name ILIKE $1)',
+            ' WHERE guild = $1 AND uuid = (SELECT uuid FROM members WHERE guild = $1 AND name ILIKE $2)',
+            guild,
             username
         )
         return result.endswith('1')
 
-    async def set_aspects(self, username: str, amount: int) -> bool:
+    async def set_aspects(self, guild: str, username: str, amount: int) -> bool:
         result = await self._con.execute(
-            'UPDATE raid_members SET pending_aspects = $1'
-            ' where uuid = (SELECT uuid FROM members WHERE name ILIKE $2)',
+            'UPDATE raid_members SET pending_aspects = $2'
+            ' where guild = $1 AND uuid = (SELECT uuid FROM members WHERE guild = $1 AND name ILIKE $3)',
+            guild,
             amount,
             username
         )
         return result.endswith('1')
 
-    async def get_blocked_aspects(self) -> list[str]:
+    async def get_blocked_aspects(self, guild: str) -> list[str]:
         result = await self._con.query(
             'SELECT name FROM members m, raid_members r'
-            ' where m.uuid = r.uuid and pending_aspects < 0',
+            ' where r.guild = $1 and m.guild = r.guild and m.uuid = r.uuid and pending_aspects < 0',
+            guild,
         )
         return [row[0] for row in result]
 
-    async def get_pending(self) -> dict[str, int]:
+    async def get_pending(self, guild: str) -> dict[str, int]:
         result = await self._con.query(
             'SELECT name, pending_raids FROM members m, raid_members r'
-            ' where m.uuid = r.uuid and pending_raids > 0',
+            ' where r.guild = $1 and m.guild = r.guild and m.uuid = r.uuid and pending_raids > 0',
+            guild,
         )
         return {row[0]: row[1] for row in result}
 
-    async def get_pending_left(self) -> dict[UUID, int]:
+    async def get_pending_left(self, guild: str) -> dict[UUID, int]:
         result = await self._con.query(
-            'SELECT uuid, pending_raids FROM raid_members'
-            ' where pending_raids > 0 AND uuid NOT IN (SELECT uuid FROM members)',
+            'SELECT uuid, pending_raids FROM raid_members where guild = $1 AND pending_raids > 0'
+            ' AND uuid NOT IN (SELECT uuid FROM members WHERE guild = $1)',
+            guild,
         )
         return {row[0]: row[1] for row in result}
 
-    async def reset_pending(self, username: str) -> bool:
+    async def reset_pending(self, guild: str, username: str) -> bool:
         result = await self._con.execute(
-            'UPDATE raid_members SET pending_raids = MOD(pending_raids, 4096)'
-            ' WHERE uuid = (SELECT uuid FROM members WHERE name ILIKE $1) OR uuid::TEXT = $1',
+            'UPDATE raid_members SET pending_raids = MOD(pending_raids, 4096) WHERE guild = $1 AND'
+            ' (uuid = (SELECT uuid FROM members WHERE guild = $1 AND name ILIKE $2) OR uuid::TEXT = $2)',
+            guild,
             username
         )
         return result.endswith('1')
 
-    async def get_aspects(self) -> dict[str, tuple[int, datetime]]:
+    async def get_aspects(self, guild: str) -> dict[str, tuple[int, datetime]]:
         result = await self._con.query(
             'SELECT name, pending_aspects, join_date FROM members m, raid_members r'
-            ' where m.uuid = r.uuid and pending_aspects > 0',
+            ' where r.guild = $1 and m.guild = r.guild and m.uuid = r.uuid and pending_aspects > 0',
+            guild,
         )
         return {row[0]: (row[1], row[2]) for row in result}
 
-    async def get_aspects_left(self) -> dict[UUID, int]:
+    async def get_aspects_left(self, guild: str) -> dict[UUID, int]:
         result = await self._con.query(
-            'SELECT uuid, pending_aspects FROM raid_members'
-            ' where pending_aspects > 0 AND uuid NOT IN (SELECT uuid FROM members)',
+            'SELECT uuid, pending_aspects FROM raid_members where guild = $1 AND pending_aspects > 0'
+            ' AND uuid NOT IN (SELECT uuid FROM members WHERE guild = $1)',
+            guild,
         )
         return {row[0]: row[1] for row in result}
 
-    async def reset_aspects(self, username: str | None = None) -> bool:
+    async def reset_aspects(self, guild: str, username: str | None = None) -> bool:
         if username is not None:
             result = await self._con.execute(
-                'UPDATE raid_members SET pending_aspects = MOD(pending_aspects, 2)'
-                ' WHERE uuid = (SELECT uuid FROM members WHERE name ILIKE $1) OR uuid::TEXT = $1',
+                'UPDATE raid_members SET pending_aspects = MOD(pending_aspects, 2) WHERE guild = $1 AND'
+                ' (uuid = (SELECT uuid FROM members WHERE guild = $1 AND name ILIKE $2) OR uuid::TEXT = $2)',
+                guild,
                 username
             )
             return result.endswith('1')
         await self._con.execute(
-            'UPDATE raid_members SET pending_aspects = MOD(pending_aspects, 2)'
+            'UPDATE raid_members SET pending_aspects = MOD(pending_aspects, 2) WHERE guild = $1',
+            guild,
         )
         return True
 
-    async def remove(self, uuid: UUID) -> None:
-        await self._con.execute('DELETE FROM raid_members WHERE uuid = $1', uuid)
+    async def remove(self, guild: str, uuid: UUID) -> None:
+        await self._con.execute(
+            'DELETE FROM raid_members WHERE guild = $1 AND uuid = $2', guild, uuid
+        )
+
+    async def update_xp(self, guild: str, uuid: UUID, xp: int) -> None:
+        await self._con.execute(self._update_xp, guild, xp, uuid)
+
+    async def update_xp_many(self, guild: str, members: Iterable[tuple[UUID, int]]) -> None:
+        """Updates the xp of members given as ``(uuid, xp)``."""
+        rows = list(members)
+        if rows:
+            await self._con.execute(self._update_xp_many, guild, *map(list, zip(*rows)))
+
 
-    async def update_xp(self, uuid: UUID, xp: int) -> None:
-        await self._con.execute('UPDATE raid_members SET xp = $1 WHERE uuid = $2', xp, uuid)
+def read_setting(file: str) -> int:
+    with open(file, 'r', encoding='UTF-8') as f:
+        return int(f.readline())
@@ -1,3 +1,4 @@
+from typing import Iterable
 from uuid import UUID
 
 from pianobot.db import Connection
@@ -6,37 +7,79 @@ from pianobot.db import Connection
 class RaidTable:
     def __init__(self, con: Connection) -> None:
         self._con = con
+        self._get_for_player = con.prepare(
+            'raids.get_for_player', 'SELECT raid, amount FROM raids WHERE uuid = $1'
+        )
+        self._prev_for_player = con.prepare(
+            'raids.prev_for_player',
+            'SELECT raid, amount FROM prev_raids WHERE uuid = $1'
+            ' AND timestamp >= NOW() - \'10 minutes\'::INTERVAL',
+        )
+        self._set = con.prepare(
+            'raids.set',
+            'INSERT INTO raids VALUES ($1, $2, $3)'
+            ' ON CONFLICT (uuid, raid) DO UPDATE SET amount = EXCLUDED.amount',
+        )
+        self._set_prev = con.prepare(
+            'raids.set_prev',
+            'INSERT INTO prev_raids VALUES ($1, $2, $3) ON CONFLICT (uuid, raid)'
+            ' DO UPDATE SET amount = EXCLUDED.amount, timestamp = CURRENT_TIMESTAMP',
+        )
+        self._get_for_players = con.prepare(
+            'raids.get_for_players', 'SELECT uuid, raid, amount FROM raids WHERE uuid = ANY($1)'
+        )
+        self._prev_for_players = con.prepare(
+            'raids.prev_for_players',
+            'SELECT uuid, raid, amount FROM prev_raids WHERE uuid = ANY($1)'
+            ' AND timestamp >= NOW() - \'10 minutes\'::INTERVAL',
+        )
+        self._set_many = con.prepare(
+            'raids.set_many',
+            'INSERT INTO raids SELECT * FROM unnest($1::uuid[], $2::text[], $3::int[])'
+            ' ON CONFLICT (uuid, raid) DO UPDATE SET amount = EXCLUDED.amount',
+        )
+        self._set_prev_many = con.prepare(
+            'raids.set_prev_many',
+            'INSERT INTO prev_raids SELECT * FROM unnest($1::uuid[], $2::text[], $3::int[])'
+            ' ON CONFLICT (uuid, raid)'
+            ' DO UPDATE SET amount = EXCLUDED.amount, timestamp = CURRENT_TIMESTAMP',
+        )
 
     async def get_for_player(self, uuid: UUID) -> dict[str, int]:
-        result = await self._con.query('SELECT raid, amount FROM raids WHERE uuid = $1', uuid)
+        result = await self._con.query(self._get_for_player, uuid)
         return {row[0]: row[1] for row in result}
 
     async def prev_for_player(self, uuid: UUID) -> dict[str, int]:
-        result = await self._con.query(
-            'SELECT raid, amount FROM prev_raids WHERE uuid = $1'
-            ' AND timestamp >= NOW() - \'10 minutes\'::INTERVAL',
-            uuid,
-        )
+        result = await self._con.query(self._prev_for_player, uuid)
         return {row[0]: row[1] for row in result}
 
     async def set(self, uuid: UUID, raid: str, amount: int) -> None:
-        await self._con.execute(
-            (
-                'INSERT INTO raids VALUES ($1, $2, $3)'
-                ' ON CONFLICT (uuid, raid) DO UPDATE SET amount = EXCLUDED.amount'
-            ),
-            uuid,
-            raid,
-            amount,
-        )
+        await self._con.execute(self._set, uuid, raid, amount)
 
     async def set_prev(self, uuid: UUID, raid: str, amount: int) -> None:
-        await self._con.execute(
-            (
-                'INSERT INTO prev_raids VALUES ($1, $2, $3) ON CONFLICT (uuid, raid)'
-                ' DO UPDATE SET amount = EXCLUDED.amount, timestamp = CURRENT_TIMESTAMP'
-            ),
-            uuid,
-            raid,
-            amount,
-        )
+        await self._con.execute(self._set_prev, uuid, raid, amount)
+
+    async def get_for_players(self, uuids: Iterable[UUID]) -> dict[UUID, dict[str, int]]:
+        result = await self._con.query(self._get_for_players, list(uuids))
+        raids: dict[UUID, dict[str, int]] = {}
+        for row in result:
+            raids.setdefault(row[0], {})[row[1]] = row[2]
+        return raids
+
+    async def prev_for_players(self, uuids: Iterable[UUID]) -> dict[UUID, dict[str, int]]:
+        result = await self._con.query(self._prev_for_players, list(uuids))
+        raids: dict[UUID, dict[str, int]] = {}
+        for row in result:
+            raids.setdefault(row[0], {})[row[1]] = row[2]
+        return raids
+
+    async def set_many(self, amounts: Iterable[tuple[UUID, str, int]]) -> None:
+        """Sets raid completions given as ``(uuid, raid, amount)``."""
+        rows = list(amounts)
+        if rows:
+            await self._con.execute(self._set_many, *map(list, zip(*rows)))
+
+    async def set_prev_many(self, amounts: Iterable[tuple[UUID, str, int]]) -> None:
+        rows = list(amounts)
+        if rows:
+            await self._con.execute(self._set_prev_many, *map(list, zip(*rows)))
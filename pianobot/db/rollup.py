@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Literal
+
+from pianobot.db.connection import Connection
+
+Unit = Literal['hour', 'day']
+
+# raw points are kept for a week and hourly ones for two, older data is kept per day
+RAW_RETENTION = timedelta(days=7)
+HOURLY_RETENTION = timedelta(days=14)
+
+
+class Rollup:
+    """Folds the rows of a series table that are older than ``keep`` into one row per entity
+    and ``unit`` in a coarser table, combining their values with ``aggregate``. ``keys`` are
+    text columns the entity is nested in, like the guild of a member.
+
+    Every :py:meth:`run` handles at most a few chunks of ``chunk`` length, each in its own
+    short transaction, so a large backlog is worked off over several runs instead of in one
+    long locking delete.
+    """
+
+    def __init__(
+        self,
+        con: Connection,
+        source: str,
+        target: str,
+        *,
+        entity: str,
+        keys: Iterable[str] = (),
+        value: str,
+        value_type: str,
+        aggregate: str,
+        unit: Unit,
+        keep: timedelta,
+        chunk: timedelta,
+    ) -> None:
+        self._con = con
+        self._target = target
+        self._columns = [*keys, entity]
+        self._value = value
+        self._value_type = value_type
+        self._unit = unit
+        self._keep = keep
+        self._chunk = chunk
+        columns = ', '.join(self._columns)
+        groups = ', '.join(str(i) for i in range(1, len(self._columns) + 2))
+        self._oldest = con.prepare(f'{source}.oldest', f'SELECT min(time) FROM {source}')
+        self._fold = con.prepare(
+            f'{target}.fold',
+            f'INSERT INTO {target} ({columns}, time, {value})'
+            f' SELECT {columns}, date_trunc(\'{unit}\', time, \'UTC\'), {aggregate}({value})'
+            f' FROM {source} WHERE time >= $1 AND time < $2 GROUP BY {groups}'
+            f' ON CONFLICT ({columns}, time) DO UPDATE SET {value} = EXCLUDED.{value}',
+        )
+        self._delete = con.prepare(
+            f'{source}.delete', f'DELETE FROM {source} WHERE time >= $1 AND time < $2'
+        )
+
+    async def create(self) -> None:
+        columns = ''.join(f' {column} TEXT NOT NULL,' for column in self._columns)
+        await self._con.execute(
+            f'CREATE TABLE IF NOT EXISTS {self._target} ({columns}'
+            f' time TIMESTAMPTZ NOT NULL,'
+            f' {self._value} {self._value_type} NOT NULL,'
+            f' PRIMARY KEY ({", ".join(self._columns)}, time))'
+        )
+        await self._con.execute(
+            f'CREATE INDEX IF NOT EXISTS {self._target}_time ON {self._target} (time)'
+        )
+
+    async def run(self, max_chunks: int = 4) -> bool:
+        """Folds up to ``max_chunks`` chunks and returns whether no old rows are left."""
+        cutoff = self._truncate(datetime.now(timezone.utc) - self._keep)
+        for _ in range(max_chunks):
+            oldest = (await self._con.query(self._oldest))[0][0]
+            if oldest is None or oldest >= cutoff:
+                return True
+            start = self._truncate(oldest)
+            end = min(start + self._chunk, cutoff)
+            async with self._con.transaction():
+                await self._con.execute(self._fold, start, end)
+                await self._con.execute(self._delete, start, end)
+        return False
+
+    def _truncate(self, time: datetime) -> datetime:
+        time = time.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        return time.replace(hour=0) if self._unit == 'day' else time
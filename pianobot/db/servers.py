@@ -1,7 +1,15 @@
+from asyncio import Task, create_task
 from datetime import datetime
+from logging import getLogger
+from os import getpid
+from typing import Any
+
+from asyncpg import Record
 
 from pianobot.db import Connection
 
+CHANNEL = 'servers_changed'
+
 
 class Server:
     def __init__(
@@ -50,52 +58,113 @@ class Server:
     def ping_rank(self) -> int | None:
         return self._ping_rank
 
+    def replace(self, **changes: Any) -> 'Server':
+        fields = {name[1:]: value for name, value in vars(self).items()}
+        fields.update(changes)
+        return Server(**fields)
+
+    @classmethod
+    def from_row(cls, row: Record) -> 'Server':
+        return cls(row[0], row[1], row[2], row[3], row[4], row[5], row[6])
+
 
 class ServerTable:
+    """Server settings, kept in memory after :py:meth:`load` so that looking up the prefix
+    of every message does not need a query. Every write goes to the database first and
+    then updates the cached row.
+
+    With ``listen`` enabled, writes are also announced on a Postgres notification channel
+    and other processes sharing the database reload the rows they did not write themselves.
+    """
+
     def __init__(self, con: Connection) -> None:
         self._con = con
+        self._cache: dict[int, Server] | None = None
+        self._notify = False
+        self._refreshes: set[Task[None]] = set()
+
+    async def load(self, listen: bool = False) -> None:
+        result = await self._con.query('SELECT * FROM servers')
+        self._cache = {row[0]: Server.from_row(row) for row in result}
+        if listen and not self._notify:
+            await self._con.listen(CHANNEL, self._on_notify)
+            self._notify = True
 
     async def add(self, server_id: int) -> None:
-        await self._con.execute('INSERT INTO servers (id) VALUES ($1)', server_id)
+        result = await self._con.query(
+            'INSERT INTO servers (id) VALUES ($1) RETURNING *', server_id
+        )
+        if self._cache is not None:
+            self._cache[server_id] = Server.from_row(result[0])
+        await self._changed(server_id)
 
     async def get_all(self) -> list[Server]:
+        if self._cache is not None:
+            return list(self._cache.values())
         result = await self._con.query('SELECT * FROM servers')
-        return [Server(row[0], row[1], row[2], row[3], row[4], row[5], row[6]) for row in result]
+        return [Server.from_row(row) for row in result]
 
     async def get(self, server_id: int) -> Server | None:
+        if self._cache is not None:
+            return self._cache.get(server_id)
         result = await self._con.query('SELECT * FROM servers WHERE id = $1', server_id)
         if result:
-            row = result[0]
-            return Server(row[0], row[1], row[2], row[3], row[4], row[5], row[6])
+            return Server.from_row(result[0])
         return None
 
     async def update_prefix(self, server_id: int, prefix: str) -> None:
-        await self._con.execute('UPDATE servers SET prefix = $1 WHERE id = $2', prefix, server_id)
+        await self._update(server_id, 'prefix', prefix)
 
     async def update_territory_log_channel(self, server_id: int, channel: int | None) -> None:
-        await self._con.execute(
-            'UPDATE servers SET territory_log_channel = $1 WHERE id = $2', channel, server_id
-        )
+        await self._update(server_id, 'territory_log_channel', channel)
 
     async def update_ping_role(self, server_id: int, ping_role: int | None) -> None:
-        await self._con.execute(
-            'UPDATE servers SET ping_role = $1 WHERE id = $2', ping_role, server_id
-        )
+        await self._update(server_id, 'ping_role', ping_role)
 
     async def update_last_ping(self, server_id: int, last_ping: datetime | None) -> None:
-        await self._con.execute(
-            'UPDATE servers SET last_ping = $1 WHERE id = $2', last_ping, server_id
-        )
+        await self._update(server_id, 'last_ping', last_ping)
 
     async def update_ping_interval(self, server_id: int, ping_interval: int | None) -> None:
-        await self._con.execute(
-            'UPDATE servers SET ping_interval = $1 WHERE id = $2', ping_interval, server_id
-        )
+        await self._update(server_id, 'ping_interval', ping_interval)
 
     async def update_ping_rank(self, server_id: int, ping_rank: int | None) -> None:
-        await self._con.execute(
-            'UPDATE servers SET ping_rank = $1 WHERE id = $2', ping_rank, server_id
-        )
+        await self._update(server_id, 'ping_rank', ping_rank)
 
     async def remove(self, server_id: int) -> None:
         await self._con.execute('DELETE FROM servers WHERE id = $1', server_id)
+        if self._cache is not None:
+            self._cache.pop(server_id, None)
+        await self._changed(server_id)
+
+    async def _update(self, server_id: int, column: str, value: Any) -> None:
+        await self._con.execute(f'UPDATE servers SET {column} = $1 WHERE id = $2', value, server_id)
+        if self._cache is not None and server_id in self._cache:
+            self._cache[server_id] = self._cache[server_id].replace(**{column: value})
+        await self._changed(server_id)
+
+    async def _changed(self, server_id: int) -> None:
+        if self._notify:
+            await self._con.execute(
+                'SELECT pg_notify($1, $2)', CHANNEL, f'{getpid()}:{server_id}'
+            )
+
+    def _on_notify(self, payload: str) -> None:
+        pid, server_id = payload.split(':')
+        if int(pid) == getpid():
+            return
+        refresh = create_task(self._refresh(int(server_id)))
+        self._refreshes.add(refresh)
+        refresh.add_done_callback(self._refreshes.discard)
+
+    async def _refresh(self, server_id: int) -> None:
+        if self._cache is None:
+            return
+        try:
+            result = await self._con.query('SELECT * FROM servers WHERE id = $1', server_id)
+        except Exception:
+            getLogger('database').exception('Failed to reload settings of server %s', server_id)
+            return
+        if result:
+            self._cache[server_id] = Server.from_row(result[0])
+        else:
+            self._cache.pop(server_id, None)
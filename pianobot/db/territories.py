@@ -25,18 +25,28 @@ class Territory:
 class TerritoryTable:
     def __init__(self, con: Connection) -> None:
         self._con = con
+        self._add = con.prepare(
+            'territories.add',
+            'INSERT INTO territories VALUES ($1, $2, $3) ON CONFLICT (name) DO NOTHING',
+        )
+        self._get_all = con.prepare(
+            'territories.get_all', 'SELECT name, guild, acquired FROM territories'
+        )
+        self._remove = con.prepare('territories.remove', 'DELETE FROM territories WHERE name = $1')
+        self._update = con.prepare(
+            'territories.update',
+            'UPDATE territories SET guild = $1, acquired = $2 WHERE name = $3',
+        )
 
     async def add(self, name: str, guild: str | None, acquired: datetime) -> None:
-        await self._con.execute(
-            'INSERT INTO territories VALUES ($1, $2, $3) ON CONFLICT (name) DO NOTHING', name, guild, acquired
-        )
+        await self._con.execute(self._add, name, guild, acquired)
 
     async def get_all(self) -> list[Territory]:
-        result = await self._con.query('SELECT name, guild, acquired FROM territories')
+        result = await self._con.query(self._get_all)
         return [Territory(row[0], row[1], row[2]) for row in result]
 
     async def remove(self, name: str) -> None:
-        await self._con.execute('DELETE FROM territories WHERE name = $1', name)
+        await self._con.execute(self._remove, name)
 
     async def update(self, name: str, guild: str | None, acquired: datetime) -> None:
-        await self._con.execute('UPDATE territories SET guild = $1, acquired = $2 WHERE name = $3', guild, acquired, name)
+        await self._con.execute(self._update, guild, acquired, name)
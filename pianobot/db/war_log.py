@@ -1,4 +1,5 @@
 from logging import getLogger
+from typing import Iterable
 from uuid import UUID
 
 from asyncpg import NotNullViolationError
@@ -20,11 +21,25 @@ class WarLogTable:
         except NotNullViolationError:
             getLogger('db.war_log').warning('Failed to add log entry for (%s)', uuid)
 
-    async def get_between(self, start: datetime | None = None, end: datetime | None = None) -> dict[str, int]:
+    async def add_many(self, uuids: Iterable[UUID]) -> None:
+        """Adds one entry for every uuid, so uuids that won several wars repeat."""
+        uuids = list(uuids)
+        if not uuids:
+            return
+        try:
+            await self._con.copy('war_log', ['uuid'], [(uuid,) for uuid in uuids])
+        except NotNullViolationError:
+            getLogger('db.war_log').warning('Failed to add log entries for (%s)', uuids)
+
+    async def get_between(
+        self, guild: str, start: datetime | None = None, end: datetime | None = None
+    ) -> dict[str, int]:
+        """Wars of the current members of ``guild`` by name."""
         result = await self._con.query(
             'SELECT m.name, count(*) FROM members m, war_log l'
-            ' WHERE m.uuid = l.uuid AND l.timestamp >= $1 AND l.timestamp < $2'
+            ' WHERE m.guild = $1 AND m.uuid = l.uuid AND l.timestamp >= $2 AND l.timestamp < $3'
             ' GROUP BY m.name',
+            guild,
             start or datetime.min,
             end or datetime.max,
         )
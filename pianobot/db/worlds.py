@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Iterable
 
 from pianobot.db import Connection
 
@@ -20,13 +21,32 @@ class World:
 class WorldTable:
     def __init__(self, con: Connection) -> None:
         self._con = con
+        self._get_all = con.prepare('worlds.get_all', 'SELECT * FROM worlds')
+        self._add = con.prepare('worlds.add', 'INSERT INTO worlds (name) VALUES ($1)')
+        self._remove = con.prepare('worlds.remove', 'DELETE FROM worlds WHERE name = $1')
+        self._add_many = con.prepare(
+            'worlds.add_many', 'INSERT INTO worlds (name) SELECT unnest($1::text[])'
+        )
+        self._remove_many = con.prepare(
+            'worlds.remove_many', 'DELETE FROM worlds WHERE name = ANY($1)'
+        )
 
     async def get_all(self) -> list[World]:
-        result = await self._con.query('SELECT * FROM worlds')
+        result = await self._con.query(self._get_all)
         return [World(row[0], row[1]) for row in result]
 
     async def add(self, name: str) -> None:
-        await self._con.execute('INSERT INTO worlds (name) VALUES ($1)', name)
+        await self._con.execute(self._add, name)
 
     async def remove(self, name: str) -> None:
-        await self._con.execute('DELETE FROM worlds WHERE name = $1', name)
+        await self._con.execute(self._remove, name)
+
+    async def add_many(self, names: Iterable[str]) -> None:
+        names = list(names)
+        if names:
+            await self._con.execute(self._add_many, names)
+
+    async def remove_many(self, names: Iterable[str]) -> None:
+        names = list(names)
+        if names:
+            await self._con.execute(self._remove_many, names)
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+MISSING = -1
+
+
+class XPWindow:
+    """The contributed xp snapshots of the last ``span`` in memory, one row per ``step``.
+
+    Rows live in a ring indexed by their time, so recording a snapshot overwrites the one
+    that is exactly ``span`` older. Every member has a column, xp is never negative so
+    members without a value in a snapshot are marked with -1.
+    """
+
+    def __init__(self, span: timedelta = timedelta(days=14), step: timedelta = timedelta(minutes=5)) -> None:
+        self._step = int(step.total_seconds())
+        self._span = int(span.total_seconds())
+        slots = self._span // self._step
+        self._times = np.full(slots, MISSING, dtype=np.int64)
+        self._xp = np.full((slots, 64), MISSING, dtype=np.int64)
+        self._members: dict[str, int] = {}
+        self._names: list[str] = []
+
+    @property
+    def oldest(self) -> datetime | None:
+        """Time of the oldest snapshot in the window."""
+        times = self._times[self._valid()]
+        return _datetime(times.min()) if times.size else None
+
+    def record(self, time: datetime, data: dict[str, int | None]) -> None:
+        """Adds a snapshot. Members that already have a value at this time keep it, like
+        the rows in the database."""
+        timestamp = int(time.timestamp())
+        slot = timestamp // self._step % len(self._times)
+        if self._times[slot] != timestamp:
+            self._times[slot] = timestamp
+            self._xp[slot] = MISSING
+        for member, xp in data.items():
+            if xp is not None:
+                column = self._column(member)
+                if self._xp[slot, column] == MISSING:
+                    self._xp[slot, column] = xp
+
+    def covers(self, start: datetime | None) -> bool:
+        """Whether :py:meth:`get_between` can answer a query starting at ``start``."""
+        oldest = self.oldest
+        return start is not None and oldest is not None and start >= oldest
+
+    def get_between(self, start: datetime, end: datetime | None = None) -> dict[str, int]:
+        """Same as :py:meth:`GuildXPTable.get_between`, for ranges inside the window."""
+        valid = self._valid() & (self._times >= start.timestamp())
+        if end is not None:
+            valid &= self._times <= end.timestamp()
+        slots = np.flatnonzero(valid)
+        if slots.size == 0:
+            return {}
+        first = self._xp[slots[self._times[slots].argmin()], : len(self._names)]
+        last = self._xp[slots[self._times[slots].argmax()], : len(self._names)]
+        gained = np.maximum(last, 0) - np.maximum(first, 0)
+        return {self._names[i]: int(gained[i]) for i in np.flatnonzero(gained > 0)}
+
+    def get_last(self, amount: int) -> list[tuple[datetime, dict[str, int | None]]]:
+        """The newest ``amount`` snapshots, newest first."""
+        slots = np.flatnonzero(self._valid())
+        slots = slots[np.argsort(self._times[slots])[::-1][:amount]]
+        snapshots = []
+        for slot in slots:
+            row = self._xp[slot, : len(self._names)]
+            data = {self._names[i]: int(row[i]) for i in np.flatnonzero(row != MISSING)}
+            snapshots.append((_datetime(self._times[slot]), data))
+        return snapshots
+
+    def _valid(self) -> np.ndarray:
+        # slots that were not overwritten since the bot was offline hold outdated snapshots
+        newest = self._times.max()
+        return (self._times != MISSING) & (self._times > newest - self._span)
+
+    def _column(self, member: str) -> int:
+        column = self._members.get(member)
+        if column is None:
+            if len(self._names) == self._xp.shape[1]:
+                self._compact()
+            column = self._members[member] = len(self._names)
+            self._names.append(member)
+            if column == self._xp.shape[1]:
+                grown = np.full((self._xp.shape[0], column * 2), MISSING, dtype=np.int64)
+                grown[:, :column] = self._xp
+                self._xp = grown
+        return column
+
+    def _compact(self) -> None:
+        """Frees the columns of members without a value in the window, like members that
+        left or were renamed, so the window only grows with the members it holds."""
+        kept = np.flatnonzero((self._xp[self._valid(), : len(self._names)] != MISSING).any(axis=0))
+        if len(kept) == len(self._names):
+            return
+        self._xp[:, : len(kept)] = self._xp[:, kept]
+        self._xp[:, len(kept) :] = MISSING
+        self._names = [self._names[i] for i in kept]
+        self._members = {name: column for column, name in enumerate(self._names)}
+
+
+def _datetime(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(int(timestamp), timezone.utc)
@@ -1,3 +1,5 @@
+from discord import Interaction
+from discord.app_commands import Command, ContextMenu
 from discord.ext.commands import Bot, Cog, Context
 
 from pianobot import Pianobot
@@ -14,6 +16,17 @@ class OnCommand(Cog):
             f' {ctx.author.name}: {ctx.message.content}'
         )
 
+    @Cog.listener()
+    async def on_command_completion(self, ctx: Context[Bot]) -> None:
+        if ctx.command is not None:
+            self.bot.record_command_latency(ctx.command.qualified_name, ctx.message.created_at)
+
+    @Cog.listener()
+    async def on_app_command_completion(
+        self, interaction: Interaction, command: Command | ContextMenu
+    ) -> None:
+        self.bot.record_command_latency(command.qualified_name, interaction.created_at)
+
 
 async def setup(bot: Pianobot) -> None:
     await bot.add_cog(OnCommand(bot))
@@ -9,24 +9,38 @@ from typing import TYPE_CHECKING
 from discord import Embed, Webhook
 
 from corkus.errors import CorkusException
+from pianobot.tasks.roster import MemberJoined, RosterMember, XPChanged, diff_roster, roster_of
 from pianobot.utils import get_cycle
+from pianobot.utils.guilds import AVATAR_URL
 
 if TYPE_CHECKING:
+    from corkus.objects import CorkusUUID, Guild
     from pianobot import Pianobot
+    from pianobot.tasks.snapshot import Snapshot
+    from pianobot.utils import TrackedGuild
 
 
-async def guild_awards(bot: Pianobot) -> None:
+async def guild_awards(bot: Pianobot, snapshot: Snapshot) -> None:
+    for tracked in bot.tracked_guilds.running('awards'):
+        await track_awards(bot, tracked, snapshot.guilds.get(tracked.name))
+
+
+async def track_awards(bot: Pianobot, tracked: TrackedGuild, guild: Guild | None) -> None:
     dt = datetime.now(timezone.utc)
     if dt.day in {1, 15} and time(0, 0) <= dt.time() < time(0, 5):
-        await update_for_cycle(bot, get_cycle(dt - timedelta(days=10)))
-        results = await bot.database.guild_award_stats.get_for_cycle(get_cycle(dt - timedelta(days=10)))
-        prev_results = await bot.database.guild_award_stats.get_for_cycle(get_cycle(dt - timedelta(days=20)))
+        await update_for_cycle(bot, tracked, guild, get_cycle(dt - timedelta(days=10)))
+        results = await bot.database.guild_award_stats.get_for_cycle(
+            tracked.name, get_cycle(dt - timedelta(days=10))
+        )
+        prev_results = await bot.database.guild_award_stats.get_for_cycle(
+            tracked.name, get_cycle(dt - timedelta(days=20))
+        )
 
         # prev_raids = {entry.username: entry.raid_count for entry in prev_results}
         # raid_res = [(entry.username, entry.raid_count - prev_raids.get(entry.username, 0)) for entry in results]
         prev_dt = dt - timedelta(days=10)
         start_date = datetime(prev_dt.year, prev_dt.month, 1 if prev_dt.day < 15 else 15, tzinfo=timezone.utc)
-        raid_res = list((await bot.database.raid_log.get_between(start_date)).items())
+        raid_res = list((await bot.database.raid_log.get_between(tracked.name, start_date)).items())
         raid_res.sort(key=lambda x: x[1], reverse=True)
 
         prev_wars = {entry.username: entry.wars for entry in prev_results}
@@ -45,60 +59,82 @@ async def guild_awards(bot: Pianobot) -> None:
         ]
         xp_res.sort(key=lambda x: x[1], reverse=True)
 
-        await send_results(bot, get_cycle(dt - timedelta(days=10)), [raid_res, war_res, xp_res])
+        await send_results(bot, tracked, get_cycle(dt - timedelta(days=10)), [raid_res, war_res, xp_res])
 
-    await update_for_cycle(bot, get_cycle(dt), get_cycle(dt - timedelta(days=20 if 8 < dt.day < 15 or 22 < dt.day else 10)))
+    await update_for_cycle(bot, tracked, guild, get_cycle(dt), get_cycle(dt - timedelta(days=20 if 8 < dt.day < 15 or 22 < dt.day else 10)))
 
 
-async def update_for_cycle(bot: Pianobot, cycle: str, prev_cycle: str | None = None) -> None:
-    try:
-        guild = await bot.corkus.guild.get('Eden')
-        guild_members = guild.members
-    except CorkusException as e:
-        getLogger('tasks.guild_awards').warning('Error when fetching guild data of `Eden`: %s', e)
+async def update_for_cycle(
+        bot: Pianobot,
+        tracked: TrackedGuild,
+        guild: Guild | None,
+        cycle: str,
+        prev_cycle: str | None = None,
+    ) -> None:
+    if guild is None:
         return
+    guild_members = guild.members
 
-    db_result = await bot.database.guild_award_stats.get_for_cycle(cycle)
+    db_result = await bot.database.guild_award_stats.get_for_cycle(tracked.name, cycle)
     db_stats = {entry.username: entry for entry in db_result}
-    prev_db_results = await bot.database.guild_award_stats.get_for_cycle(prev_cycle)
+    prev_db_results = await bot.database.guild_award_stats.get_for_cycle(tracked.name, prev_cycle)
     prev_names = {entry.username for entry in prev_db_results}
 
-    for member in guild_members:
+    # the stats are stored by username, so a renamed member starts over like a new one
+    diff = diff_roster(
+        [RosterMember(None, entry.username, contributed_xp=entry.xp) for entry in db_result],
+        roster_of(guild_members),
+        key=lambda member: member.username,
+        only=(MemberJoined, XPChanged),
+    )
+    xp_changed = diff.of(XPChanged)
+    to_fetch = {
+        event.member.uuid: event.member.original for event in diff.of(MemberJoined, XPChanged)
+    }
+    to_fetch.update((member.uuid, member) for member in guild_members if member.is_online)
+
+    added: list[tuple[str, str, dict[str, int], int, int]] = []
+    raid_updates: list[tuple[str, str, dict[str, int]]] = []
+    war_updates: list[tuple[str, str, int]] = []
+    xp_updates = [
+        (event.member.username, cycle, event.member.contributed_xp) for event in xp_changed
+    ]
+    xp_gained = [(event.member.uuid, event.gained) for event in xp_changed if event.gained > 0]
+    war_log: list[CorkusUUID] = []
+    async for uuid, player in bot.corkus.player.getv3_many(to_fetch):
+        member = to_fetch[uuid]
+        if isinstance(player, CorkusException):
+            getLogger('tasks.guild_awards').warning(
+                'Error when fetching player data of `%s`: %s', member.username, player
+            )
+            player = None
+
         if member.username not in db_stats:
             raids = {}
             wars = 0
-            try:
-                player = await bot.corkus.player.getv3(member.uuid)
+            if player is not None:
                 raids = player.get('globalData', {}).get('raids', {}).get('list', {})
                 wars = player.get('globalData', {}).get('wars', 0)
-            except CorkusException as e:
-                getLogger('tasks.guild_awards').warning(
-                    'Error when fetching player data of `%s`: %s', member.username, e
-                )
-            await bot.database.guild_award_stats.add(member.username, cycle, raids, wars, member.contributed_xp)
+            added.append((member.username, cycle, raids, wars, member.contributed_xp))
             if prev_cycle and member.username not in prev_names:
-                await bot.database.guild_award_stats.add(member.username, prev_cycle, raids, wars, member.contributed_xp)
-        else:
+                added.append((member.username, prev_cycle, raids, wars, member.contributed_xp))
+        elif player is not None:
             db_stat = db_stats[member.username]
-            if member.is_online or member.contributed_xp != db_stat.xp:
-                try:
-                    player = await bot.corkus.player.getv3(member.uuid)
-                    raids = player.get('globalData', {}).get('raids', {})
-                    if raids.get('total', 0) != db_stat.raid_count:
-                        await bot.database.guild_award_stats.update_raids(member.username, cycle, raids.get('list', {}))
-                    wars = player.get('globalData', {}).get('wars', None)
-                    if wars is not None and wars != db_stat.wars:
-                        for _ in range(max(0, wars - db_stat.wars)):
-                            await bot.database.war_log.add(member.uuid)
-                        await bot.database.guild_award_stats.update_wars(member.username, cycle, wars)
-                except CorkusException as e:
-                    getLogger('tasks.guild_awards').warning(
-                        'Error when fetching player data of `%s`: %s', member.username, e
-                    )
-                if member.contributed_xp != db_stat.xp:
-                    if member.contributed_xp > db_stat.xp:
-                        await bot.database.raid_members.add_xp(member.uuid, member.contributed_xp - db_stat.xp)
-                    await bot.database.guild_award_stats.update_xp(member.username, cycle, member.contributed_xp)
+            raids = player.get('globalData', {}).get('raids', {})
+            if raids.get('total', 0) != db_stat.raid_count:
+                raid_updates.append((member.username, cycle, raids.get('list', {})))
+            wars = player.get('globalData', {}).get('wars', None)
+            if wars is not None and wars != db_stat.wars:
+                war_log.extend([member.uuid] * max(0, wars - db_stat.wars))
+                war_updates.append((member.username, cycle, wars))
+
+    async with bot.database.transaction():
+        await bot.database.guild_award_stats.add_many(tracked.name, added)
+        await bot.database.guild_award_stats.update_raids_many(tracked.name, raid_updates)
+        await bot.database.guild_award_stats.update_wars_many(tracked.name, war_updates)
+        await bot.database.guild_award_stats.update_xp_many(tracked.name, xp_updates)
+        await bot.database.raid_members.add_xp_many(tracked.name, xp_gained)
+    await bot.database.war_log.add_many(war_log)
 
 
 def draw_raid_raffle_winners(entries: list[tuple[str, int]], n: int = 3) -> tuple[list[tuple[str, int]], int]:
@@ -117,7 +153,7 @@ def draw_raid_raffle_winners(entries: list[tuple[str, int]], n: int = 3) -> tupl
     return winners, total_tickets
 
 
-async def send_results(bot: Pianobot, cycle: str, results: list[list[tuple[str, int]]]) -> None:
+async def send_results(bot: Pianobot, tracked: TrackedGuild, cycle: str, results: list[list[tuple[str, int]]]) -> None:
     embed = Embed(title=f'Final award results for promotion cycle  `{cycle}`')
     for title, code, result in zip(['Guild Raids', 'Wars', 'Guild XP'], ['gss', 'js', 'less'], results):
         code_block = f'```{code}\n'
@@ -134,6 +170,6 @@ async def send_results(bot: Pianobot, cycle: str, results: list[list[tuple[str,
         code_block += f'{i}. {name} ({tickets} tickets, {amount} raids)\n'
     embed.add_field(name='Raid Raffle', value=code_block + '```', inline=False)
 
-    if bot.member_update_channel is not None:
-        webhook = Webhook.from_url(bot.member_update_channel, session=bot.session)
-        await webhook.send(embed=embed, username='Eden Awards', avatar_url='https://cdn.discordapp.com/avatars/861602324543307786/83f879567954aee29bc9fd534bc05b1f.webp')
+    if tracked.member_webhook is not None:
+        webhook = Webhook.from_url(tracked.member_webhook, session=bot.session)
+        await webhook.send(embed=embed, username=f'{tracked.name} Awards', avatar_url=AVATAR_URL)
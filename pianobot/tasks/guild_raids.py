@@ -7,12 +7,17 @@ from typing import TYPE_CHECKING
 
 from discord import Embed, File, Webhook
 
-from corkus.objects import Member
+from corkus.objects import CorkusUUID, Member
 from corkus.errors import CorkusException
+from pianobot.tasks.roster import MemberJoined, RosterMember, XPChanged, diff_roster, roster_of
 from pianobot.utils import display_short as display
+from pianobot.utils.guilds import AVATAR_URL
 
 if TYPE_CHECKING:
+    from corkus.objects import Guild
     from pianobot import Pianobot
+    from pianobot.tasks.snapshot import Snapshot
+    from pianobot.utils import TrackedGuild
 
 
 RAID_COLORS = {
@@ -21,59 +26,80 @@ RAID_COLORS = {
     'The Canyon Colossus': 0x00AAAA,
     'The Nameless Anomaly': 0x5555FF,
 }
-WEBHOOK_URL = 'https://discord.com/api/webhooks/1350160463782084719/NhYzODuCuP1QuAtygwXYPQZwU7Wv88K_eAKWJvb6L2SeMrQyEM3Xc41eR_jbJY9h5TBQ'
-AVATAR_URL = 'https://cdn.discordapp.com/avatars/861602324543307786/83f879567954aee29bc9fd534bc05b1f.webp'
 
-async def guild_raids(bot: Pianobot) -> None:
-    try:
-        guild = await bot.corkus.guild.get('Eden')
-    except CorkusException as e:
-        getLogger('tasks.guild_awards').warning('Error when fetching guild data of `Eden`: %s', e)
-        return
 
-    db_stats = await bot.database.raid_members.get_all()
-    potential_members = {}
+async def guild_raids(bot: Pianobot, snapshot: Snapshot) -> None:
+    for tracked in bot.tracked_guilds.running('raids'):
+        guild = snapshot.guilds.get(tracked.name)
+        if guild is not None:
+            await track_raids(bot, tracked, guild)
+
+
+async def track_raids(bot: Pianobot, tracked: TrackedGuild, guild: Guild) -> None:
+    db_stats = await bot.database.raid_members.get_all(tracked.name)
+    # members that left stay in raid_members, so only joins and xp changes are relevant
+    diff = diff_roster(
+        [RosterMember(uuid, None, contributed_xp=xp) for uuid, xp in db_stats.items()],
+        roster_of(guild.members),
+        only=(MemberJoined, XPChanged),
+    )
+    xp_changed: dict[CorkusUUID, XPChanged] = {
+        event.member.uuid: event for event in diff.of(XPChanged)
+    }
+    to_fetch: dict[CorkusUUID, Member] = {
+        event.member.uuid: event.member.original for event in diff.of(MemberJoined, XPChanged)
+    }
+    to_fetch.update((member.uuid, member) for member in guild.members if member.is_online)
+
     xp_per_raid = int(100 / 3 * (1.15 ** guild.level - 1))
-    for member in guild.members:
+    db_raids = await bot.database.raids.get_for_players(
+        uuid for uuid in to_fetch if uuid in db_stats
+    )
+    prev_raids = await bot.database.raids.prev_for_players(xp_changed)
+    potential_members = {
+        event.member.original: (db_raids.get(uuid, {}), prev_raids.get(uuid, {}))
+        for uuid, event in xp_changed.items()
+        if xp_per_raid <= event.gained < 3 * xp_per_raid
+    }
+
+    new_members: list[tuple[CorkusUUID, int]] = []
+    raid_amounts: list[tuple[CorkusUUID, str, int]] = []
+    prev_amounts: list[tuple[CorkusUUID, str, int]] = []
+    async for uuid, player in bot.corkus.player.getv3_many(to_fetch):
+        member = to_fetch[uuid]
+        raids = {}
+        if isinstance(player, CorkusException):
+            getLogger('tasks.guild_awards').warning(
+                'Error when fetching player data of `%s`: %s', member.uuid, player
+            )
+            if member.uuid in db_stats:
+                continue
+        else:
+            raids = player.get('globalData', {}).get('raids', {}).get('list', {})
+
         if member.uuid not in db_stats:
-            raids = {}
-            try:
-                player = await bot.corkus.player.getv3(member.uuid)
-                raids = player.get('globalData', {}).get('raids', {}).get('list', {})
-            except CorkusException as e:
-                getLogger('tasks.guild_awards').warning(
-                    'Error when fetching player data of `%s`: %s', member.uuid, e
-                )
-            await bot.database.raid_members.add(member.uuid, member.contributed_xp)
-            for raid, count in raids.items():
-                await bot.database.raids.set(member.uuid, raid, count)
+            new_members.append((member.uuid, member.contributed_xp))
+            raid_amounts.extend((member.uuid, raid, count) for raid, count in raids.items())
         else:
-            xp_diff = member.contributed_xp - db_stats[member.uuid]
-            if xp_diff:
-                await bot.database.raid_members.update_xp(member.uuid, member.contributed_xp)
-                if xp_per_raid <= xp_diff < 3 * xp_per_raid:
-                    member_raids = await bot.database.raids.get_for_player(member.uuid)
-                    old_raids = await bot.database.raids.prev_for_player(member.uuid)
-                    potential_members[member] = (member_raids, old_raids)
-            if xp_diff or member.is_online:
-                try:
-                    player = await bot.corkus.player.getv3(member.uuid)
-                    raids = player.get('globalData', {}).get('raids', {}).get('list', {})
-                except CorkusException as e:
-                    getLogger('tasks.guild_awards').warning(
-                        'Error when fetching player data of `%s`: %s', member.uuid, e
-                    )
-                    continue
-                db_raids = await bot.database.raids.get_for_player(member.uuid)
-                if any(amount > db_raids.get(raid, 0) for raid, amount in raids.items()):
-                    for raid, amount in raids.items():
-                        await bot.database.raids.set_prev(member.uuid, raid, db_raids.get(raid, 0))
-                        await bot.database.raids.set(member.uuid, raid, amount)
-    bot.loop.create_task(process_members(bot, potential_members, guild.level))
+            player_raids = db_raids.get(member.uuid, {})
+            if any(amount > player_raids.get(raid, 0) for raid, amount in raids.items()):
+                for raid, amount in raids.items():
+                    prev_amounts.append((member.uuid, raid, player_raids.get(raid, 0)))
+                    raid_amounts.append((member.uuid, raid, amount))
+
+    async with bot.database.transaction():
+        await bot.database.raid_members.update_xp_many(
+            tracked.name, ((uuid, event.member.contributed_xp) for uuid, event in xp_changed.items())
+        )
+        await bot.database.raid_members.add_many(tracked.name, new_members)
+        await bot.database.raids.set_prev_many(prev_amounts)
+        await bot.database.raids.set_many(raid_amounts)
+    bot.loop.create_task(process_members(bot, tracked, potential_members, guild.level))
 
 
 async def process_members(
         bot: Pianobot,
+        tracked: TrackedGuild,
         potential_members: dict[Member, tuple[dict[str, int], dict[str, int]]],
         level: int,
     ) -> None:
@@ -85,6 +111,7 @@ async def process_members(
             raid_completions.setdefault(raid, []).append(member.username)
         else:
             unknown.append(member.username)
+    uuids = {member.username: member.uuid for member in potential_members}
     add_unknown = len(unknown) == sum((4 - len(lst) % 4) % 4 for lst in raid_completions.values())
     for raid, members in sorted(raid_completions.items(), key=lambda x: len(x[1])):
         for i in range(ceil(len(members) / 4)):
@@ -97,13 +124,10 @@ async def process_members(
                 # getLogger('tasks.guild_awards').warning('Unknown added: %s', results)
                 current_members.append(unknown.pop())
             if len(current_members) == 4:
-                await send_embed(bot, raid, current_members, level)
+                await send_embed(bot, tracked, raid, current_members, level)
                 for member in current_members:
-                    await bot.database.raid_log.add(
-                        next(m for m in potential_members.keys() if m.username == member).uuid,
-                        raid,
-                    )
-                    await bot.database.raid_members.add_raid(member)
+                    await bot.database.raid_log.add(tracked.name, uuids[member], raid)
+                    await bot.database.raid_members.add_raid(tracked.name, member)
             else:
                 getLogger('tasks.guild_awards').warning('Raid with <4: %s', results)
 
@@ -115,10 +139,13 @@ async def process_one(
         old_old_raids: dict[str, int],
         tries: int = 0,
     ) -> tuple[Member, str | None]:
-    response = await bot.session.get(f'https://api.wynncraft.com/v3/player/{member.uuid}')
-    if response.status != 200:
-        return await process_one(bot, member, old_raids, old_old_raids, tries + 1)
-    data = await response.json()
+    try:
+        data = await bot.corkus.player.getv3(member.uuid)
+    except CorkusException as e:
+        getLogger('tasks.guild_awards').warning(
+            'Error when fetching player data of `%s`: %s', member.uuid, e
+        )
+        return member, None
     raids = data.get('globalData', {}).get('raids', {}).get('list', {})
     if sum(raids.values()) == sum(old_raids.values()):
         if tries >= 2:
@@ -129,13 +156,16 @@ async def process_one(
                     None,
                 ),
             )
-        age = int(response.headers.get('Age', '0'))
-        await sleep(121 - age)
+        await sleep(bot.corkus.player.freshness(member.uuid) + 1)
         return await process_one(bot, member, old_raids, old_old_raids, tries + 1)
     return member, next((r for r, c in raids.items() if c - old_raids.get(r, 0) == 1), None)
 
 
-async def send_embed(bot: Pianobot, raid: str, players: list[str], guild_level: int) -> None:
+async def send_embed(
+    bot: Pianobot, tracked: TrackedGuild, raid: str, players: list[str], guild_level: int
+) -> None:
+    if tracked.raid_webhook is None:
+        return
     embed = Embed(
         color=RAID_COLORS.get(raid, None),
         title=':crossed_swords:   Guild Raid completed',
@@ -147,9 +177,9 @@ async def send_embed(bot: Pianobot, raid: str, players: list[str], guild_level:
         icon_url='attachment://aspect.png',
     )
     embed.set_thumbnail(url='attachment://raid.png')
-    await Webhook.from_url(WEBHOOK_URL, session=bot.session).send(
+    await Webhook.from_url(tracked.raid_webhook, session=bot.session).send(
         files=[File('assets/aspect.png', 'aspect.png'), File(f'assets/{raid}.png', 'raid.png')],
         embed=embed,
-        username='Eden Guild Raid Tracking',
+        username=f'{tracked.name} Guild Raid Tracking',
         avatar_url=AVATAR_URL,
     )
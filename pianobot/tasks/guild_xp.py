@@ -1,37 +1,44 @@
 from __future__ import annotations
 
-from logging import getLogger
 from math import floor, log10
 from typing import TYPE_CHECKING
 
-from corkus.errors import CorkusException
 from discord import Webhook
 
+from pianobot.tasks.roster import RosterMember, XPChanged, diff_roster, roster_of
 from pianobot.utils import display_full
+from pianobot.utils.guilds import AVATAR_URL
 
 if TYPE_CHECKING:
+    from corkus.objects import Guild
     from pianobot import Pianobot
+    from pianobot.tasks.snapshot import Snapshot
+    from pianobot.utils import TrackedGuild
 
 
-async def guild_xp(bot: Pianobot) -> None:
-    try:
-        guild = await bot.corkus.guild.get('Eden')
-    except CorkusException as e:
-        getLogger('tasks.guild_xp').warning('Error when fetching guild data of `Eden`: %s', e)
-        return
+async def guild_xp(bot: Pianobot, snapshot: Snapshot) -> None:
+    for tracked in bot.tracked_guilds.running('xp'):
+        guild = snapshot.guilds.get(tracked.name)
+        if guild is not None:
+            await track_xp(bot, tracked, guild)
+
+
+async def track_xp(bot: Pianobot, tracked: TrackedGuild, guild: Guild) -> None:
     current_xp = {member.username: member.contributed_xp for member in guild.members}
 
-    await bot.database.guild_xp.update_columns(list(current_xp.keys()))
-    await bot.database.guild_xp.add(current_xp)
-
-    data = await bot.database.guild_xp.get_last(2)
-    new = data[0]
-    old = data[1]
-    xp_diff = []
-    for name, new_xp in new.data.items():
-        old_xp = old.data.get(name, None)
-        if new_xp is not None and old_xp is not None and new_xp - old_xp > 0:
-            xp_diff.append((name, new_xp - old_xp))
+    previous = await bot.database.guild_xp.get_last(tracked.name, 1)
+    await bot.database.guild_xp.add(tracked.name, current_xp)
+    if not previous:
+        return
+
+    # the snapshots are stored by username
+    diff = diff_roster(
+        [RosterMember(None, name, contributed_xp=xp) for name, xp in previous[0].data.items()],
+        roster_of(guild.members),
+        key=lambda member: member.username,
+        only=(XPChanged,),
+    )
+    xp_diff = [(event.member.username, event.gained) for event in diff.of(XPChanged) if event.gained > 0]
     if len(xp_diff) == 0:
         return
 
@@ -40,6 +47,6 @@ async def guild_xp(bot: Pianobot) -> None:
         msg += f'\n**#{pos + 1} {name}** — `{display_full(gxp)} XP | {display_full(gxp / 5)} XP/min`'
     msg += f'\n**Total: ** `{display_full(sum([item[1] for item in xp_diff]))} XP`'
 
-    if bot.xp_tracking_channel is not None:
-        webhook = Webhook.from_url(bot.xp_tracking_channel, session=bot.session)
-        await webhook.send(msg, username='Eden XP Tracking', avatar_url='https://cdn.discordapp.com/avatars/861602324543307786/83f879567954aee29bc9fd534bc05b1f.webp')
+    if tracked.xp_webhook is not None:
+        webhook = Webhook.from_url(tracked.xp_webhook, session=bot.session)
+        await webhook.send(msg, username=f'{tracked.name} XP Tracking', avatar_url=AVATAR_URL)
@@ -1,24 +1,20 @@
 from __future__ import annotations
 
-from logging import getLogger
 from typing import TYPE_CHECKING
 
-from corkus.errors import CorkusException
-
 if TYPE_CHECKING:
     from pianobot import Pianobot
+    from pianobot.tasks.snapshot import Snapshot
 
 
-async def member_activity(bot: Pianobot) -> None:
-    try:
-        guild = await bot.corkus.guild.get('Eden')
-        player_list = await bot.corkus.network.online_players()
-    except CorkusException as e:
-        getLogger('tasks.member_activity').warning(
-            'Error when fetching guild data of `Eden` and list of online players: %s', e
-        )
+async def member_activity(bot: Pianobot, snapshot: Snapshot) -> None:
+    player_list = snapshot.online_players
+    if player_list is None:
         return
-    players = {player.username for player in player_list.players}
-    online_members = [m.username for m in guild.members if m.username in players]
-    if len(online_members) > 0:
-        await bot.database.member_activity.add(online_members)
+    for tracked in bot.tracked_guilds.running('member_activity'):
+        guild = snapshot.guilds.get(tracked.name)
+        if guild is None:
+            continue
+        online_members = list(player_list.usernames.intersection(m.username for m in guild.members))
+        if len(online_members) > 0:
+            await bot.database.member_activity.add(tracked.name, online_members)
@@ -1,46 +1,66 @@
 from __future__ import annotations
 
+from datetime import datetime
 from logging import getLogger
-from typing import TYPE_CHECKING
+from typing import Any, TYPE_CHECKING
+from uuid import UUID
 
 from corkus.errors import CorkusException
 from discord import Embed, Webhook
 from discord.utils import format_dt
 
-from pianobot.db.members import Member
+from pianobot.tasks.roster import (
+    MemberJoined,
+    MemberLeft,
+    MemberRenamed,
+    RankChanged,
+    RosterMember,
+    diff_roster,
+    roster_of,
+)
+from pianobot.utils.guilds import AVATAR_URL
 
 if TYPE_CHECKING:
+    from corkus.objects import Guild
     from pianobot import Pianobot
+    from pianobot.tasks.snapshot import Snapshot
+    from pianobot.utils import TrackedGuild
 
-RANKS = ['Recruit', 'Recruiter', 'Captain', 'Strategist', 'Chief', 'Owner']
 
+async def members(bot: Pianobot, snapshot: Snapshot) -> None:
+    for tracked in bot.tracked_guilds.running('members'):
+        guild = snapshot.guilds.get(tracked.name)
+        if guild is not None:
+            await update_members(bot, tracked, guild)
 
-async def members(bot: Pianobot) -> None:
-    try:
-        guild_members = (await bot.corkus.guild.get('Eden')).members
-    except CorkusException as e:
-        getLogger('tasks.members').warning('Error when fetching guild data of `Eden`: %s', e)
-        return
 
-    database_members = await bot.database.members.get_all()
-    saved_members: dict[str, Member] = {member.uuid.hex: member for member in database_members}
+async def update_members(bot: Pianobot, tracked: TrackedGuild, guild: Guild) -> None:
+    database_members = await bot.database.members.get_all(tracked.name)
+    diff = diff_roster(
+        [RosterMember.from_db(member) for member in database_members],
+        roster_of(guild.members),
+    )
 
-    for corkus_member in guild_members:
-        saved_member = saved_members.pop(corkus_member.uuid.hex, None)
-        if saved_member is None:
-            await bot.database.members.add(
-                corkus_member.uuid,
-                corkus_member.join_date,
-                corkus_member.username,
-                corkus_member.rank.name.capitalize(),
-                corkus_member.contributed_xp,
-            )
+    # all changes are written at once, the embeds are only sent after they were saved
+    added: list[tuple[UUID, datetime, str, str, int]] = [
+        (member.uuid, member.join_date, member.username, member.rank, member.contributed_xp)
+        for member in (event.member for event in diff.of(MemberJoined))
+    ]
+    updated: list[tuple[UUID, str, str, int]] = [
+        (member.uuid, member.username, member.rank, member.contributed_xp)
+        for member in diff.changed
+    ]
+    embeds: list[dict[str, Any]] = []
+
+    for event in diff:
+        member = event.member
+        if isinstance(event, MemberJoined):
             embed_content = (
-                f'{corkus_member.username} has joined Eden'
-                f' {format_dt(corkus_member.join_date, "R")}\n\n'
+                f'{member.username} has joined {tracked.name}'
+                f' {format_dt(member.join_date, "R")}\n\n'
             )
             try:
-                player = await corkus_member.fetch_player()
+                player = await member.original.fetch_player()
                 embed_content += (
                     f'First join: {format_dt(player.join_date)}\n'
                     f'Playtime: {round(player.playtime.hours(4.7))} hours\n'
@@ -48,83 +68,78 @@ async def members(bot: Pianobot) -> None:
                 )
             except CorkusException as e:
                 getLogger('tasks.members').warning(
-                    'Error when fetching player data of `%s`: %s', corkus_member.username, e
+                    'Error when fetching player data of `%s`: %s', member.username, e
                 )
 
-            await send_embed(
-                bot,
-                title=f'Guild Join: {corkus_member.username}',
+            embeds.append(dict(
+                title=f'Guild Join: {member.username}',
                 content=embed_content,
                 color=0x00FF00,
-                uuid=corkus_member.uuid.hex,
+                uuid=member.uuid.hex,
+            ))
+        elif isinstance(event, MemberRenamed):
+            embed_content = (
+                f'{event.old_name} has changed their name to {member.username}!\n\n'
+                f'Guild rank: {member.rank}\n'
+                f'Old name: {event.old_name}\n'
+                f'New name: {member.username}'
             )
-        else:
-            if corkus_member.username != saved_member.name:
-                await bot.database.members.update_name(corkus_member.uuid, corkus_member.username)
-                embed_content = (
-                    f'{saved_member.name} has changed their name to {corkus_member.username}!\n\n'
-                    f'Guild rank: {corkus_member.rank.name.capitalize()}\n'
-                    f'Old name: {saved_member.name}\n'
-                    f'New name: {corkus_member.username}'
-                )
-                await send_embed(
-                    bot,
-                    title=f'Name Change: {corkus_member.username}',
-                    content=embed_content,
-                    color=0x88FFFF,
-                    uuid=corkus_member.uuid.hex,
-                )
-            if corkus_member.rank.name.capitalize() != saved_member.rank:
-                new_rank = corkus_member.rank.name.capitalize()
-                await bot.database.members.update_rank(corkus_member.uuid, new_rank)
-                is_promotion = RANKS.index(new_rank) > RANKS.index(saved_member.rank)
-                embed_content = (
-                    f'{corkus_member.username} has been'
-                    f' {"promoted" if is_promotion else "demoted"}!\n\n'
-                    f'Old rank: {saved_member.rank}\n'
-                    f'New rank: {new_rank}'
-                )
-                await send_embed(
-                    bot,
-                    title=(
-                        f'Guild {"promotion" if is_promotion else "demotion"}:'
-                        f' {corkus_member.username}'
-                    ),
-                    content=embed_content,
-                    color=0x88FF88 if is_promotion else 0xFF8888,
-                    uuid=corkus_member.uuid.hex,
-                )
-            if corkus_member.contributed_xp != saved_member.contributed_xp:
-                await bot.database.members.update_contributed_xp(
-                    corkus_member.uuid, corkus_member.contributed_xp
-                )
+            embeds.append(dict(
+                title=f'Name Change: {member.username}',
+                content=embed_content,
+                color=0x88FFFF,
+                uuid=member.uuid.hex,
+            ))
+        elif isinstance(event, RankChanged):
+            embed_content = (
+                f'{member.username} has been'
+                f' {"promoted" if event.is_promotion else "demoted"}!\n\n'
+                f'Old rank: {event.old_rank}\n'
+                f'New rank: {member.rank}'
+            )
+            embeds.append(dict(
+                title=(
+                    f'Guild {"promotion" if event.is_promotion else "demotion"}:'
+                    f' {member.username}'
+                ),
+                content=embed_content,
+                color=0x88FF88 if event.is_promotion else 0xFF8888,
+                uuid=member.uuid.hex,
+            ))
+        elif isinstance(event, MemberLeft):
+            embed_content = (
+                f'{member.username} has left {tracked.name}!\n\n'
+                f'Joined at: {format_dt(member.join_date)}\n'
+                f'Last rank: {member.rank}\n'
+                f'XP contributed: {member.contributed_xp}'
+            )
+            embeds.append(dict(
+                title=f'Guild Leave: {member.username}',
+                content=embed_content,
+                color=0xFF0000,
+                uuid=member.uuid.hex,
+            ))
 
-    for uuid, member in saved_members.items():
-        await bot.database.members.remove(
-            next(m for m in database_members if m.uuid.hex == uuid).uuid
-        )
-        embed_content = (
-            f'{member.name} has left Eden!\n\n'
-            f'Joined at: {format_dt(member.join_date)}\n'
-            f'Last rank: {member.rank}\n'
-            f'XP contributed: {member.contributed_xp}'
-        )
-        await send_embed(
-            bot,
-            title=f'Guild Leave: {member.name}',
-            content=embed_content,
-            color=0xFF0000,
-            uuid=uuid,
+    async with bot.database.transaction():
+        await bot.database.members.add_many(tracked.name, added)
+        await bot.database.members.update_many(tracked.name, updated)
+        await bot.database.members.remove_many(
+            tracked.name, (event.member.uuid for event in diff.of(MemberLeft))
         )
 
+    for embed in embeds:
+        await send_embed(bot, tracked, **embed)
+
 
-async def send_embed(bot: Pianobot, *, title: str, content: str, color: int, uuid: str) -> None:
+async def send_embed(
+    bot: Pianobot, tracked: TrackedGuild, *, title: str, content: str, color: int, uuid: str
+) -> None:
     embed = Embed(
         title=title,
         description=content,
         color=color,
     )
     embed.set_thumbnail(url=f'https://mc-heads.net/avatar/{uuid}')
-    if bot.member_update_channel is not None:
-        webhook = Webhook.from_url(bot.member_update_channel, session=bot.session)
-        await webhook.send(embed=embed, username='Eden Guild Log', avatar_url='https://cdn.discordapp.com/avatars/861602324543307786/83f879567954aee29bc9fd534bc05b1f.webp')
+    if tracked.member_webhook is not None:
+        webhook = Webhook.from_url(tracked.member_webhook, session=bot.session)
+        await webhook.send(embed=embed, username=f'{tracked.name} Guild Log', avatar_url=AVATAR_URL)
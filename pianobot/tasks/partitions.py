@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pianobot import Pianobot
+    from pianobot.tasks.snapshot import Snapshot
+
+
+async def partitions(bot: Pianobot, _: Snapshot) -> None:
+    await bot.database.partitions.maintain()
@@ -1,25 +1,17 @@
 from __future__ import annotations
 
-from logging import getLogger
 from typing import TYPE_CHECKING
 
-from corkus.errors import CorkusTimeoutError
-
 if TYPE_CHECKING:
     from pianobot import Pianobot
+    from pianobot.tasks.snapshot import Snapshot
+
 
-async def players(bot: Pianobot) -> None:
-    try:
-        online_players = await bot.corkus.network.online_players(by_uuid=True)
-        uuids = {player.uuid for player in online_players.uuid_players}
-    except CorkusTimeoutError:
-        getLogger('tasks.guild_activity').warning('Error when fetching list of online players')
+async def players(bot: Pianobot, snapshot: Snapshot) -> None:
+    if snapshot.online_uuids is None:
         return
+    bot.database.players.mark_seen(snapshot.online_uuids.uuids, snapshot.taken_at)
 
-    db_uuids = {p.uuid for p in await bot.database.players.get_selected(uuids)}
 
-    to_add = uuids - db_uuids
-    if to_add:
-        await bot.database.players.add_multiple(to_add)
-    if db_uuids:
-        await bot.database.players.update_last_seen(db_uuids)
+async def flush_players(bot: Pianobot, _: Snapshot) -> None:
+    await bot.database.players.flush()
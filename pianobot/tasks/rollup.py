@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pianobot import Pianobot
+    from pianobot.tasks.snapshot import Snapshot
+
+
+async def rollup(bot: Pianobot, _: Snapshot) -> None:
+    await bot.database.guild_activity.rollup()
+    await bot.database.guild_xp.rollup()
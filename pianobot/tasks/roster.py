@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Collection, Hashable, Iterable, Iterator, TypeVar
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from corkus.objects import Member as CorkusMember
+    from pianobot.db.members import Member
+
+RANKS = ['Recruit', 'Recruiter', 'Captain', 'Strategist', 'Chief', 'Owner']
+
+
+class RosterMember:
+    """A guild member as one side of a roster diff.
+
+    Values the side does not know, like the rank of a member that is only stored with its
+    xp, are ``None`` and never produce an event. ``original`` is the object the member was
+    created from, e.g. the Corkus member to fetch more data with.
+    """
+
+    def __init__(
+        self,
+        uuid: UUID | None,
+        username: str | None,
+        rank: str | None = None,
+        contributed_xp: int | None = None,
+        *,
+        join_date: datetime | None = None,
+        is_online: bool = False,
+        original: Any = None,
+    ) -> None:
+        self._uuid = uuid
+        self._username = username
+        self._rank = rank
+        self._contributed_xp = contributed_xp
+        self._join_date = join_date
+        self._is_online = is_online
+        self._original = original
+
+    @classmethod
+    def from_corkus(cls, member: CorkusMember) -> RosterMember:
+        return cls(
+            member.uuid,
+            member.username,
+            member.rank.name.capitalize(),
+            member.contributed_xp,
+            join_date=member.join_date,
+            is_online=member.is_online,
+            original=member,
+        )
+
+    @classmethod
+    def from_db(cls, member: Member) -> RosterMember:
+        return cls(
+            member.uuid,
+            member.name,
+            member.rank,
+            member.contributed_xp,
+            join_date=member.join_date,
+            original=member,
+        )
+
+    @property
+    def uuid(self) -> UUID | None:
+        return self._uuid
+
+    @property
+    def username(self) -> str | None:
+        return self._username
+
+    @property
+    def rank(self) -> str | None:
+        return self._rank
+
+    @property
+    def contributed_xp(self) -> int | None:
+        return self._contributed_xp
+
+    @property
+    def join_date(self) -> datetime | None:
+        return self._join_date
+
+    @property
+    def is_online(self) -> bool:
+        return self._is_online
+
+    @property
+    def original(self) -> Any:
+        return self._original
+
+
+class RosterEvent:
+    def __init__(self, member: RosterMember) -> None:
+        self._member = member
+
+    @property
+    def member(self) -> RosterMember:
+        """The member as it is now, or as it was last seen for a :py:class:`MemberLeft`."""
+        return self._member
+
+
+class MemberJoined(RosterEvent):
+    pass
+
+
+class MemberLeft(RosterEvent):
+    pass
+
+
+class MemberRenamed(RosterEvent):
+    def __init__(self, member: RosterMember, old_name: str) -> None:
+        super().__init__(member)
+        self._old_name = old_name
+
+    @property
+    def old_name(self) -> str:
+        return self._old_name
+
+
+class RankChanged(RosterEvent):
+    def __init__(self, member: RosterMember, old_rank: str) -> None:
+        super().__init__(member)
+        self._old_rank = old_rank
+
+    @property
+    def old_rank(self) -> str:
+        return self._old_rank
+
+    @property
+    def is_promotion(self) -> bool:
+        return RANKS.index(self.member.rank or RANKS[0]) > RANKS.index(self._old_rank)
+
+
+class XPChanged(RosterEvent):
+    def __init__(self, member: RosterMember, old_xp: int) -> None:
+        super().__init__(member)
+        self._old_xp = old_xp
+
+    @property
+    def old_xp(self) -> int:
+        return self._old_xp
+
+    @property
+    def gained(self) -> int:
+        """Xp contributed since the previous roster, negative if the member left and joined
+        again in between."""
+        return (self.member.contributed_xp or 0) - self._old_xp
+
+
+Event = TypeVar('Event', bound=RosterEvent)
+EVENTS: tuple[type[RosterEvent], ...] = (
+    MemberJoined, MemberLeft, MemberRenamed, RankChanged, XPChanged
+)
+
+
+class RosterDiff:
+    """The events between two rosters, in roster order with the leaves last."""
+
+    def __init__(self, events: list[RosterEvent]) -> None:
+        self._events = events
+
+    def __iter__(self) -> Iterator[RosterEvent]:
+        return iter(self._events)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def of(self, *kinds: type[Event]) -> list[Event]:
+        return [event for event in self._events if isinstance(event, kinds)]  # type: ignore[misc]
+
+    @property
+    def changed(self) -> list[RosterMember]:
+        """Members that stayed but were renamed, changed rank or contributed xp."""
+        changed: dict[int, RosterMember] = {}
+        for event in self.of(MemberRenamed, RankChanged, XPChanged):
+            changed.setdefault(id(event.member), event.member)
+        return list(changed.values())
+
+
+def diff_roster(
+    previous: Iterable[RosterMember],
+    current: Iterable[RosterMember],
+    *,
+    key: Callable[[RosterMember], Hashable] = lambda member: member.uuid,
+    only: Collection[type[RosterEvent]] = EVENTS,
+) -> RosterDiff:
+    """Compares two rosters in one pass over each and returns the events of the kinds in
+    ``only``. Members are matched by ``key``, their uuid unless one side does not know it."""
+    remaining = {key(member): member for member in previous}
+    events: list[RosterEvent] = []
+    for member in current:
+        old = remaining.pop(key(member), None)
+        if old is None:
+            if MemberJoined in only:
+                events.append(MemberJoined(member))
+            continue
+        if MemberRenamed in only and old.username is not None and member.username != old.username:
+            events.append(MemberRenamed(member, old.username))
+        if RankChanged in only and old.rank is not None and member.rank != old.rank:
+            events.append(RankChanged(member, old.rank))
+        if (
+            XPChanged in only
+            and old.contributed_xp is not None
+            and member.contributed_xp is not None
+            and member.contributed_xp != old.contributed_xp
+        ):
+            events.append(XPChanged(member, old.contributed_xp))
+    if MemberLeft in only:
+        events.extend(MemberLeft(member) for member in remaining.values())
+    return RosterDiff(events)
+
+
+def roster_of(members: Iterable[CorkusMember]) -> list[RosterMember]:
+    return [RosterMember.from_corkus(member) for member in members]
@@ -1,10 +1,7 @@
 from __future__ import annotations
 
-from logging import getLogger
-from time import perf_counter
-from typing import Any, Callable, Coroutine, TYPE_CHECKING
-
-from discord.ext.tasks import loop
+from os import getenv
+from typing import TYPE_CHECKING
 
 from pianobot.tasks.guild_activity import guild_activity
 from pianobot.tasks.guild_awards import guild_awards
@@ -12,7 +9,10 @@ from pianobot.tasks.guild_raids import guild_raids
 from pianobot.tasks.guild_xp import guild_xp
 from pianobot.tasks.member_activity import member_activity
 from pianobot.tasks.members import members
-from pianobot.tasks.players import players
+from pianobot.tasks.partitions import partitions
+from pianobot.tasks.players import flush_players, players
+from pianobot.tasks.rollup import rollup
+from pianobot.tasks.scheduler import ScheduledTask, Scheduler
 from pianobot.tasks.territories import territories
 from pianobot.tasks.worlds import worlds
 
@@ -23,39 +23,42 @@ if TYPE_CHECKING:
 class TaskRunner:
     def __init__(self, bot: Pianobot):
         self.bot = bot
-        self.logger = getLogger('tasks')
+        self.scheduler = Scheduler(
+            bot,
+            [
+                ScheduledTask(
+                    'Territory',
+                    territories,
+                    30,
+                    resources=['guild', 'territories'],
+                    condition=lambda bot: bot.enable_tracking is True,
+                ),
+                ScheduledTask('World', worlds, 30, resources=['online_players']),
+                ScheduledTask('Player', players, 30, resources=['online_uuids']),
+                ScheduledTask('Player Flush', flush_players, 300, overrun='coalesce'),
+                ScheduledTask(
+                    'Member Activity', member_activity, 60, resources=['guild', 'online_players']
+                ),
+                ScheduledTask(
+                    'Guild Raids', guild_raids, 120, resources=['guild'], overrun='coalesce'
+                ),
+                ScheduledTask(
+                    'Guild Activity',
+                    guild_activity,
+                    300,
+                    resources=['online_players', 'tracked_guilds'],
+                ),
+                ScheduledTask('Guild Awards', guild_awards, 300, resources=['guild']),
+                ScheduledTask('Member', members, 300, resources=['guild'], overrun='coalesce'),
+                ScheduledTask('Guild XP', guild_xp, 300, after=['Member'], resources=['guild']),
+                ScheduledTask('Rollup', rollup, 300, after=['Guild Activity', 'Guild XP']),
+                ScheduledTask('Partitions', partitions, 3600, after=['Rollup']),
+            ],
+            max_concurrency=int(getenv('TASK_CONCURRENCY', 4)),
+        )
 
     async def start_tasks(self) -> None:
-        self._loop_30s.start()
-        self._loop_1m.start()
-        self._loop_2m.start()
-        self._loop_5m.start()
-
-    async def _run_task(
-        self, task: Callable[[Pianobot], Coroutine[Any, Any, None]], name: str
-    ) -> None:
-        start = perf_counter()
-        await task(self.bot)
-        self.logger.debug('%s task finished in %s seconds', name, perf_counter() - start)
-
-    @loop(seconds=30)
-    async def _loop_30s(self) -> None:
-        if self.bot.enable_tracking is True:
-            await self._run_task(territories, 'Territory')
-        await self._run_task(worlds, 'World')
-        await self._run_task(players, 'Player')
-
-    @loop(seconds=60)
-    async def _loop_1m(self) -> None:
-        await self._run_task(member_activity, 'Member Activity')
-    
-    @loop(seconds=120)
-    async def _loop_2m(self) -> None:
-        await self._run_task(guild_raids, 'Guild Raids') 
+        self.scheduler.start()
 
-    @loop(seconds=300)
-    async def _loop_5m(self) -> None:
-        await self._run_task(guild_activity, 'Guild Activity')
-        await self._run_task(guild_awards, 'Guild Awards')
-        await self._run_task(guild_xp, 'Guild XP')
-        await self._run_task(members, 'Member')
+    def stop_tasks(self) -> None:
+        self.scheduler.stop()
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+from asyncio import CancelledError, Event, Semaphore, Task, create_task, gather, sleep
+from datetime import datetime, timezone
+from logging import getLogger
+from math import gcd
+from time import monotonic, perf_counter, time
+from typing import Any, Callable, Coroutine, Iterable, Literal, Mapping, TYPE_CHECKING
+
+from corkus.utils import RequestPriority
+
+from pianobot.tasks.snapshot import Snapshot, take_snapshot
+from pianobot.utils import Histogram
+
+if TYPE_CHECKING:
+    from pianobot import Pianobot
+
+TaskFunction = Callable[['Pianobot', Snapshot], Coroutine[Any, Any, None]]
+OverrunPolicy = Literal['skip', 'coalesce']
+
+
+class ScheduledTask:
+    """A task that runs every ``interval`` seconds, aligned to wall-clock multiples of its
+    interval. ``after`` names tasks that have to finish first when they are due in the
+    same tick, and ``resources`` names the snapshot resources the task reads.
+
+    ``overrun`` decides what happens to ticks that are due while the previous run is still
+    going: ``skip`` drops them, ``coalesce`` runs the task once more right after the
+    previous run finished, no matter how many ticks were missed.
+
+    A task also waits for a run of a task in ``after`` that is still going from an earlier
+    tick, including its pending catch-up run. Catch-up runs do not rerun their dependents."""
+
+    def __init__(
+        self,
+        name: str,
+        function: TaskFunction,
+        interval: int,
+        *,
+        after: Iterable[str] = (),
+        resources: Iterable[str] = (),
+        condition: Callable[[Pianobot], bool] | None = None,
+        overrun: OverrunPolicy = 'skip',
+    ) -> None:
+        self._name = name
+        self._function = function
+        self._interval = interval
+        self._after = frozenset(after)
+        self._resources = frozenset(resources)
+        self._condition = condition
+        self._overrun = overrun
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def function(self) -> TaskFunction:
+        return self._function
+
+    @property
+    def interval(self) -> int:
+        return self._interval
+
+    @property
+    def after(self) -> frozenset[str]:
+        return self._after
+
+    @property
+    def resources(self) -> frozenset[str]:
+        return self._resources
+
+    @property
+    def overrun(self) -> OverrunPolicy:
+        return self._overrun
+
+    def is_enabled(self, bot: Pianobot) -> bool:
+        return self._condition is None or self._condition(bot)
+
+    def is_due(self, bot: Pianobot, tick: int) -> bool:
+        return tick % self._interval == 0 and self.is_enabled(bot)
+
+
+class TaskStats:
+    """Run statistics of a scheduled task."""
+
+    def __init__(self) -> None:
+        self.durations = Histogram()
+        self.last_duration: float | None = None
+        self.last_success: datetime | None = None
+        self.last_failure: datetime | None = None
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.coalesced = 0
+
+
+class Scheduler:
+    """Runs scheduled tasks on wall-clock aligned ticks.
+
+    Every tick takes one snapshot with the resources of all due tasks, then starts each
+    due task as soon as the due tasks it depends on have finished. Independent tasks run
+    concurrently, at most ``max_concurrency`` at a time. A tick does not wait for the
+    previous one, so a slow task only delays the tasks that depend on it.
+
+    The scheduler loop itself is supervised and restarted with exponential backoff if it
+    crashes, and every task keeps :py:class:`TaskStats` about its runs.
+    """
+
+    MAX_BACKOFF = 300
+
+    def __init__(self, bot: Pianobot, tasks: Iterable[ScheduledTask], max_concurrency: int = 4) -> None:
+        self.bot = bot
+        self.logger = getLogger('tasks')
+        self._tasks = {task.name: task for task in tasks}
+        self._semaphore = Semaphore(max_concurrency)
+        self._running: dict[str, Task[None]] = {}
+        # due tasks waiting for their snapshot, they count as running for the next ticks
+        self._starting: set[str] = set()
+        self._pending: set[str] = set()
+        # set while a task is neither running, waiting for its snapshot nor pending
+        self._idle = {name: Event() for name in self._tasks}
+        for idle in self._idle.values():
+            idle.set()
+        self._stats = {name: TaskStats() for name in self._tasks}
+        self._ticks: set[Task[None]] = set()
+        self._runner: Task[None] | None = None
+        self._started_at: datetime | None = None
+
+        for task in self._tasks.values():
+            unknown = task.after - self._tasks.keys()
+            if unknown:
+                raise ValueError(f'{task.name} depends on unknown tasks: {", ".join(unknown)}')
+        self._check_cycles()
+        self._resolution = gcd(*(task.interval for task in self._tasks.values()))
+
+    @property
+    def tasks(self) -> Mapping[str, ScheduledTask]:
+        return self._tasks
+
+    @property
+    def stats(self) -> Mapping[str, TaskStats]:
+        return self._stats
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+
+    @property
+    def started_at(self) -> datetime | None:
+        return self._started_at
+
+    def last_success(self, name: str) -> datetime | None:
+        return self._stats[name].last_success
+
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._started_at = datetime.now(timezone.utc)
+            self._runner = create_task(self._supervise())
+
+    def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+        for task in self._ticks:
+            task.cancel()
+
+    async def _supervise(self) -> None:
+        backoff = 1
+        while True:
+            started = monotonic()
+            try:
+                await self._run()
+            except CancelledError:
+                raise
+            except Exception:
+                if monotonic() - started > self.MAX_BACKOFF:
+                    backoff = 1
+                self.logger.exception('Task scheduler crashed, restarting in %s seconds', backoff)
+                await sleep(backoff)
+                backoff = min(backoff * 2, self.MAX_BACKOFF)
+
+    async def _run(self) -> None:
+        tick = 0
+        while True:
+            now = time()
+            # the sleep may end marginally early, never run the same tick twice
+            tick = max(tick + self._resolution, (int(now) // self._resolution + 1) * self._resolution)
+            await sleep(tick - now)
+            run = create_task(self._run_tick(tick))
+            self._ticks.add(run)
+            run.add_done_callback(self._ticks.discard)
+
+    async def _run_tick(self, tick: int) -> None:
+        due = [task for task in self._tasks.values() if task.is_due(self.bot, tick)]
+        for task in list(due):
+            if task.name not in self._running and task.name not in self._starting:
+                continue
+            due.remove(task)
+            stats = self._stats[task.name]
+            if task.overrun == 'coalesce':
+                stats.coalesced += 1
+                if task.name not in self._pending:
+                    self._pending.add(task.name)
+                    self._settle(task.name)
+                    self.logger.warning('%s task is still running, running again once it finished', task.name)
+            else:
+                stats.skipped += 1
+                self.logger.warning('%s task is still running, skipping this run', task.name)
+        await self._run_tasks(due)
+
+    async def _run_tasks(self, due: list[ScheduledTask]) -> None:
+        if not due:
+            return
+
+        names = {task.name for task in due}
+        self._starting.update(names)
+        self._settle(*names)
+        resources = {resource: True for task in due for resource in task.resources}
+        start = perf_counter()
+        try:
+            with self.bot.corkus.priority(RequestPriority.BACKGROUND):
+                snapshot = await take_snapshot(self.bot, **resources)
+        except BaseException as e:
+            # nothing ran, so there is nothing to catch up on either
+            self._pending.difference_update(names)
+            self._starting.difference_update(names)
+            self._settle(*names)
+            if not isinstance(e, Exception):
+                raise
+            self.logger.exception('Snapshot failed, not running %s', ', '.join(sorted(names)))
+            for task in due:
+                self._record_failure(task)
+            return
+        self.logger.debug('Snapshot taken in %s seconds', perf_counter() - start)
+
+        finished = {task.name: Event() for task in due}
+        runs = []
+        for task in due:
+            run = create_task(self._run_task(task, snapshot, finished))
+            run.add_done_callback(lambda run, name=task.name: self._run_done(name, run))
+            self._running[task.name] = run
+            runs.append(run)
+        # only released once the runs are tracked, dependents must not see the tasks idle
+        self._starting.difference_update(names)
+        await gather(*runs, return_exceptions=True)
+
+    def _run_done(self, name: str, run: Task[None]) -> None:
+        if self._running.get(name) is run:
+            del self._running[name]
+        if name in self._pending and not run.cancelled():
+            self._pending.discard(name)
+            # dependents keep waiting until the catch-up run finished
+            self._starting.add(name)
+            catch_up = create_task(self._run_tasks([self._tasks[name]]))
+            self._ticks.add(catch_up)
+            catch_up.add_done_callback(self._ticks.discard)
+        elif run.cancelled():
+            self._pending.discard(name)
+        self._settle(name)
+
+    def _settle(self, *names: str) -> None:
+        for name in names:
+            if name in self._running or name in self._starting or name in self._pending:
+                self._idle[name].clear()
+            else:
+                self._idle[name].set()
+
+    async def _run_task(self, task: ScheduledTask, snapshot: Snapshot, finished: dict[str, Event]) -> None:
+        try:
+            for dependency in task.after:
+                if dependency in finished:
+                    await finished[dependency].wait()
+                else:
+                    await self._idle[dependency].wait()
+            async with self._semaphore:
+                start = perf_counter()
+                try:
+                    with self.bot.corkus.priority(RequestPriority.BACKGROUND):
+                        await task.function(self.bot, snapshot)
+                finally:
+                    self._record(task, perf_counter() - start)
+        except CancelledError:
+            raise
+        except Exception:
+            self._record_failure(task)
+            self.logger.exception(
+                '%s task failed (%s times in a row)',
+                task.name,
+                self._stats[task.name].consecutive_failures,
+            )
+        else:
+            stats = self._stats[task.name]
+            stats.consecutive_failures = 0
+            stats.last_success = datetime.now(timezone.utc)
+        finally:
+            finished[task.name].set()
+
+    def _record_failure(self, task: ScheduledTask) -> None:
+        stats = self._stats[task.name]
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.last_failure = datetime.now(timezone.utc)
+
+    def _record(self, task: ScheduledTask, duration: float) -> None:
+        stats = self._stats[task.name]
+        stats.durations.observe(duration)
+        stats.last_duration = duration
+        self.logger.debug('%s task finished in %s seconds', task.name, duration)
+        if duration > task.interval:
+            stats.overruns += 1
+            self.logger.warning(
+                '%s task took %.1f seconds, longer than its interval of %s seconds',
+                task.name,
+                duration,
+                task.interval,
+            )
+
+    def _check_cycles(self) -> None:
+        visited: set[str] = set()
+
+        def visit(name: str, path: tuple[str, ...]) -> None:
+            if name in path:
+                raise ValueError(f'Circular task dependency: {" -> ".join(path + (name,))}')
+            if name in visited:
+                return
+            for dependency in self._tasks[name].after:
+                visit(dependency, path + (name,))
+            visited.add(name)
+
+        for name in self._tasks:
+            visit(name, ())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from asyncio import gather
+from datetime import datetime, timezone
+from logging import getLogger
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Awaitable, Mapping
+
+from corkus.errors import CorkusException
+from corkus.objects import Guild, OnlinePlayers, Territory
+
+if TYPE_CHECKING:
+    from pianobot import Pianobot
+
+
+class Snapshot:
+    """Upstream state fetched once per tick and shared by every task of that tick.
+
+    Resources that were not requested or could not be fetched are ``None``. Failed
+    fetches are logged while the snapshot is taken, so tasks can simply skip them.
+    """
+
+    def __init__(
+        self,
+        taken_at: datetime,
+        guilds: Mapping[str, Guild] | None = None,
+        online_players: OnlinePlayers | None = None,
+        online_uuids: OnlinePlayers | None = None,
+        territories: tuple[Territory, ...] | None = None,
+    ) -> None:
+        self._taken_at = taken_at
+        self._guilds = MappingProxyType(dict(guilds or {}))
+        self._online_players = online_players
+        self._online_uuids = online_uuids
+        self._territories = territories
+
+    @property
+    def taken_at(self) -> datetime:
+        return self._taken_at
+
+    @property
+    def guilds(self) -> Mapping[str, Guild]:
+        """Tracked guilds by name, without the ones that were not due or failed to load."""
+        return self._guilds
+
+    @property
+    def online_players(self) -> OnlinePlayers | None:
+        """Online players identified by username."""
+        return self._online_players
+
+    @property
+    def online_uuids(self) -> OnlinePlayers | None:
+        """Online players identified by UUID."""
+        return self._online_uuids
+
+    @property
+    def territories(self) -> tuple[Territory, ...] | None:
+        return self._territories
+
+
+async def take_snapshot(
+    bot: Pianobot,
+    *,
+    guild: bool = False,
+    online_players: bool = False,
+    online_uuids: bool = False,
+    territories: bool = False,
+    tracked_guilds: bool = False,
+) -> Snapshot:
+    logger = getLogger('tasks.snapshot')
+
+    async def fetch(description: str, request: Awaitable[Any]) -> Any:
+        try:
+            return await request
+        except CorkusException as e:
+            logger.warning('Error when fetching %s: %s', description, e)
+            return None
+
+    async def fetch_guilds(names: list[str]) -> dict[str, Guild]:
+        guilds = {}
+        async for name, result in bot.corkus.guild.get_many(names):
+            if isinstance(result, CorkusException):
+                logger.warning('Error when fetching guild data of `%s`: %s', name, result)
+            else:
+                guilds[name] = result
+                bot.tracked_guilds.mark_fetched(name)
+        return guilds
+
+    async def fetch_territories() -> tuple[Territory, ...]:
+        return tuple(await bot.corkus.territory.list_all())
+
+    async def skip() -> None:
+        return None
+
+    # every guild is fetched once per snapshot, no matter how many tasks read it
+    wanted = list(bot.tracked_guilds) if tracked_guilds else bot.tracked_guilds.with_pipelines() if guild else []
+    guild_names = bot.tracked_guilds.plan(
+        wanted, bot.corkus.guild.freshness, bot.corkus.rate_limit.remaining
+    )
+    if len(guild_names) < len(wanted):
+        logger.debug('Deferred %s guilds to a later snapshot', len(wanted) - len(guild_names))
+
+    taken_at = datetime.now(timezone.utc)
+    guilds, players, uuids, terrs = await gather(
+        fetch_guilds(guild_names),
+        fetch('list of online players', bot.corkus.network.online_players()) if online_players else skip(),
+        fetch('list of online players', bot.corkus.network.online_players(by_uuid=True)) if online_uuids else skip(),
+        fetch('list of territories', fetch_territories()) if territories else skip(),
+    )
+    return Snapshot(
+        taken_at,
+        guilds=guilds,
+        online_players=players,
+        online_uuids=uuids,
+        territories=terrs,
+    )
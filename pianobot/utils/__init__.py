@@ -1,4 +1,6 @@
 from .discord import get_prefix, InteractionSendWrapper
+from .guilds import GuildRegistry, TrackedGuild
+from .histogram import Histogram
 from .logger import DiscordLogHandler
 from .numbers import display, display_full, display_short
 from .pages import paginator
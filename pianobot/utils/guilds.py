@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from json import load
+from os import getenv
+from os.path import exists
+from time import monotonic
+from typing import Callable, Iterable, Iterator, Mapping
+
+PIPELINES = frozenset({'members', 'member_activity', 'xp', 'raids', 'awards', 'territories'})
+DEFAULT_RAID_WEBHOOK = 'https://discord.com/api/webhooks/1350160463782084719/NhYzODuCuP1QuAtygwXYPQZwU7Wv88K_eAKWJvb6L2SeMrQyEM3Xc41eR_jbJY9h5TBQ'
+AVATAR_URL = 'https://cdn.discordapp.com/avatars/861602324543307786/83f879567954aee29bc9fd534bc05b1f.webp'
+# share of the remaining API requests one snapshot may spend on guilds that are not cached
+GUILD_BUDGET_SHARE = 0.5
+
+
+class TrackedGuild:
+    """A guild the bot tracks, with the pipelines that run for it and where they report.
+
+    The online activity of every tracked guild is recorded, ``pipelines`` adds the
+    members, member activity, xp, raid, award and territory tracking. The guild is polled
+    at most every ``poll_interval`` seconds, or whenever a task needs it if that is 0.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tag: str,
+        pipelines: Iterable[str] = (),
+        *,
+        member_webhook: str | None = None,
+        xp_webhook: str | None = None,
+        raid_webhook: str | None = None,
+        territory_webhook: str | None = None,
+        poll_interval: int = 0,
+    ) -> None:
+        unknown = set(pipelines) - PIPELINES
+        if unknown:
+            raise ValueError(f'Unknown pipelines for {name}: {", ".join(sorted(unknown))}')
+        self._name = name
+        self._tag = tag
+        self._pipelines = frozenset(pipelines)
+        self._member_webhook = member_webhook
+        self._xp_webhook = xp_webhook
+        self._raid_webhook = raid_webhook
+        self._territory_webhook = territory_webhook
+        self._poll_interval = poll_interval
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def tag(self) -> str:
+        return self._tag
+
+    @property
+    def pipelines(self) -> frozenset[str]:
+        return self._pipelines
+
+    @property
+    def member_webhook(self) -> str | None:
+        """Webhook for member updates and award results."""
+        return self._member_webhook
+
+    @property
+    def xp_webhook(self) -> str | None:
+        return self._xp_webhook
+
+    @property
+    def raid_webhook(self) -> str | None:
+        return self._raid_webhook
+
+    @property
+    def territory_webhook(self) -> str | None:
+        """Webhook for territory changes, the primary guild reports to the territory log
+        channels configured per Discord server instead."""
+        return self._territory_webhook
+
+    @property
+    def poll_interval(self) -> int:
+        return self._poll_interval
+
+    def runs(self, pipeline: str) -> bool:
+        return pipeline in self._pipelines
+
+
+class GuildRegistry:
+    """The tracked guilds by name. The first guild is the primary one, the guild of the
+    Discord server the bot belongs to."""
+
+    def __init__(self, guilds: Iterable[TrackedGuild]) -> None:
+        self._guilds: dict[str, TrackedGuild] = {}
+        for guild in guilds:
+            if guild.name in self._guilds:
+                raise ValueError(f'Guild {guild.name} is tracked twice')
+            self._guilds[guild.name] = guild
+        if not self._guilds:
+            raise ValueError('No guilds are tracked')
+        self._fetched_at: dict[str, float] = {}
+
+    @classmethod
+    def load(cls, activity_file: str = 'tracked_guilds.txt', config_file: str | None = None) -> GuildRegistry:
+        """Reads the guilds with pipelines from the JSON ``config_file``, a list of objects
+        with the arguments of :py:class:`TrackedGuild`. Without one, the guild named by
+        ``GUILD_NAME`` runs every pipeline and reports to the webhooks from the environment.
+        Guilds from the ``Name:TAG`` lines of ``activity_file`` are added for their activity.
+        """
+        config_file = config_file or getenv('GUILD_CONFIG', 'guilds.json')
+        guilds: list[TrackedGuild] = []
+        if exists(config_file):
+            with open(config_file, 'r', encoding='UTF-8') as file:
+                guilds.extend(TrackedGuild(**entry) for entry in load(file))
+        else:
+            guilds.append(TrackedGuild(
+                getenv('GUILD_NAME', 'Eden'),
+                getenv('GUILD_TAG', 'EDN'),
+                PIPELINES,
+                member_webhook=getenv('MEMBER_CHANNEL') or None,
+                xp_webhook=getenv('XP_CHANNEL') or None,
+                raid_webhook=getenv('RAID_CHANNEL') or DEFAULT_RAID_WEBHOOK,
+            ))
+        names = {guild.name for guild in guilds}
+        with open(activity_file, 'r', encoding='UTF-8') as file:
+            for line in file:
+                if line.strip():
+                    name, tag = line.strip().split(':')
+                    if name not in names:
+                        guilds.append(TrackedGuild(name, tag))
+                        names.add(name)
+        return cls(guilds)
+
+    def __iter__(self) -> Iterator[TrackedGuild]:
+        return iter(self._guilds.values())
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._guilds
+
+    @property
+    def primary(self) -> TrackedGuild:
+        return next(iter(self._guilds.values()))
+
+    @property
+    def tags(self) -> Mapping[str, str]:
+        return {name: guild.tag for name, guild in self._guilds.items()}
+
+    def get(self, name: str) -> TrackedGuild | None:
+        return self._guilds.get(name)
+
+    def find(self, name_or_tag: str) -> TrackedGuild | None:
+        """The guild with this name or tag, ignoring case."""
+        name_or_tag = name_or_tag.lower()
+        return next(
+            (
+                guild
+                for guild in self._guilds.values()
+                if name_or_tag in (guild.name.lower(), guild.tag.lower())
+            ),
+            None,
+        )
+
+    def running(self, pipeline: str) -> list[TrackedGuild]:
+        return [guild for guild in self._guilds.values() if guild.runs(pipeline)]
+
+    def with_pipelines(self) -> list[TrackedGuild]:
+        return [guild for guild in self._guilds.values() if guild.pipelines]
+
+    def plan(self, guilds: Iterable[TrackedGuild], freshness: Callable[[str], float], remaining: int) -> list[str]:
+        """Picks the guilds to fetch for a snapshot.
+
+        Guilds polled less than ``poll_interval`` seconds ago are skipped. Guilds with
+        pipelines are always fetched, they are kept fresh in the cache anyway. Of the other
+        guilds, cached ones are free and the rest share a budget of part of the ``remaining``
+        API requests, the ones that were fetched longest ago first."""
+        now = monotonic()
+        budget = int(remaining * GUILD_BUDGET_SHARE)
+        planned = []
+        for guild in sorted(
+            guilds, key=lambda g: (not g.pipelines, self._fetched_at.get(g.name, 0.0))
+        ):
+            if now - self._fetched_at.get(guild.name, -guild.poll_interval) < guild.poll_interval:
+                continue
+            if not guild.pipelines and freshness(guild.name) <= 0:
+                if budget <= 0:
+                    continue
+                budget -= 1
+            planned.append(guild.name)
+        return planned
+
+    def mark_fetched(self, name: str) -> None:
+        """Records that the guild was loaded, failed fetches are retried by the next plan."""
+        self._fetched_at[name] = monotonic()
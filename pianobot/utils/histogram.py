@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Histogram:
+    """Counts observed values into fixed buckets, cumulative like Prometheus histograms."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._sum += value
+        self._max = max(self._max, value)
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    @property
+    def mean(self) -> float:
+        count = self.count
+        return self._sum / count if count else 0.0
+
+    @property
+    def buckets(self) -> list[tuple[float, int]]:
+        """Upper bound and number of values less than or equal to it for every bucket,
+        ending with an infinite bound that contains all values."""
+        result = []
+        total = 0
+        for bound, count in zip(self._bounds + (float('inf'),), self._counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket that contains the ``q`` quantile."""
+        target = q * self.count
+        for bound, total in self.buckets:
+            if total >= target and total > 0:
+                return min(bound, self._max)
+        return 0.0
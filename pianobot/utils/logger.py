@@ -1,31 +1,53 @@
 from __future__ import annotations
 
+from asyncio import Task
+from collections import deque
 from logging import Handler
 from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from pianobot import Pianobot
 
+MESSAGE_LENGTH = 1990
+
 
 class DiscordLogHandler(Handler):
+    """Forwards log records to a Discord channel.
+
+    Records can be emitted from any thread, they are handed to the event loop and sent by
+    a single task that packs as many queued records into one message as fit, instead of
+    starting a task and a request for every record.
+    """
+
     def __init__(self, bot: Pianobot, channel_id: int):
         super().__init__()
         self.bot = bot
         self.channel = bot.get_channel(channel_id)
+        self._queue: deque[str] = deque()
+        self._sender: Task[None] | None = None
 
     def emit(self, record: Any) -> None:
         log_entry = self.format(record)
         if log_entry.startswith("We are being rate limited"):
             return
-        messages = [
-            f"```{log_entry[i * 1990:(i + 1) * 1990]}```"
-            for i in range(len(log_entry) // 1990 + 1)
-        ]
-        self.bot.loop.create_task(self.send(messages))
-
-    async def send(self, messages: list[str]) -> None:
-        for message in messages:
+        try:
+            self.bot.loop.call_soon_threadsafe(self._enqueue, log_entry)
+        except RuntimeError:
+            # the loop is already closed while shutting down
+            pass
+
+    def _enqueue(self, log_entry: str) -> None:
+        for i in range(len(log_entry) // MESSAGE_LENGTH + 1):
+            self._queue.append(log_entry[i * MESSAGE_LENGTH:(i + 1) * MESSAGE_LENGTH])
+        if self._sender is None or self._sender.done():
+            self._sender = self.bot.loop.create_task(self.send())
+
+    async def send(self) -> None:
+        while self._queue:
+            message = self._queue.popleft()
+            while self._queue and len(message) + len(self._queue[0]) < MESSAGE_LENGTH:
+                message += "\n" + self._queue.popleft()
             try:
-                await self.channel.send(message)
+                await self.channel.send(f"```{message}```")
             except Exception:
                 pass
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from asyncio import Task, create_task, sleep
+from logging import getLogger
+from sys import _current_frames
+from threading import Event, Thread, get_ident
+from time import perf_counter
+from traceback import extract_stack, format_list
+
+from pianobot.utils.histogram import Histogram
+
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class BlockingCall:
+    """Statistics of a code location that was caught blocking the event loop."""
+
+    def __init__(self, location: str, stack: str) -> None:
+        self.location = location
+        self.stack = stack
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def record(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.worst = max(self.worst, duration)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a task that sleeps for ``interval`` seconds.
+    Any delay beyond the interval is time the loop spent running other callbacks.
+
+    A watchdog thread checks that these wake-ups keep happening. If the loop is stuck for
+    longer than ``threshold`` seconds, it captures the stack of the loop thread, which shows
+    the code that is blocking it. Once the loop recovers, the whole delay is attributed to
+    that code and logged, and :py:meth:`worst_offenders` ranks the locations by total time
+    blocked.
+    """
+
+    def __init__(
+        self, interval: float = 0.5, threshold: float = 0.25, report_interval: float = 3600
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.report_interval = report_interval
+        self.lag = Histogram(LAG_BUCKETS)
+        self.last = 0.0
+        self.offenders: dict[str, BlockingCall] = {}
+        self.logger = getLogger('loop_lag')
+        self._task: Task[None] | None = None
+        self._watchdog: Thread | None = None
+        self._stopped = Event()
+        self._loop_thread: int | None = None
+        self._expected = 0.0
+        self._captured: tuple[str, str] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._loop_thread = get_ident()
+            self._expected = perf_counter() + self.interval
+            self._stopped.clear()
+            self._task = create_task(self._run())
+            self._watchdog = Thread(target=self._watch, name='loop-lag-watchdog', daemon=True)
+            self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    def worst_offenders(self, n: int = 5) -> list[BlockingCall]:
+        return sorted(self.offenders.values(), key=lambda o: o.total, reverse=True)[:n]
+
+    async def _run(self) -> None:
+        next_report = perf_counter() + self.report_interval
+        while True:
+            start = perf_counter()
+            self._expected = start + self.interval
+            await sleep(self.interval)
+            self.last = max(0.0, perf_counter() - start - self.interval)
+            self.lag.observe(self.last)
+
+            captured, self._captured = self._captured, None
+            if captured is not None:
+                location, stack = captured
+                offender = self.offenders.setdefault(location, BlockingCall(location, stack))
+                offender.record(self.last)
+                self.logger.warning(
+                    'Event loop was blocked for %.2f seconds by %s\n%s', self.last, location, stack
+                )
+
+            if perf_counter() >= next_report:
+                next_report = perf_counter() + self.report_interval
+                self._report()
+
+    def _report(self) -> None:
+        offenders = self.worst_offenders()
+        if not offenders:
+            return
+        self.logger.info(
+            'Worst event loop blockers:\n%s',
+            '\n'.join(
+                f'{o.total:.2f}s total, {o.count} times, worst {o.worst:.2f}s: {o.location}'
+                for o in offenders
+            ),
+        )
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            if self._captured is not None or perf_counter() - self._expected < self.threshold:
+                continue
+            frame = _current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            summary = extract_stack(frame)
+            # the innermost frame of our own code is the most useful location to report
+            own = [
+                f for f in summary if 'site-packages' not in f.filename and 'lib/python' not in f.filename
+            ]
+            culprit = (own or summary)[-1]
+            location = f'{culprit.filename}:{culprit.lineno} in {culprit.name}'
+            self._captured = (location, ''.join(format_list(summary[-15:])))
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+
+from pianobot.utils.histogram import Histogram
+
+if TYPE_CHECKING:
+    from pianobot import Pianobot
+
+STALE_AFTER_INTERVALS = 3
+MIN_STALE_SECONDS = 600
+MAX_OFFENDERS = 10
+
+
+class MetricsServer:
+    """Serves Prometheus metrics on ``/metrics`` and a health check on ``/health``."""
+
+    def __init__(self, bot: Pianobot, port: int, host: str = '0.0.0.0') -> None:
+        self.bot = bot
+        self.port = port
+        self.host = host
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get('/metrics', self.metrics)
+        app.router.add_get('/health', self.health)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        getLogger('metrics').info('Serving metrics on port %s', self.port)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def metrics(self, _: web.Request) -> web.Response:
+        return web.Response(text=self.render(), content_type='text/plain')
+
+    async def health(self, _: web.Request) -> web.Response:
+        problems = self.check_health()
+        return web.json_response(
+            {'status': 'ok' if not problems else 'unhealthy', 'problems': problems},
+            status=200 if not problems else 503,
+        )
+
+    def check_health(self) -> list[str]:
+        if not self.bot.has_started:
+            return ['bot is starting']
+        runner = self.bot.task_runner
+        if runner is None or not runner.scheduler.running:
+            return ['task scheduler is not running']
+
+        problems = []
+        scheduler = runner.scheduler
+        now = datetime.now(timezone.utc)
+        for name, task in scheduler.tasks.items():
+            if not task.is_enabled(self.bot):
+                continue
+            since = scheduler.stats[name].last_success or scheduler.started_at or now
+            limit = max(STALE_AFTER_INTERVALS * task.interval, MIN_STALE_SECONDS)
+            if (now - since).total_seconds() > limit:
+                problems.append(f'{name} task has not succeeded since {since.isoformat()}')
+        return problems
+
+    def render(self) -> str:
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name: str, histogram: Histogram, labels: str = '') -> None:
+            for bound, count in histogram.buckets:
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {count}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{name}_sum{suffix} {histogram.sum}')
+            lines.append(f'{name}_count{suffix} {histogram.count}')
+
+        runner = self.bot.task_runner
+        if runner is not None:
+            stats = runner.scheduler.stats
+            metric('pianobot_task_duration_seconds', 'histogram', 'Duration of scheduled task runs.')
+            for name, task_stats in stats.items():
+                histogram('pianobot_task_duration_seconds', task_stats.durations, f'task="{name}"')
+            metric('pianobot_task_last_success_timestamp_seconds', 'gauge', 'Last successful run.')
+            for name, task_stats in stats.items():
+                if task_stats.last_success is not None:
+                    lines.append(
+                        f'pianobot_task_last_success_timestamp_seconds{{task="{name}"}}'
+                        f' {task_stats.last_success.timestamp()}'
+                    )
+            for counter, help_text in [
+                ('failures', 'Failed task runs.'),
+                ('overruns', 'Task runs that took longer than their interval.'),
+                ('skipped', 'Ticks skipped because the previous run was still going.'),
+                ('coalesced', 'Ticks merged into a catch-up run.'),
+            ]:
+                metric(f'pianobot_task_{counter}_total', 'counter', help_text)
+                for name, task_stats in stats.items():
+                    lines.append(
+                        f'pianobot_task_{counter}_total{{task="{name}"}} {getattr(task_stats, counter)}'
+                    )
+
+        if getattr(self.bot, 'corkus', None) is not None:
+            cache = self.bot.corkus.cache_info
+            metric('corkus_requests_total', 'counter', 'Corkus requests by cache result.')
+            lines.append(f'corkus_requests_total{{result="hit"}} {cache.hits}')
+            lines.append(f'corkus_requests_total{{result="stale"}} {cache.stale_hits}')
+            lines.append(f'corkus_requests_total{{result="miss"}} {cache.misses}')
+            metric('corkus_revalidations_total', 'counter', 'Expired responses confirmed unchanged.')
+            lines.append(f'corkus_revalidations_total {cache.revalidations}')
+            metric('corkus_cache_hit_ratio', 'gauge', 'Fraction of requests served from cache.')
+            lines.append(f'corkus_cache_hit_ratio {cache.hit_ratio}')
+            metric('corkus_cache_entries', 'gauge', 'Cached responses.')
+            lines.append(f'corkus_cache_entries {cache.entries}')
+            metric('corkus_cache_bytes', 'gauge', 'Size of cached responses.')
+            lines.append(f'corkus_cache_bytes {cache.size}')
+
+            rate_limit = self.bot.corkus.rate_limit
+            metric('corkus_ratelimit_remaining', 'gauge', 'Requests left in the current window.')
+            lines.append(f'corkus_ratelimit_remaining {rate_limit.remaining}')
+            metric('corkus_ratelimit_total', 'gauge', 'Requests allowed per window.')
+            lines.append(f'corkus_ratelimit_total {rate_limit.total}')
+            metric('corkus_ratelimit_queue_depth', 'gauge', 'Requests waiting for the rate limiter.')
+            lines.append(f'corkus_ratelimit_queue_depth {rate_limit.queue_depth}')
+
+        connection = self.bot.database.connection
+        metric('pianobot_db_pool_connections', 'gauge', 'Database pool connections by state.')
+        lines.append(f'pianobot_db_pool_connections{{state="idle"}} {connection.pool_idle}')
+        lines.append(
+            f'pianobot_db_pool_connections{{state="used"}} {connection.pool_size - connection.pool_idle}'
+        )
+        metric('pianobot_db_pool_max_connections', 'gauge', 'Maximum size of the database pool.')
+        lines.append(f'pianobot_db_pool_max_connections {connection.pool_max_size}')
+        statements = {
+            name.replace('\\', '\\\\').replace('"', '\\"'): stats
+            for name, stats in connection.statement_stats.items()
+        }
+        metric('pianobot_db_statement_duration_seconds', 'histogram', 'Duration of statements.')
+        for name, stats in statements.items():
+            histogram('pianobot_db_statement_duration_seconds', stats.durations, f'statement="{name}"')
+        metric('pianobot_db_slow_statements_total', 'counter', 'Statements slower than the threshold.')
+        for name, stats in statements.items():
+            lines.append(f'pianobot_db_slow_statements_total{{statement="{name}"}} {stats.slow}')
+
+        metric('pianobot_players_pending_writes', 'gauge', 'Last seen times not written yet.')
+        lines.append(f'pianobot_players_pending_writes {self.bot.database.players.pending}')
+
+        metric('pianobot_command_latency_seconds', 'histogram', 'Time from invocation to completion.')
+        for name, latency in self.bot.command_latency.items():
+            histogram('pianobot_command_latency_seconds', latency, f'command="{name}"')
+
+        metric('pianobot_event_loop_lag_seconds', 'histogram', 'Event loop scheduling delay.')
+        histogram('pianobot_event_loop_lag_seconds', self.bot.loop_lag.lag)
+
+        offenders = {
+            offender.location.replace('\\', '\\\\').replace('"', '\\"'): offender
+            for offender in self.bot.loop_lag.worst_offenders(MAX_OFFENDERS)
+        }
+        metric('pianobot_event_loop_blocked_seconds_total', 'counter', 'Time the loop was blocked.')
+        for location, offender in offenders.items():
+            lines.append(
+                f'pianobot_event_loop_blocked_seconds_total{{location="{location}"}} {offender.total}'
+            )
+        metric('pianobot_event_loop_blocked_total', 'counter', 'Times the loop was blocked.')
+        for location, offender in offenders.items():
+            lines.append(f'pianobot_event_loop_blocked_total{{location="{location}"}} {offender.count}')
+
+        metric('discord_gateway_latency_seconds', 'gauge', 'Discord websocket heartbeat latency.')
+        lines.append(f'discord_gateway_latency_seconds {self.bot.latency}')
+
+        return '\n'.join(lines) + '\n'